@@ -2,6 +2,8 @@
 ASGI config for astroworld project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Async views (e.g. the popular image and TLE endpoints) run on the server's
+event loop here; under WSGI Django runs them in a per-request loop instead.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
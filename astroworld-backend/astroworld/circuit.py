@@ -0,0 +1,143 @@
+"""
+Circuit breakers and negative caching for upstream hosts.
+
+Each upstream host gets a ``CircuitBreaker``. After ``failure_threshold``
+consecutive failures (connection errors, timeouts, 5xx responses) it opens
+and ``UpstreamSession`` rejects calls to the host immediately with
+``UpstreamUnavailable`` instead of waiting for the timeout. After
+``reset_timeout`` seconds it lets a few trial calls through (half-open);
+a success closes it again, a failure reopens it, and a call that ends
+without a verdict (e.g. cancelled) gives its trial slot back.
+
+Failed GET requests are additionally remembered in the cache for
+``UPSTREAM_NEGATIVE_CACHE_TTL`` seconds, so identical requests from any
+worker fail fast while the upstream recovers.
+"""
+import hashlib
+import threading
+import time
+from typing import Dict
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+DEFAULT_BREAKER = {
+    'failure_threshold': 5,
+    'reset_timeout': 30,
+    'half_open_max_calls': 1,
+}
+
+
+class UpstreamUnavailable(requests.exceptions.ConnectionError):
+    """Call rejected without contacting the upstream"""
+
+
+class CircuitBreaker:
+    """Closed/open/half-open state of one upstream host"""
+
+    def __init__(self, host: str, failure_threshold: int, reset_timeout: float, half_open_max_calls: int = 1):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self.rejected = 0
+        self._trial_calls = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go out now"""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    return False
+                self.state = HALF_OPEN
+                self._trial_calls = 0
+            if self.state == HALF_OPEN:
+                if self._trial_calls >= self.half_open_max_calls:
+                    self.rejected += 1
+                    return False
+                self._trial_calls += 1
+            return True
+
+    def is_open(self) -> bool:
+        with self._lock:
+            return self.state == OPEN and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.trips += 1
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """Give back the trial slot of a call that ended without a verdict"""
+        with self._lock:
+            if self.state == HALF_OPEN and self._trial_calls > 0:
+                self._trial_calls -= 1
+
+    def as_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'trips': self.trips,
+                'rejected': self.rejected,
+                'open_for_s': round(time.monotonic() - self.opened_at, 1) if self.state == OPEN else None,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(host: str) -> CircuitBreaker:
+    try:
+        return _breakers[host]
+    except KeyError:
+        pass
+    with _breakers_lock:
+        if host not in _breakers:
+            config = dict(DEFAULT_BREAKER)
+            config.update(getattr(settings, 'UPSTREAM_CIRCUIT_BREAKER', {}))
+            config.update(getattr(settings, 'UPSTREAM_CIRCUIT_BREAKER_HOSTS', {}).get(host, {}))
+            _breakers[host] = CircuitBreaker(host, **config)
+        return _breakers[host]
+
+
+def breaker_states() -> Dict[str, Dict]:
+    return {host: breaker.as_dict() for host, breaker in list(_breakers.items())}
+
+
+def request_key(method: str, url: str, params) -> str:
+    """Stable digest of a request's method, URL and parameters"""
+    if isinstance(params, dict):
+        params = sorted((key, str(value)) for key, value in params.items())
+    return hashlib.sha256(f'{method.upper()} {url} {params}'.encode('utf-8')).hexdigest()
+
+
+def negative_cache_key(method: str, url: str, params) -> str:
+    return f'upstream_failed_{request_key(method, url, params)}'
+
+
+def remember_failure(key: str, reason: str):
+    ttl = getattr(settings, 'UPSTREAM_NEGATIVE_CACHE_TTL', 30)
+    if ttl:
+        cache.set(key, reason, ttl)
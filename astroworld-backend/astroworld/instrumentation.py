@@ -0,0 +1,290 @@
+"""
+Request-level performance instrumentation.
+
+Collects per-request wall time, DB query count/time, cache hits/misses and
+outbound HTTP time per upstream host, exposes them as a ``Server-Timing``
+header and aggregates them into in-process histograms served by
+``/internal/metrics/``.
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+from django.db import connections
+
+from .circuit import breaker_states
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in milliseconds
+HISTOGRAM_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+_current_profile = contextvars.ContextVar('astroworld_request_profile', default=None)
+
+
+class RequestProfile:
+    """Timings collected while serving a single request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = []  # (sql, seconds)
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.outbound = defaultdict(lambda: [0, 0.0])  # host -> [calls, seconds]
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def record_query(self, sql: str, duration: float):
+        self.queries.append((sql, duration))
+        self.db_time += duration
+
+    def top_queries(self, limit: int = 5):
+        """Slowest query templates, grouped so N+1 patterns show their repeat count"""
+        grouped = defaultdict(lambda: [0, 0.0])
+        for sql, duration in self.queries:
+            grouped[sql][0] += 1
+            grouped[sql][1] += duration
+        ranked = sorted(grouped.items(), key=lambda item: item[1][1], reverse=True)
+        return [
+            {'sql': sql[:500], 'count': count, 'total_ms': round(total * 1000, 2)}
+            for sql, (count, total) in ranked[:limit]
+        ]
+
+
+def current_profile():
+    """Return the profile of the request being served, if any"""
+    return _current_profile.get()
+
+
+def record_outbound(host: str, duration: float):
+    """Record an outbound HTTP call against the current request and the registry"""
+    profile = _current_profile.get()
+    if profile is not None:
+        entry = profile.outbound[host]
+        entry[0] += 1
+        entry[1] += duration
+    metrics_registry.observe_outbound(host, duration)
+
+
+def record_cache(hits: int = 0, misses: int = 0):
+    """Record cache lookups against the current request"""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.cache_hits += hits
+        profile.cache_misses += misses
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (milliseconds)"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, duration_ms: float):
+        index = len(HISTOGRAM_BUCKETS_MS)
+        for i, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+            if duration_ms <= bound:
+                index = i
+                break
+        self.buckets[index] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def merge(self, buckets, count: int, total_ms: float, max_ms: float):
+        """Fold pre-aggregated bucket counts into this histogram"""
+        for i, bucket_count in enumerate(buckets[:len(self.buckets)]):
+            self.buckets[i] += bucket_count
+        self.count += count
+        self.total_ms += total_ms
+        self.max_ms = max(self.max_ms, max_ms)
+
+    def percentile(self, pct: float):
+        """Upper bucket bound containing the given percentile"""
+        if not self.count:
+            return None
+        target = self.count * pct / 100.0
+        seen = 0
+        for i, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= target:
+                bound = HISTOGRAM_BUCKETS_MS[i] if i < len(HISTOGRAM_BUCKETS_MS) else self.max_ms
+                return min(bound, round(self.max_ms, 2))
+        return self.max_ms
+
+    def as_dict(self):
+        labels = [f"le_{bound}" for bound in HISTOGRAM_BUCKETS_MS] + ['le_inf']
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total_ms / self.count, 2) if self.count else None,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'max_ms': round(self.max_ms, 2),
+            'buckets': dict(zip(labels, self.buckets)),
+        }
+
+
+class MetricsRegistry:
+    """Process-wide aggregation of request and upstream timings"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self.endpoints = defaultdict(lambda: {
+                'wall': Histogram(),
+                'db': Histogram(),
+                'queries': 0,
+                'cache_hits': 0,
+                'cache_misses': 0,
+                'errors': 0,
+            })
+            self.upstreams = defaultdict(Histogram)
+
+    def observe_request(self, endpoint: str, profile: RequestProfile, status_code: int):
+        with self._lock:
+            entry = self.endpoints[endpoint]
+            entry['wall'].observe(profile.elapsed * 1000)
+            entry['db'].observe(profile.db_time * 1000)
+            entry['queries'] += len(profile.queries)
+            entry['cache_hits'] += profile.cache_hits
+            entry['cache_misses'] += profile.cache_misses
+            if status_code >= 500:
+                entry['errors'] += 1
+
+    def observe_outbound(self, host: str, duration: float):
+        with self._lock:
+            self.upstreams[host].observe(duration * 1000)
+
+    def snapshot(self):
+        with self._lock:
+            endpoints = {}
+            for name, entry in self.endpoints.items():
+                requests_count = entry['wall'].count
+                lookups = entry['cache_hits'] + entry['cache_misses']
+                endpoints[name] = {
+                    'requests': requests_count,
+                    'errors': entry['errors'],
+                    'wall': entry['wall'].as_dict(),
+                    'db': entry['db'].as_dict(),
+                    'avg_queries': round(entry['queries'] / requests_count, 2) if requests_count else 0,
+                    'cache_hit_rate': round(entry['cache_hits'] / lookups, 3) if lookups else None,
+                }
+            return {
+                'pid': os.getpid(),
+                'since': self.started_at,
+                'endpoints': endpoints,
+                'upstreams': {host: hist.as_dict() for host, hist in self.upstreams.items()},
+                'circuit_breakers': breaker_states(),
+            }
+
+
+metrics_registry = MetricsRegistry()
+
+
+class PerformanceMiddleware:
+    """Profile each request and publish timings as Server-Timing + metrics"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'PERF_SERVER_TIMING', True)
+        self.slow_request_ms = getattr(settings, 'PERF_SLOW_REQUEST_MS', 1000)
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+
+        def query_wrapper(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                profile.record_query(sql, time.perf_counter() - start)
+
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(query_wrapper))
+                response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+
+        endpoint = self._endpoint_name(request)
+        metrics_registry.observe_request(endpoint, profile, response.status_code)
+
+        if self.server_timing:
+            response['Server-Timing'] = self._server_timing(profile)
+
+        elapsed_ms = profile.elapsed * 1000
+        if elapsed_ms >= self.slow_request_ms:
+            logger.warning(
+                f"Slow request {endpoint} took {elapsed_ms:.0f}ms "
+                f"({len(profile.queries)} queries, {profile.db_time * 1000:.0f}ms DB, "
+                f"upstream={dict((host, round(t * 1000)) for host, (_, t) in profile.outbound.items())}); "
+                f"top queries: {profile.top_queries()}"
+            )
+
+        return response
+
+    @staticmethod
+    def _endpoint_name(request) -> str:
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match else '<unmatched>'
+        return f"{request.method} /{route}"
+
+    @staticmethod
+    def _server_timing(profile: RequestProfile) -> str:
+        parts = [
+            f'total;dur={profile.elapsed * 1000:.1f}',
+            f'db;dur={profile.db_time * 1000:.1f};desc="{len(profile.queries)} queries"',
+            f'cache;desc="{profile.cache_hits} hits, {profile.cache_misses} misses"',
+        ]
+        for host, (calls, duration) in profile.outbound.items():
+            metric = 'upstream-' + ''.join(ch if ch.isalnum() else '-' for ch in host)
+            parts.append(f'{metric};dur={duration * 1000:.1f};desc="{calls} calls"')
+        return ', '.join(parts)
+
+
+_CACHE_MISS = object()
+
+
+class InstrumentedCacheMixin:
+    """Count hits and misses of cache lookups made while serving a request"""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _CACHE_MISS, version=version)
+        if value is _CACHE_MISS:
+            record_cache(misses=1)
+            return default
+        record_cache(hits=1)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version=version)
+        record_cache(hits=len(found), misses=len(keys) - len(found))
+        return found
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    pass
+
+
+class InstrumentedRedisCache(InstrumentedCacheMixin, RedisCache):
+    pass
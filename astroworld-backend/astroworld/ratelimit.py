@@ -0,0 +1,270 @@
+"""
+Outbound rate limiting per upstream host and API key.
+
+``UpstreamSession`` takes a token from the host's governor before every
+call, so request handlers, sync threads and Celery workers share one request
+rate instead of each sleeping blindly between calls. With ``REDIS_URL`` set
+the bucket lives in Redis and is shared by every process; otherwise, or
+while Redis is unreachable, each process falls back to an in-memory bucket.
+
+Interactive requests may drain the whole bucket, while background work
+(syncs and Celery tasks) leaves a reserve for them. Interactive requests wait
+at most ``UPSTREAM_INTERACTIVE_MAX_WAIT`` seconds for a token and are then
+rejected, so a request handler never sleeps through a long ``Retry-After``
+pause; only background work waits for as long as it takes. ``X-RateLimit-Remaining``
+response headers slow the bucket down before the upstream quota runs out,
+and 429 responses pause it for ``Retry-After`` seconds. Hosts without an
+entry in ``UPSTREAM_RATE_LIMITS`` are not limited.
+"""
+import asyncio
+import contextvars
+import hashlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from celery.signals import task_prerun
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+
+_priority = contextvars.ContextVar('upstream_priority', default=INTERACTIVE)
+
+MIN_RATE = 0.05  # Never slow a bucket below one request per 20 seconds
+ADAPT_TTL = 60  # Seconds an adapted rate holds without fresh headers
+DEFAULT_RETRY_AFTER = 60
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+@contextmanager
+def background():
+    """Mark upstream calls made inside the block as background work"""
+    token = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@task_prerun.connect
+def _celery_tasks_are_background(**kwargs):
+    _priority.set(BACKGROUND)
+
+
+class TokenBucket:
+    """Thread-safe in-process token bucket refilled at `rate` tokens per second"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._limit: Optional[Tuple[float, float]] = None  # (rate, expires at)
+        self._lock = threading.Lock()
+
+    def _current_rate(self, now: float) -> float:
+        if self._limit and self._limit[1] > now:
+            return min(self.rate, self._limit[0])
+        return self.rate
+
+    def try_acquire(self, reserve: float = 0) -> float:
+        """Take a token if more than `reserve` remain; otherwise seconds to wait"""
+        with self._lock:
+            now = time.monotonic()
+            rate = self._current_rate(now)
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            if self._tokens >= 1 + reserve:
+                self._tokens -= 1
+                return 0
+            return (1 + reserve - self._tokens) / rate
+
+    def limit_rate(self, rate: float, ttl: float = ADAPT_TTL):
+        with self._lock:
+            self._limit = (rate, time.monotonic() + ttl)
+
+    def penalize(self, seconds: float):
+        """Withhold tokens for `seconds`"""
+        with self._lock:
+            self._tokens = -seconds * self._current_rate(time.monotonic())
+            self._updated = time.monotonic()
+
+
+# Token bucket state in a Redis hash; the adapted rate is a separate key with a TTL
+_ACQUIRE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local reserve = tonumber(ARGV[4])
+local limited = tonumber(redis.call('GET', KEYS[2]))
+if limited then rate = math.min(rate, limited) end
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 + reserve then
+    tokens = tokens - 1
+else
+    wait = (1 + reserve - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 3600)
+return tostring(wait)
+"""
+
+
+class RedisTokenBucket:
+    """Token bucket shared by every process through Redis"""
+
+    def __init__(self, client, name: str, rate: float, burst: int):
+        self.client = client
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.key = f'ratelimit:{name}'
+        self.limit_key = f'ratelimit:{name}:rate'
+        self._script = client.register_script(_ACQUIRE_SCRIPT)
+
+    def try_acquire(self, reserve: float = 0) -> float:
+        wait = self._script(
+            keys=[self.key, self.limit_key],
+            args=[self.rate, self.capacity, time.time(), reserve]
+        )
+        return float(wait)
+
+    def limit_rate(self, rate: float, ttl: float = ADAPT_TTL):
+        self.client.set(self.limit_key, rate, ex=int(ttl))
+
+    def penalize(self, seconds: float):
+        self.client.hset(self.key, mapping={'tokens': -seconds * self.rate, 'updated': time.time()})
+
+
+_redis_client = None
+
+
+def _get_redis():
+    global _redis_client
+    redis_url = getattr(settings, 'REDIS_URL', None)
+    if not redis_url:
+        return None
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.Redis.from_url(redis_url, socket_timeout=1, socket_connect_timeout=1)
+    return _redis_client
+
+
+class RateGovernor:
+    """Rate limit of one upstream host and key, shared when Redis is available"""
+
+    def __init__(self, name: str, rate: float, burst: int, reserve: float = 0.25,
+                 window: int = 3600, low_water: float = 0.2):
+        self.name = name
+        self.local = TokenBucket(rate, burst)
+        self.shared = None
+        client = _get_redis()
+        if client is not None:
+            self.shared = RedisTokenBucket(client, name, rate, burst)
+        # Tokens background work leaves for interactive requests
+        self.reserve = reserve * self.local.capacity
+        self.window = window
+        self.low_water = low_water
+        self._fallback_logged = False
+
+    def _call(self, method: str, *args):
+        if self.shared is not None:
+            try:
+                return getattr(self.shared, method)(*args)
+            except Exception as e:
+                if not self._fallback_logged:
+                    logger.warning(f"Rate limiter for {self.name} falling back to in-process bucket: {str(e)}")
+                    self._fallback_logged = True
+        return getattr(self.local, method)(*args)
+
+    @staticmethod
+    def _deadline(timeout: Optional[float]) -> Optional[float]:
+        """When to give up waiting; interactive calls are bounded by default"""
+        if timeout is None and current_priority() == INTERACTIVE:
+            timeout = getattr(settings, 'UPSTREAM_INTERACTIVE_MAX_WAIT', 3)
+        return None if timeout is None else time.monotonic() + timeout
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Block until a token is available; False if `timeout` runs out first"""
+        reserve = self.reserve if current_priority() == BACKGROUND else 0
+        deadline = self._deadline(timeout)
+        while True:
+            wait = self._call('try_acquire', reserve)
+            if not wait:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> bool:
+        """Like `acquire`, but waits without blocking the event loop"""
+        reserve = self.reserve if current_priority() == BACKGROUND else 0
+        deadline = self._deadline(timeout)
+        while True:
+            wait = self._call('try_acquire', reserve)
+            if not wait:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+    def observe(self, response):
+        """Adapt the rate to the upstream quota headers of a response"""
+        headers = response.headers
+        if response.status_code == 429:
+            try:
+                retry_after = float(headers.get('Retry-After', DEFAULT_RETRY_AFTER))
+            except ValueError:
+                retry_after = DEFAULT_RETRY_AFTER
+            logger.warning(f"{self.name} returned 429, pausing for {retry_after:.0f}s")
+            self._call('penalize', retry_after)
+            return
+
+        try:
+            remaining = int(headers['X-RateLimit-Remaining'])
+            limit = int(headers.get('X-RateLimit-Limit') or 0)
+        except (KeyError, ValueError):
+            return
+        if limit and remaining < limit * self.low_water:
+            # Spread what is left of the quota over its window
+            self._call('limit_rate', max(remaining / self.window, MIN_RATE))
+
+
+_governors: Dict[Tuple[str, str], Optional[RateGovernor]] = {}
+_governors_lock = threading.Lock()
+
+
+def key_id(api_key: Optional[str]) -> str:
+    """Short stable identifier of an API key, so keys never end up in Redis"""
+    if not api_key:
+        return ''
+    return hashlib.sha256(str(api_key).encode('utf-8')).hexdigest()[:12]
+
+
+def get_governor(host: str, key: str = '') -> Optional[RateGovernor]:
+    """Governor configured for `host` and API key id, or None when it is not limited"""
+    try:
+        return _governors[(host, key)]
+    except KeyError:
+        pass
+    with _governors_lock:
+        if (host, key) not in _governors:
+            limit = getattr(settings, 'UPSTREAM_RATE_LIMITS', {}).get(host)
+            _governors[(host, key)] = RateGovernor(
+                f'{host}:{key}' if key else host,
+                limit['rate'], limit['burst'],
+                reserve=limit.get('reserve', 0.25),
+                window=limit.get('window', 3600),
+            ) if limit else None
+        return _governors[(host, key)]
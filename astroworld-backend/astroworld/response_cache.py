@@ -0,0 +1,96 @@
+"""
+Response caching for read-only API views.
+
+``cache_response`` stores the response data of a GET view under a key made
+of the path, the query string and the versions of the datasets the response
+is built from, so a sync that bumps a dataset makes every dependent entry
+unreachable. Responses carry a strong ``ETag`` of their JSON body and a
+``Cache-Control`` header; a matching ``If-None-Match`` gets a 304 without
+running the view.
+
+Views whose data embeds per-user state (``is_saved`` / ``is_tracked``) pass
+``per_user=True``: authenticated users get their own entries, keyed on a
+per-user version that changes with their saved and tracked items, and the
+response is marked private and varies on ``Authorization``. Like every
+dataset version it is stored in the database, so a save handled by one
+worker changes the key, and the ETag, seen by all of them.
+"""
+import functools
+import hashlib
+import json
+from typing import Iterable
+
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .versions import get_versions
+
+
+def user_items_dataset(user_id) -> str:
+    """Version counter of a user's saved and tracked items"""
+    return f'user_items_{user_id}'
+
+
+def _find_request(args):
+    for arg in args:
+        if isinstance(arg, (Request, HttpRequest)):
+            return arg
+    raise TypeError('cache_response needs a view receiving the request')
+
+
+def _etag_matches(request, etag: str) -> bool:
+    header = request.META.get('HTTP_IF_NONE_MATCH', '')
+    return etag in [value.strip() for value in header.split(',')] or header.strip() == '*'
+
+
+def cache_response(datasets: Iterable[str], timeout: int = 60 * 60, max_age: int = 60,
+                   per_user: bool = False):
+    """Cache a read view's response data, keyed on the versions of `datasets`"""
+    datasets = list(datasets)
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            request = _find_request(args)
+            if request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+
+            user = getattr(request, 'user', None)
+            user_id = user.pk if per_user and user is not None and user.is_authenticated else None
+            scope = datasets + ([user_items_dataset(user_id)] if user_id else [])
+            versions = sorted(get_versions(scope).items())
+            query = sorted(request.GET.lists())
+            digest = hashlib.sha256(f'{request.path}|{query}|{versions}|{user_id}'.encode('utf-8')).hexdigest()
+            cache_key = f'response_{digest}'
+
+            entry = cache.get(cache_key)
+            response = None
+            if entry is None:
+                response = view(*args, **kwargs)
+                if not isinstance(response, Response) or response.status_code != 200:
+                    return response
+                body = json.dumps(response.data, cls=JSONEncoder)
+                entry = {
+                    'data': json.loads(body),
+                    'etag': f'"{hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]}"',
+                }
+                cache.set(cache_key, entry, timeout)
+
+            if _etag_matches(request, entry['etag']):
+                response = HttpResponseNotModified()
+            elif response is None:
+                response = Response(entry['data'])
+            response['ETag'] = entry['etag']
+            if user_id:
+                patch_cache_control(response, private=True, max_age=max_age)
+            else:
+                patch_cache_control(response, public=True, max_age=max_age)
+            if per_user:
+                patch_vary_headers(response, ['Authorization'])
+            return response
+        return wrapper
+    return decorator
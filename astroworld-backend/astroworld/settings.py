@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from datetime import timedelta
 from pathlib import Path
 import os
+import sys
 
 import dj_database_url
 from dotenv import load_dotenv
@@ -61,6 +62,7 @@ if RENDER_EXTERNAL_HOSTNAME:
     if render_origin not in CSRF_TRUSTED_ORIGINS:
         CSRF_TRUSTED_ORIGINS.append(render_origin)
 CORS_ALLOW_CREDENTIALS = True
+CORS_EXPOSE_HEADERS = ['Server-Timing']
 
 
 # Application definition
@@ -85,6 +87,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'astroworld.instrumentation.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -138,47 +141,78 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
-if USE_CELERY:
-    try:
-        from celery.schedules import crontab
-        CELERY_BEAT_SCHEDULE = {
-            'sync-daily-nasa-data': {
-                'task': 'nasa_api.tasks.sync_daily_nasa_data',
-                'schedule': crontab(hour=2, minute=0),  # 2 AM daily
-            },
-            'sync-weekly-nasa-data': {
-                'task': 'nasa_api.tasks.sync_weekly_nasa_data',
-                'schedule': crontab(hour=3, minute=0, day_of_week=0),  # 3 AM Sundays
-            },
-            'send-neo-alerts': {
-                'task': 'nasa_api.tasks.send_neo_alerts',
-                'schedule': crontab(hour=9, minute=0),  # 9 AM daily
-            },
-            'cleanup-old-data': {
-                'task': 'nasa_api.tasks.cleanup_old_data',
-                'schedule': crontab(hour=4, minute=0, day_of_week=0),  # 4 AM Sundays
-            },
-            # Spaceflight News tasks
-            'sync-daily-spaceflight-news': {
-                'task': 'spaceflightnews.tasks.sync_daily_spaceflight_news',
-                'schedule': crontab(hour=1, minute=30),  # 1:30 AM daily
-            },
-            'sync-weekly-spaceflight-news': {
-                'task': 'spaceflightnews.tasks.sync_weekly_spaceflight_news',
-                'schedule': crontab(hour=1, minute=0, day_of_week=1),  # 1 AM Mondays
-            },
-            # Research Papers tasks
-            'sync-daily-research-papers': {
-                'task': 'research_papers.tasks.sync_daily_research_papers',
-                'schedule': crontab(hour=5, minute=0),  # 5 AM daily
-            },
-            'sync-weekly-research-papers': {
-                'task': 'research_papers.tasks.sync_weekly_research_papers',
-                'schedule': crontab(hour=5, minute=30, day_of_week=0),  # 5:30 AM Sundays
-            },
-        }
-    except ImportError:
-        pass  # Celery not installed
+# Periodic tasks, run by Celery beat or by `manage.py run_workers`
+try:
+    from celery.schedules import crontab
+    CELERY_BEAT_SCHEDULE = {
+        'sync-daily-nasa-data': {
+            'task': 'nasa_api.tasks.sync_daily_nasa_data',
+            'schedule': crontab(hour=2, minute=0),  # 2 AM daily
+        },
+        'sync-weekly-nasa-data': {
+            'task': 'nasa_api.tasks.sync_weekly_nasa_data',
+            'schedule': crontab(hour=3, minute=0, day_of_week=0),  # 3 AM Sundays
+        },
+        'sync-exoplanet-archive': {
+            'task': 'nasa_api.tasks.sync_exoplanet_archive',
+            'schedule': crontab(hour=2, minute=30),  # 2:30 AM daily
+        },
+        'send-neo-alerts': {
+            'task': 'nasa_api.tasks.send_neo_alerts',
+            'schedule': crontab(hour=9, minute=0),  # 9 AM daily
+        },
+        'cleanup-old-data': {
+            'task': 'nasa_api.tasks.cleanup_old_data',
+            'schedule': crontab(hour=4, minute=0, day_of_week=0),  # 4 AM Sundays
+        },
+        # Spaceflight News tasks
+        'sync-daily-spaceflight-news': {
+            'task': 'spaceflightnews.tasks.sync_daily_spaceflight_news',
+            'schedule': crontab(hour=1, minute=30),  # 1:30 AM daily
+        },
+        'sync-weekly-spaceflight-news': {
+            'task': 'spaceflightnews.tasks.sync_weekly_spaceflight_news',
+            'schedule': crontab(hour=1, minute=0, day_of_week=1),  # 1 AM Mondays
+        },
+        # Research Papers tasks
+        'sync-daily-research-papers': {
+            'task': 'research_papers.tasks.sync_daily_research_papers',
+            'schedule': crontab(hour=5, minute=0),  # 5 AM daily
+        },
+        'sync-weekly-research-papers': {
+            'task': 'research_papers.tasks.sync_weekly_research_papers',
+            'schedule': crontab(hour=5, minute=30, day_of_week=0),  # 5:30 AM Sundays
+        },
+        # Subscription and launch reminders (users.notifications)
+        'send-due-notifications': {
+            'task': 'users.tasks.send_due_notifications',
+            'schedule': crontab(minute='*/5'),  # Every 5 minutes
+        },
+    }
+except ImportError:
+    CELERY_BEAT_SCHEDULE = {}  # Celery not installed
+
+# Database job queue (nasa_api.jobs) for deployments without Celery: sync
+# views enqueue jobs instead of running inline, `manage.py run_workers` runs them
+SYNC_JOB_QUEUE = env_bool('SYNC_JOB_QUEUE', False)
+SYNC_JOB_POLL_INTERVAL = float(os.getenv('SYNC_JOB_POLL_INTERVAL', '5'))
+SYNC_JOB_MAX_ATTEMPTS = int(os.getenv('SYNC_JOB_MAX_ATTEMPTS', '3'))
+SYNC_JOB_HEARTBEAT = int(os.getenv('SYNC_JOB_HEARTBEAT', '60'))  # Seconds between lease renewals of a running job
+SYNC_JOB_LEASE = int(os.getenv('SYNC_JOB_LEASE', '600'))  # Seconds without a renewal before a running job is presumed dead
+
+# Notification dispatch (users.notifications): sources yield due reminders,
+# channels deliver them
+NOTIFICATION_SOURCES = {
+    'subscriptions': 'users.notifications.SubscriptionSource',
+    'launches': 'spacex_api.notifications.LaunchSource',
+}
+NOTIFICATION_CHANNELS = {
+    'email': 'users.notifications.EmailChannel',
+    'in_app': 'users.notifications.InAppChannel',
+}
+NOTIFICATION_BATCH_SIZE = int(os.getenv('NOTIFICATION_BATCH_SIZE', '200'))
+NOTIFICATION_CLAIM_LEASE = int(os.getenv('NOTIFICATION_CLAIM_LEASE', '600'))  # Seconds a claimed batch is held
+NOTIFICATION_RETRY_DELAY = int(os.getenv('NOTIFICATION_RETRY_DELAY', '900'))  # Seconds before an undeliverable row is retried
 
 # Email settings for notifications
 # Use console backend for development if EMAIL_HOST_USER is not set
@@ -189,11 +223,11 @@ if os.getenv('EMAIL_HOST_USER') and os.getenv('EMAIL_HOST_USER') != 'your-email@
     EMAIL_USE_TLS = env_bool('EMAIL_USE_TLS', True)
     EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
     EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
-    print(f"SMTP Email configured for: {EMAIL_HOST_USER}")
+    print(f"SMTP Email configured for: {EMAIL_HOST_USER}", file=sys.stderr)
 else:
     # For development - emails will be printed to console
     EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
-    print("Using console email backend - emails will be printed to terminal")
+    print("Using console email backend - emails will be printed to terminal", file=sys.stderr)
 
 # Logging
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -215,10 +249,82 @@ LOGGING = {
             'level': LOG_LEVEL,
             'propagate': True,
         },
+        # httpx logs every request at INFO
+        'httpx': {
+            'level': 'WARNING',
+        },
     },
 }
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@astroworld.dev')
 
+# Request instrumentation
+PERF_SERVER_TIMING = env_bool('PERF_SERVER_TIMING', True)
+PERF_SLOW_REQUEST_MS = int(os.getenv('PERF_SLOW_REQUEST_MS', '1000'))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+# Buffered API usage logging
+API_USAGE_BUFFER_SIZE = int(os.getenv('API_USAGE_BUFFER_SIZE', '100'))
+API_USAGE_FLUSH_INTERVAL = float(os.getenv('API_USAGE_FLUSH_INTERVAL', '5'))
+API_USAGE_ROLLUP = env_bool('API_USAGE_ROLLUP', True)
+API_USAGE_MAX_PENDING = int(os.getenv('API_USAGE_MAX_PENDING', '5000'))  # Records kept across failed flushes
+
+# Outbound calls (astroworld.upstream / astroworld.ratelimit)
+UPSTREAM_MAX_WORKERS = int(os.getenv('UPSTREAM_MAX_WORKERS', '8'))
+# Per host: requests per second, burst size, share of the burst background
+# work leaves for interactive requests, and the quota window of the
+# X-RateLimit-* headers in seconds
+UPSTREAM_RATE_LIMITS = {
+    'api.nasa.gov': {
+        'rate': float(os.getenv('NASA_API_RATE', '10')),
+        'burst': int(os.getenv('NASA_API_BURST', '20')),
+        'reserve': 0.25,
+        'window': 3600,
+    },
+    'images-api.nasa.gov': {'rate': 5, 'burst': 10},
+    'tle.ivanstanojevic.me': {'rate': 5, 'burst': 5},
+}
+# Seconds a request handler waits for a rate limit token before failing fast;
+# background work (syncs, Celery tasks) waits as long as needed
+UPSTREAM_INTERACTIVE_MAX_WAIT = float(os.getenv('UPSTREAM_INTERACTIVE_MAX_WAIT', '3'))
+# (connect, read) seconds for calls that set no timeout of their own
+UPSTREAM_TIMEOUT = (
+    float(os.getenv('UPSTREAM_CONNECT_TIMEOUT', '5')),
+    float(os.getenv('UPSTREAM_READ_TIMEOUT', '30')),
+)
+# Circuit breaker per upstream host (astroworld.circuit), with per-host overrides
+UPSTREAM_CIRCUIT_BREAKER = {
+    'failure_threshold': int(os.getenv('UPSTREAM_BREAKER_FAILURES', '5')),
+    'reset_timeout': float(os.getenv('UPSTREAM_BREAKER_RESET', '30')),
+    'half_open_max_calls': 1,
+}
+UPSTREAM_CIRCUIT_BREAKER_HOSTS = {
+    'tle.ivanstanojevic.me': {'failure_threshold': 2, 'reset_timeout': 120},
+}
+UPSTREAM_NEGATIVE_CACHE_TTL = int(os.getenv('UPSTREAM_NEGATIVE_CACHE_TTL', '30'))
+
+# Downloaded image variants (nasa_api.image_derivatives)
+IMAGE_DERIVATIVE_DIR = os.getenv('IMAGE_DERIVATIVE_DIR', str(BASE_DIR / 'image_cache'))
+EPIC_DERIVATIVES_ON_SYNC = env_bool('EPIC_DERIVATIVES_ON_SYNC', True)
+
+# Image proxy (nasa_api.image_proxy)
+IMAGE_PROXY_DIR = os.getenv('IMAGE_PROXY_DIR', str(BASE_DIR / 'image_proxy_cache'))
+IMAGE_PROXY_MAX_BYTES = int(os.getenv('IMAGE_PROXY_MAX_BYTES', str(1024 ** 3)))  # 1 GB
+IMAGE_PROXY_MAX_SOURCE_BYTES = int(os.getenv('IMAGE_PROXY_MAX_SOURCE_BYTES', str(25 * 1024 ** 2)))
+IMAGE_PROXY_PREWARM = env_bool('IMAGE_PROXY_PREWARM', True)
+# Hosts (and their subdomains) the proxy may fetch from
+IMAGE_PROXY_ALLOWED_HOSTS = [
+    'nasa.gov',
+    'imgur.com',
+    'imgbox.com',
+    'staticflickr.com',
+    'flickr.com',
+]
+
+# Data retention (nasa_api.retention)
+RETENTION_BATCH_SIZE = int(os.getenv('RETENTION_BATCH_SIZE', '1000'))
+RETENTION_ARCHIVE = env_bool('RETENTION_ARCHIVE', False)
+RETENTION_ARCHIVE_DIR = os.getenv('RETENTION_ARCHIVE_DIR', str(BASE_DIR / 'archive'))
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -295,14 +401,14 @@ REDIS_URL = os.getenv('REDIS_URL')
 if REDIS_URL:
     CACHES = {
         'default': {
-            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'BACKEND': 'astroworld.instrumentation.InstrumentedRedisCache',
             'LOCATION': REDIS_URL,
         }
     }
 else:
     CACHES = {
         'default': {
-            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'BACKEND': 'astroworld.instrumentation.InstrumentedLocMemCache',
             'LOCATION': 'astroworld-cache',
             'OPTIONS': {
                 'MAX_ENTRIES': 1000,
@@ -0,0 +1,212 @@
+"""
+Shared HTTP session for calls to external APIs.
+
+All service sessions go through ``UpstreamSession`` so that outbound time is
+attributed per upstream host to the request being served and to the
+process-wide metrics, and calls respect the per-host rate limits, which
+adapt to the quota headers of each response. Every call gets a timeout and
+goes through the host's circuit breaker, so a failing upstream is rejected
+quickly instead of tying up workers until the timeout.
+
+Polls can use ``get_if_modified`` to send the ``ETag`` / ``Last-Modified``
+validators of the last processed response; a 304 raises ``NotModified`` so
+the caller skips parsing and storing entirely.
+
+Async views fan out through ``AsyncUpstreamClient`` instead, which applies the
+same negative cache, circuit breakers, rate limits and timing on top of
+``httpx.AsyncClient``. Under WSGI, Django runs each async view in its own
+short-lived event loop, so clients never outlive a request: calls inside an
+``async_client_scope`` share one pooled client that is closed when the block
+exits, and calls outside any scope open and close their own.
+"""
+import contextlib
+import contextvars
+import time
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from django.conf import settings
+from django.apps import apps
+from django.core.cache import cache
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from .circuit import (
+    UpstreamUnavailable, get_breaker, negative_cache_key, remember_failure, request_key
+)
+from .instrumentation import record_outbound
+from .ratelimit import get_governor, key_id
+
+
+class NotModified(Exception):
+    """The upstream resource is unchanged since its validators were stored"""
+
+
+class UpstreamSession(requests.Session):
+    """requests.Session that records outbound time per upstream host"""
+
+    def __init__(self):
+        super().__init__()
+        # Enough pooled connections for the concurrent sync workers
+        pool_size = getattr(settings, 'UPSTREAM_MAX_WORKERS', 8) * 2
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        host = urlsplit(url).hostname or 'unknown'
+        params = kwargs.get('params')
+        failure_key = negative_cache_key(method, url, params) if method.upper() == 'GET' else None
+        if failure_key:
+            reason = cache.get(failure_key)
+            if reason is not None:
+                raise UpstreamUnavailable(f"{host} failed recently for this request: {reason}")
+        governor = get_governor(host, key_id(params.get('api_key') if isinstance(params, dict) else None))
+        if governor and not governor.acquire():
+            raise UpstreamUnavailable(f"Rate limit for {host} exhausted")
+        breaker = get_breaker(host)
+        if not breaker.allow():
+            raise UpstreamUnavailable(f"Circuit open for {host}")
+
+        kwargs['timeout'] = _timeout(kwargs.get('timeout'))
+        start = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            breaker.record_failure()
+            if failure_key:
+                remember_failure(failure_key, type(e).__name__)
+            raise
+        except requests.exceptions.RequestException:
+            # e.g. a truncated body or a redirect loop
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        finally:
+            record_outbound(host, time.perf_counter() - start)
+
+        if response.status_code >= 500:
+            breaker.record_failure()
+            if failure_key:
+                remember_failure(failure_key, f'HTTP {response.status_code}')
+        else:
+            breaker.record_success()
+        if governor:
+            governor.observe(response)
+        return response
+
+    def get_if_modified(self, url, params=None, **kwargs):
+        """
+        Conditional GET using the validators stored for this URL and params.
+        
+        Returns the response and a callable that stores its validators; call
+        it once the response has been processed, so a failed run is never
+        skipped as unchanged next time. Raises NotModified on 304.
+        """
+        UpstreamValidator = apps.get_model('nasa_api', 'UpstreamValidator')
+        key = request_key('GET', url, params)
+        validator = UpstreamValidator.objects.filter(key=key).first()
+        headers = dict(kwargs.pop('headers', None) or {})
+        if validator:
+            if validator.etag:
+                headers['If-None-Match'] = validator.etag
+            if validator.last_modified:
+                headers['If-Modified-Since'] = validator.last_modified
+        
+        response = self.get(url, params=params, headers=headers, **kwargs)
+        if response.status_code == 304:
+            UpstreamValidator.objects.filter(key=key).update(checked_at=timezone.now())
+            raise NotModified(url)
+        
+        def remember():
+            etag = response.headers.get('ETag', '')
+            last_modified = response.headers.get('Last-Modified', '')
+            if response.ok and (etag or last_modified):
+                UpstreamValidator.objects.update_or_create(
+                    key=key,
+                    defaults={'url': url, 'etag': etag[:255], 'last_modified': last_modified[:64]}
+                )
+        return response, remember
+
+
+_async_client = contextvars.ContextVar('upstream_async_client', default=None)
+
+
+@contextlib.asynccontextmanager
+async def async_client_scope():
+    """Share one pooled client among the calls inside the block, closing it on exit"""
+    client = _async_client.get()
+    if client is not None:
+        yield client
+        return
+    pool_size = getattr(settings, 'UPSTREAM_MAX_WORKERS', 8) * 2
+    async with httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        follow_redirects=True,
+    ) as client:
+        token = _async_client.set(client)
+        try:
+            yield client
+        finally:
+            _async_client.reset(token)
+
+
+class AsyncUpstreamClient:
+    """Async GETs with the guarantees of UpstreamSession"""
+
+    async def get(self, url, params=None, timeout=None, **kwargs) -> httpx.Response:
+        host = urlsplit(url).hostname or 'unknown'
+        failure_key = negative_cache_key('GET', url, params)
+        reason = await cache.aget(failure_key)
+        if reason is not None:
+            raise UpstreamUnavailable(f"{host} failed recently for this request: {reason}")
+        governor = get_governor(host, key_id(params.get('api_key') if isinstance(params, dict) else None))
+        if governor and not await governor.acquire_async():
+            raise UpstreamUnavailable(f"Rate limit for {host} exhausted")
+        breaker = get_breaker(host)
+        if not breaker.allow():
+            raise UpstreamUnavailable(f"Circuit open for {host}")
+
+        connect, read = _timeout(timeout)
+        start = time.perf_counter()
+        try:
+            async with async_client_scope() as client:
+                response = await client.get(
+                    url, params=params, timeout=httpx.Timeout(read, connect=connect), **kwargs
+                )
+        except httpx.TransportError as e:
+            breaker.record_failure()
+            remember_failure(failure_key, type(e).__name__)
+            raise
+        except httpx.HTTPError:
+            # e.g. an undecodable body or a redirect loop
+            breaker.record_failure()
+            raise
+        except BaseException:
+            # e.g. CancelledError when the client disconnects
+            breaker.release()
+            raise
+        finally:
+            record_outbound(host, time.perf_counter() - start)
+
+        if response.status_code >= 500:
+            breaker.record_failure()
+            remember_failure(failure_key, f'HTTP {response.status_code}')
+        else:
+            breaker.record_success()
+        if governor:
+            governor.observe(response)
+        return response
+
+
+def _timeout(timeout):
+    """(connect, read) timeout; a single value bounds the read, connects fail sooner"""
+    connect, read = getattr(settings, 'UPSTREAM_TIMEOUT', (5, 30))
+    if timeout is None:
+        return connect, read
+    if isinstance(timeout, (int, float)):
+        return min(connect, timeout), timeout
+    return timeout
@@ -22,6 +22,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('', views.homepage, name='home'),
     path('healthz/', views.healthz, name='healthz'),
+    path('internal/metrics/', views.internal_metrics, name='internal-metrics'),
     path('api/users/', include('users.urls')),
     path('api/nasa/', include('nasa_api.urls')),
     path('api/spacex/', include('spacex_api.urls')),
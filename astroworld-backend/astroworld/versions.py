@@ -0,0 +1,145 @@
+"""
+Dataset version registry.
+
+Every dataset in ``DATASETS`` has a counter, a ``nasa_api.DatasetVersion``
+row, that is bumped whenever its data changes: after each sync run
+(``nasa_api.sync.track_sync``), after retention deletes rows, and from the
+``bump_dataset_versions`` command for upstream data that is only proxied.
+Bumps made inside a transaction take effect once it commits, so no reader
+can cache pre-commit data under the new version. The counters live in the
+database rather than the cache so that every process sees a bump at once,
+even when the default cache is per-process.
+
+Cache keys built with ``versioned_key`` embed the versions of the datasets
+the entry was computed from, so entries are never served stale and can use
+long timeouts; old entries simply become unreachable and expire. A new
+counter starts at the current time in milliseconds, so a recreated row
+never falls back to a value an older entry was keyed on.
+"""
+import hashlib
+import time
+from typing import Dict, Iterable, List
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+DATASETS = {
+    # NASA
+    'apod': 'Astronomy Picture of the Day',
+    'neo': 'Near-Earth objects and close approaches',
+    'mars_photos': 'Mars rover photos',
+    'epic': 'EPIC Earth images',
+    'exoplanets': 'Exoplanet Archive planets',
+    'space_weather': 'DONKI space weather events',
+    'natural_events': 'EONET natural events',
+    'space_events': 'Space events calendar',
+    'nasa_media': 'NASA Image and Video Library (proxied)',
+    'gibs': 'GIBS imagery layers (proxied)',
+    'tle': 'Satellite TLEs (proxied)',
+    # Launch Library
+    'launch_library': 'Launch Library launches',
+    'launch_library_events': 'Launch Library events',
+    # Spaceflight News
+    'spaceflight_news': 'Spaceflight News articles, blogs and reports',
+    'spaceflight_news_content': 'Spaceflight News article bodies',
+    # SpaceX
+    'spacex_rockets': 'SpaceX rockets',
+    'spacex_launches': 'SpaceX launches',
+    'spacex_launchpads': 'SpaceX launchpads',
+    'spacex_capsules': 'SpaceX capsules',
+    'spacex_cores': 'SpaceX cores',
+    'spacex_missions': 'SpaceX missions',
+    'spacex_history': 'SpaceX history events',
+    'spacex_starlink': 'Starlink satellites',
+    # Research papers
+    'research_papers': 'Research papers',
+}
+
+# Families of datasets created on demand, e.g. one per user
+DYNAMIC_PREFIXES = ('user_items_',)
+
+
+def _check(dataset: str):
+    if dataset not in DATASETS and not dataset.startswith(DYNAMIC_PREFIXES):
+        raise ValueError(f"Unknown dataset '{dataset}'")
+
+
+def _seed() -> int:
+    return int(time.time() * 1000)
+
+
+def _model():
+    from nasa_api.models import DatasetVersion
+    return DatasetVersion
+
+
+def _names(datasets: Iterable[str]) -> List[str]:
+    names = list(dict.fromkeys(datasets))
+    for dataset in names:
+        _check(dataset)
+    return names
+
+
+def get_versions(datasets: Iterable[str]) -> Dict[str, int]:
+    """Current version of each dataset, in one query when all exist"""
+    names = _names(datasets)
+    DatasetVersion = _model()
+    versions = dict(DatasetVersion.objects.filter(name__in=names).values_list('name', 'version'))
+    missing = [name for name in names if name not in versions]
+    if missing:
+        DatasetVersion.objects.bulk_create(
+            [DatasetVersion(name=name, version=_seed()) for name in missing], ignore_conflicts=True
+        )
+        versions.update(DatasetVersion.objects.filter(name__in=missing).values_list('name', 'version'))
+    return {name: versions[name] for name in names}
+
+
+async def aget_versions(datasets: Iterable[str]) -> Dict[str, int]:
+    """Async variant of `get_versions` for async views"""
+    names = _names(datasets)
+    DatasetVersion = _model()
+    versions = {
+        name: version async for name, version
+        in DatasetVersion.objects.filter(name__in=names).values_list('name', 'version')
+    }
+    missing = [name for name in names if name not in versions]
+    if missing:
+        await DatasetVersion.objects.abulk_create(
+            [DatasetVersion(name=name, version=_seed()) for name in missing], ignore_conflicts=True
+        )
+        versions.update({
+            name: version async for name, version
+            in DatasetVersion.objects.filter(name__in=missing).values_list('name', 'version')
+        })
+    return {name: versions[name] for name in names}
+
+
+def _increment(dataset: str):
+    DatasetVersion = _model()
+    counter = DatasetVersion.objects.filter(name=dataset)
+    if not counter.update(version=F('version') + 1, updated_at=timezone.now()):
+        # Create the row first; if another process just did, still move it
+        DatasetVersion.objects.bulk_create([DatasetVersion(name=dataset, version=_seed())], ignore_conflicts=True)
+        counter.update(version=F('version') + 1, updated_at=timezone.now())
+
+
+def bump(dataset: str):
+    """Move a dataset to a new version once the current transaction commits"""
+    _check(dataset)
+    transaction.on_commit(lambda: _increment(dataset))
+
+
+def _versioned_key(prefix: str, versions: Dict[str, int], parts) -> str:
+    digest = hashlib.sha256(f'{parts}|{sorted(versions.items())}'.encode('utf-8')).hexdigest()[:32]
+    return f'{prefix}_{digest}'
+
+
+def versioned_key(prefix: str, datasets: Iterable[str], *parts) -> str:
+    """Cache key for an entry built from `datasets`, identified by `parts`"""
+    return _versioned_key(prefix, get_versions(datasets), parts)
+
+
+async def aversioned_key(prefix: str, datasets: Iterable[str], *parts) -> str:
+    """Async variant of `versioned_key`"""
+    return _versioned_key(prefix, await aget_versions(datasets), parts)
@@ -1,4 +1,12 @@
+import hmac
+
+from django.conf import settings
 from django.http import HttpResponse
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .instrumentation import metrics_registry
 
 def homepage(request):
     return HttpResponse("Welcome to the Astroworld Homepage!")
@@ -6,3 +14,19 @@ def homepage(request):
 
 def healthz(request):
     return HttpResponse("ok")
+
+
+class HasMetricsToken(permissions.BasePermission):
+    """Allow scrapers presenting the configured METRICS_TOKEN"""
+
+    def has_permission(self, request, view):
+        token = getattr(settings, 'METRICS_TOKEN', None)
+        supplied = request.headers.get('X-Metrics-Token', '')
+        return bool(token) and hmac.compare_digest(token, supplied)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser | HasMetricsToken])
+def internal_metrics(request):
+    """Per-endpoint latency histograms and upstream timings for this process"""
+    return Response(metrics_registry.snapshot())
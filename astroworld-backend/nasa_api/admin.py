@@ -2,7 +2,8 @@ from django.contrib import admin
 from .models import (
     APOD, NearEarthObject, NEOCloseApproach, MarsRover, MarsRoverPhoto,
     EPICImage, Exoplanet, SpaceWeatherEvent, NaturalEvent, NaturalEventGeometry,
-    UserSavedItem, UserTrackedObject, APIUsageLog
+    UserSavedItem, UserTrackedObject, APIUsageLog, APIUsageRollup, SyncState, DataCoverage,
+    UpstreamValidator, SyncJob, NEOAlertDelivery, DatasetVersion
 )
 
 
@@ -98,4 +99,49 @@ class APIUsageLogAdmin(admin.ModelAdmin):
     list_display = ['endpoint', 'user', 'timestamp', 'status_code', 'response_time']
     list_filter = ['endpoint', 'status_code', 'timestamp']
     search_fields = ['endpoint', 'user__username']
-    date_hierarchy = 'timestamp'
\ No newline at end of file
+    date_hierarchy = 'timestamp'
+
+
+@admin.register(APIUsageRollup)
+class APIUsageRollupAdmin(admin.ModelAdmin):
+    list_display = ['endpoint', 'bucket', 'request_count', 'error_count', 'max_response_time']
+    list_filter = ['endpoint']
+    date_hierarchy = 'bucket'
+
+
+@admin.register(SyncState)
+class SyncStateAdmin(admin.ModelAdmin):
+    list_display = ['dataset', 'last_success_at', 'last_failure_at', 'last_item_count']
+    search_fields = ['dataset']
+
+
+@admin.register(DataCoverage)
+class DataCoverageAdmin(admin.ModelAdmin):
+    list_display = ['dataset', 'scope', 'start_date', 'end_date', 'updated_at']
+    list_filter = ['dataset', 'scope']
+
+
+@admin.register(DatasetVersion)
+class DatasetVersionAdmin(admin.ModelAdmin):
+    list_display = ['name', 'version', 'updated_at']
+    search_fields = ['name']
+
+
+@admin.register(UpstreamValidator)
+class UpstreamValidatorAdmin(admin.ModelAdmin):
+    list_display = ['url', 'etag', 'last_modified', 'checked_at']
+    search_fields = ['url']
+
+
+@admin.register(SyncJob)
+class SyncJobAdmin(admin.ModelAdmin):
+    list_display = ['task', 'status', 'attempts', 'run_after', 'locked_by', 'finished_at']
+    list_filter = ['status', 'schedule_entry']
+    search_fields = ['task']
+
+
+@admin.register(NEOAlertDelivery)
+class NEOAlertDeliveryAdmin(admin.ModelAdmin):
+    list_display = ['user', 'approach', 'sent_at']
+    search_fields = ['user__username']
+    date_hierarchy = 'sent_at'
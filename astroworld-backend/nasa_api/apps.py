@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class NasaApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'nasa_api'
+
+    def ready(self):
+        # Connect sync_completed and model signal receivers
+        from . import image_proxy, signals  # noqa: F401
@@ -0,0 +1,102 @@
+"""
+Coverage registry for locally stored datasets.
+
+``DataCoverage`` rows record the date ranges for which a dataset (optionally
+per scope, such as a rover or a DONKI event type) has been fetched
+completely. Read-through endpoints ask for the ``missing_ranges`` of a
+request, fetch only those slices upstream, store them and ``mark_covered``
+the slices, so repeated requests are answered from the database.
+"""
+from datetime import date, timedelta
+from typing import List, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import DataCoverage
+
+DateRange = Tuple[date, date]
+
+# Days before today that are still being filled upstream and are never
+# recorded as complete
+SETTLE_DAYS = {
+    'epic': 2,
+    'space_weather': 1,
+    'mars_photos': 1,
+    # Approaches from today on are predictions that gain objects and change
+    'neo': 1,
+}
+
+ONE_DAY = timedelta(days=1)
+
+
+def _settled_end(dataset: str, end: date) -> date:
+    settle = SETTLE_DAYS.get(dataset)
+    if settle is None:
+        return end
+    return min(end, timezone.now().date() - timedelta(days=settle))
+
+
+def mark_covered(dataset: str, start: date, end: date, scope: str = '') -> None:
+    """Record [start, end] as complete, merging with overlapping or adjacent ranges"""
+    end = _settled_end(dataset, end)
+    if start > end:
+        return
+
+    with transaction.atomic():
+        ranges = DataCoverage.objects.select_for_update().filter(
+            dataset=dataset, scope=scope,
+            start_date__lte=end + ONE_DAY, end_date__gte=start - ONE_DAY
+        )
+        merged = list(ranges)
+        if merged:
+            start = min([start] + [item.start_date for item in merged])
+            end = max([end] + [item.end_date for item in merged])
+            keep, extra = merged[0], merged[1:]
+            if extra:
+                DataCoverage.objects.filter(pk__in=[item.pk for item in extra]).delete()
+            keep.start_date, keep.end_date = start, end
+            keep.save(update_fields=['start_date', 'end_date', 'updated_at'])
+        else:
+            DataCoverage.objects.create(dataset=dataset, scope=scope, start_date=start, end_date=end)
+
+
+def missing_ranges(dataset: str, start: date, end: date, scope: str = '') -> List[DateRange]:
+    """Sub-ranges of [start, end] that are not covered yet"""
+    covered = DataCoverage.objects.filter(
+        dataset=dataset, scope=scope, start_date__lte=end, end_date__gte=start
+    ).order_by('start_date').values_list('start_date', 'end_date')
+
+    missing = []
+    cursor = start
+    for covered_start, covered_end in covered:
+        if covered_start > cursor:
+            missing.append((cursor, covered_start - ONE_DAY))
+        cursor = max(cursor, covered_end + ONE_DAY)
+        if cursor > end:
+            break
+    if cursor <= end:
+        missing.append((cursor, end))
+    return missing
+
+
+def is_covered(dataset: str, start: date, end: date = None, scope: str = '') -> bool:
+    return not missing_ranges(dataset, start, end or start, scope)
+
+
+def forget_before(dataset: str, cutoff: date) -> int:
+    """Drop coverage before `cutoff`, e.g. after retention deleted those rows"""
+    with transaction.atomic():
+        removed, _ = DataCoverage.objects.filter(dataset=dataset, end_date__lt=cutoff).delete()
+        DataCoverage.objects.filter(dataset=dataset, start_date__lt=cutoff).update(start_date=cutoff)
+    return removed
+
+
+def split_range(start: date, end: date, max_days: int) -> List[DateRange]:
+    """Split [start, end] into chunks of at most `max_days` days"""
+    chunks = []
+    while start <= end:
+        chunk_end = min(start + timedelta(days=max_days - 1), end)
+        chunks.append((start, chunk_end))
+        start = chunk_end + ONE_DAY
+    return chunks
@@ -0,0 +1,172 @@
+"""
+Dashboard data.
+
+The global part of the dashboard (latest APOD, upcoming NEOs, featured events,
+latest Mars photos) is serialized once into a cached snapshot keyed on the
+versions of its datasets, so a sync of any of them makes it unreachable.
+Per-user state is then loaded in a fixed number of queries and overlaid on a
+copy of the snapshot.
+"""
+import copy
+import logging
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from astroworld.versions import versioned_key
+
+from .models import (
+    APOD, NearEarthObject, NEOCloseApproach, MarsRoverPhoto, Exoplanet,
+    SpaceEvent, UserSavedItem, UserTrackedObject
+)
+from .serializers import (
+    APODSerializer, NEOSerializer, MarsRoverPhotoSerializer, SpaceEventSerializer,
+    UserSavedItemSerializer, UserTrackedObjectSerializer
+)
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_SNAPSHOT_KEY = 'dashboard_snapshot'
+DASHBOARD_SNAPSHOT_TTL = 60 * 60  # Upcoming items move with time; syncs invalidate it sooner
+
+# Datasets the snapshot is built from
+DASHBOARD_DATASETS = [
+    'apod', 'neo', 'mars_photos', 'space_events', 'launch_library', 'launch_library_events'
+]
+
+# Snapshot section -> item_type used by UserSavedItem / UserTrackedObject
+SNAPSHOT_ITEM_TYPES = {
+    'upcoming_neos': 'neo',
+    'mars_photos': 'mars_photo',
+    'featured_events': 'space_event',
+}
+
+# item_type -> queryset used to load saved/tracked objects in bulk
+ITEM_QUERYSETS = {
+    'apod': lambda: APOD.objects.all(),
+    'neo': lambda: NearEarthObject.objects.prefetch_related('close_approaches'),
+    'mars_photo': lambda: MarsRoverPhoto.objects.select_related('rover'),
+    'exoplanet': lambda: Exoplanet.objects.all(),
+}
+
+
+def _upcoming_neos(limit: int = 3):
+    """NEOs with the soonest upcoming close approaches"""
+    approaching_ids = []
+    approaches = NEOCloseApproach.objects.filter(
+        close_approach_date__gte=timezone.now()
+    ).order_by('close_approach_date').values_list('neo_id', flat=True)
+    for neo_id in approaches[:limit * 10]:
+        if neo_id not in approaching_ids:
+            approaching_ids.append(neo_id)
+        if len(approaching_ids) == limit:
+            break
+
+    neos = NearEarthObject.objects.filter(pk__in=approaching_ids).prefetch_related('close_approaches')
+    return sorted(neos, key=lambda neo: approaching_ids.index(neo.pk))
+
+
+def build_dashboard_snapshot():
+    """Serialize the user-independent dashboard content"""
+    latest_apod = APOD.objects.first()
+    featured_events = SpaceEvent.objects.filter(
+        is_featured=True,
+        event_date__gte=timezone.now()
+    ).order_by('event_date')[:5]
+    recent_mars_photos = MarsRoverPhoto.objects.select_related('rover').order_by('-earth_date')[:5]
+
+    return {
+        'apod': dict(APODSerializer(latest_apod).data) if latest_apod else None,
+        'upcoming_neos': list(NEOSerializer(_upcoming_neos(), many=True).data),
+        'featured_events': list(SpaceEventSerializer(featured_events, many=True).data),
+        'mars_photos': list(MarsRoverPhotoSerializer(recent_mars_photos, many=True).data),
+        'generated_at': timezone.now().isoformat(),
+    }
+
+
+def get_dashboard_snapshot():
+    """Cached global dashboard content"""
+    cache_key = versioned_key(DASHBOARD_SNAPSHOT_KEY, DASHBOARD_DATASETS)
+    snapshot = cache.get(cache_key)
+    if snapshot is None:
+        snapshot = build_dashboard_snapshot()
+        cache.set(cache_key, snapshot, DASHBOARD_SNAPSHOT_TTL)
+    return snapshot
+
+
+def _snapshot_keys(snapshot):
+    keys = set()
+    if snapshot['apod']:
+        keys.add(('apod', snapshot['apod']['nasa_id']))
+    for section, item_type in SNAPSHOT_ITEM_TYPES.items():
+        keys.update((item_type, item['nasa_id']) for item in snapshot[section])
+    return keys
+
+
+def _load_items(keys):
+    """Load saved/tracked objects grouped by type, one query per type"""
+    ids_by_type = defaultdict(set)
+    for item_type, item_id in keys:
+        if item_type in ITEM_QUERYSETS:
+            ids_by_type[item_type].add(item_id)
+
+    objects = {}
+    for item_type, ids in ids_by_type.items():
+        for item in ITEM_QUERYSETS[item_type]().filter(nasa_id__in=ids):
+            objects[(item_type, item.nasa_id)] = item
+    return objects
+
+
+def build_user_dashboard(request):
+    """Dashboard payload for the requesting user"""
+    user = request.user
+    snapshot = get_dashboard_snapshot()
+
+    recent_saves = list(UserSavedItem.objects.filter(user=user).order_by('-saved_at')[:5])
+    recent_tracking = list(UserTrackedObject.objects.filter(user=user).order_by('-created_at')[:5])
+
+    recent_keys = {(save.item_type, save.item_id) for save in recent_saves}
+    recent_keys.update((tracked.object_type, tracked.object_id) for tracked in recent_tracking)
+    item_objects = _load_items(recent_keys)
+
+    # Saved/tracked state for everything shown, in one query each
+    candidate_keys = _snapshot_keys(snapshot) | set(item_objects)
+    candidate_ids = {item_id for _, item_id in candidate_keys}
+    saved_items = set(
+        UserSavedItem.objects.filter(user=user, item_id__in=candidate_ids)
+        .values_list('item_type', 'item_id')
+    ) | {(save.item_type, save.item_id) for save in recent_saves}
+    tracked_objects = set(
+        UserTrackedObject.objects.filter(user=user, object_id__in=candidate_ids)
+        .values_list('object_type', 'object_id')
+    ) | {(tracked.object_type, tracked.object_id) for tracked in recent_tracking}
+
+    context = {
+        'request': request,
+        'saved_items': saved_items,
+        'tracked_objects': tracked_objects,
+        'item_objects': item_objects,
+    }
+
+    latest_content = copy.deepcopy(snapshot)
+    if latest_content['apod']:
+        latest_content['apod']['is_saved'] = ('apod', latest_content['apod']['nasa_id']) in saved_items
+    for section, item_type in SNAPSHOT_ITEM_TYPES.items():
+        for item in latest_content[section]:
+            key = (item_type, item['nasa_id'])
+            item['is_saved'] = key in saved_items
+            if 'is_tracked' in item:
+                item['is_tracked'] = key in tracked_objects
+
+    return {
+        'user_stats': {
+            'favorites_count': UserSavedItem.objects.filter(user=user).count(),
+            'tracking_count': UserTrackedObject.objects.filter(user=user).count(),
+        },
+        'recent_activity': {
+            'saves': UserSavedItemSerializer(recent_saves, many=True, context=context).data,
+            'tracking': UserTrackedObjectSerializer(recent_tracking, many=True, context=context).data,
+        },
+        'latest_content': latest_content,
+    }
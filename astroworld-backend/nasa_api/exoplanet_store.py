@@ -0,0 +1,205 @@
+"""
+In-process columnar exoplanet store.
+
+The exoplanet catalogue is small (a few thousand rows) and read-heavy, so it
+is loaded once into NumPy arrays, one per field, and every list, search,
+range, histogram and scatter query is answered with vectorized masks instead
+of a database round trip. Snapshots are tagged with the ``exoplanets``
+dataset version (``astroworld.versions``), so once a sync bumps it every
+worker process reloads on its next read.
+"""
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from astroworld.versions import bump, get_versions
+
+from .models import Exoplanet, UserSavedItem, UserTrackedObject
+from .serializers import ExoplanetSerializer
+
+logger = logging.getLogger(__name__)
+
+STORE_DATASET = 'exoplanets'
+
+# Query parameter name -> numeric model field
+NUMERIC_FIELDS = {
+    'radius': 'planet_radius',
+    'mass': 'planet_mass',
+    'period': 'orbital_period',
+    'distance': 'distance_from_earth',
+    'temperature': 'equilibrium_temperature',
+    'discovery_year': 'discovery_year',
+}
+
+TEXT_FIELDS = ['name', 'host_star', 'discovery_method']
+
+
+class ExoplanetSnapshot:
+    """Immutable column arrays for one load of the catalogue"""
+
+    def __init__(self, version, rows: List[Dict], columns: Dict[str, np.ndarray]):
+        self.version = version
+        self.rows = rows
+        self.columns = columns
+        self.size = len(rows)
+
+    @classmethod
+    def load(cls, version):
+        planets = list(Exoplanet.objects.order_by('-discovery_year', 'name'))
+        # Serialized once without a request, user flags are overlaid per request
+        rows = ExoplanetSerializer(
+            planets, many=True, context={'saved_items': set(), 'tracked_objects': set()}
+        ).data
+        rows = [dict(row) for row in rows]
+
+        columns = {}
+        for field in NUMERIC_FIELDS.values():
+            columns[field] = np.array(
+                [getattr(planet, field) for planet in planets], dtype=np.float64
+            )  # None becomes NaN, which never matches a range
+        for field in TEXT_FIELDS:
+            columns[field] = np.array([(getattr(planet, field) or '').lower() for planet in planets], dtype=str)
+        columns['is_habitable_zone'] = np.array([planet.is_habitable_zone for planet in planets], dtype=bool)
+        return cls(version, rows, columns)
+
+    def select(self, ranges: Dict[str, Tuple[Optional[float], Optional[float]]] = None,
+               habitable: Optional[bool] = None, discovery_method: str = None,
+               query: str = None) -> np.ndarray:
+        """Positions of rows matching every filter, in catalogue order"""
+        mask = np.ones(self.size, dtype=bool)
+        for name, (low, high) in (ranges or {}).items():
+            values = self.columns[NUMERIC_FIELDS[name]]
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+        if habitable is not None:
+            mask &= self.columns['is_habitable_zone'] == habitable
+        if discovery_method:
+            mask &= np.char.find(self.columns['discovery_method'], discovery_method.lower()) >= 0
+        if query:
+            query = query.lower()
+            matches = np.zeros(self.size, dtype=bool)
+            for field in TEXT_FIELDS:
+                matches |= np.char.find(self.columns[field], query) >= 0
+            mask &= matches
+        return np.flatnonzero(mask)
+
+    def histogram(self, field: str, positions: np.ndarray, bins: int = 20, log: bool = False) -> Dict:
+        values = self.columns[NUMERIC_FIELDS[field]][positions]
+        values = values[np.isfinite(values)]
+        if log:
+            values = np.log10(values[values > 0])
+        if not values.size:
+            return {'field': field, 'log': log, 'count': 0, 'counts': [], 'edges': []}
+
+        counts, edges = np.histogram(values, bins=bins)
+        if log:
+            edges = np.power(10.0, edges)
+        return {
+            'field': field,
+            'log': log,
+            'count': int(values.size),
+            'counts': counts.tolist(),
+            'edges': edges.tolist(),
+        }
+
+    def scatter(self, x: str, y: str, positions: np.ndarray, max_points: int = 2000,
+                log_x: bool = False, log_y: bool = False) -> Dict:
+        """Points for an x/y plot, thinned to one point per grid cell when there are too many"""
+        xs = self.columns[NUMERIC_FIELDS[x]][positions]
+        ys = self.columns[NUMERIC_FIELDS[y]][positions]
+        valid = np.isfinite(xs) & np.isfinite(ys)
+        if log_x:
+            valid &= xs > 0
+        if log_y:
+            valid &= ys > 0
+        positions, xs, ys = positions[valid], xs[valid], ys[valid]
+        total = int(positions.size)
+
+        if total > max_points:
+            # Grid binning keeps outliers that random sampling would drop
+            grid_x = np.log10(xs) if log_x else xs
+            grid_y = np.log10(ys) if log_y else ys
+            cells = int(np.sqrt(max_points))
+            ix = _grid_index(grid_x, cells)
+            iy = _grid_index(grid_y, cells)
+            _, keep = np.unique(ix * cells + iy, return_index=True)
+            keep.sort()
+            positions, xs, ys = positions[keep], xs[keep], ys[keep]
+
+        points = [
+            {
+                'x': float(px),
+                'y': float(py),
+                'nasa_id': self.rows[position]['nasa_id'],
+                'name': self.rows[position]['name'],
+            }
+            for position, px, py in zip(positions.tolist(), xs.tolist(), ys.tolist())
+        ]
+        return {'x': x, 'y': y, 'total': total, 'returned': len(points), 'points': points}
+
+
+def _grid_index(values: np.ndarray, cells: int) -> np.ndarray:
+    low, high = values.min(), values.max()
+    if high == low:
+        return np.zeros(values.size, dtype=np.int64)
+    return np.minimum(((values - low) / (high - low) * cells).astype(np.int64), cells - 1)
+
+
+class ExoplanetStore:
+    """Process-wide holder of the current snapshot"""
+
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> ExoplanetSnapshot:
+        version = get_versions([STORE_DATASET])[STORE_DATASET]
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version != version:
+                self._snapshot = ExoplanetSnapshot.load(version)
+                logger.info(f"Loaded {self._snapshot.size} exoplanets into the columnar store")
+            return self._snapshot
+
+    def invalidate(self):
+        """Make every process reload on its next read"""
+        bump(STORE_DATASET)
+        self._snapshot = None
+
+    def rows(self, positions, request=None) -> List[Dict]:
+        """Serialized rows with the requesting user's saved/tracked flags"""
+        snapshot = self.snapshot()
+        rows = [dict(snapshot.rows[position]) for position in positions]
+        user = getattr(request, 'user', None)
+        if rows and user is not None and user.is_authenticated:
+            nasa_ids = [row['nasa_id'] for row in rows]
+            saved = set(UserSavedItem.objects.filter(
+                user=user, item_type='exoplanet', item_id__in=nasa_ids
+            ).values_list('item_id', flat=True))
+            tracked = set(UserTrackedObject.objects.filter(
+                user=user, object_type='exoplanet', object_id__in=nasa_ids
+            ).values_list('object_id', flat=True))
+            for row in rows:
+                row['is_saved'] = row['nasa_id'] in saved
+                row['is_tracked'] = row['nasa_id'] in tracked
+        return rows
+
+
+exoplanet_store = ExoplanetStore()
+
+
+def parse_ranges(params) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+    """min_<field>/max_<field> query parameters as numeric ranges; raises ValueError"""
+    ranges = {}
+    for name in NUMERIC_FIELDS:
+        low = params.get(f'min_{name}')
+        high = params.get(f'max_{name}')
+        if low or high:
+            ranges[name] = (float(low) if low else None, float(high) if high else None)
+    return ranges
@@ -0,0 +1,142 @@
+"""
+Streaming bulk exports.
+
+Datasets are read with ``values().iterator(chunk_size=...)`` so rows are never
+turned into model instances or held in memory all at once, and encoded as
+NDJSON or CSV on the fly, optionally gzip-compressed. Used by the export API
+endpoint and the ``export_dataset`` management command.
+"""
+import csv
+import io
+import json
+import zlib
+from typing import Dict, Iterable, Iterator, List
+
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class ExportDataset:
+    """A model exported as flat rows"""
+
+    def __init__(self, name: str, model_label: str, fields: List[str] = None,
+                 extra: List[str] = (), ordering: List[str] = ('pk',), description: str = ''):
+        self.name = name
+        self.model_label = model_label
+        self.fields = fields
+        self.extra = list(extra)
+        self.ordering = list(ordering)
+        self.description = description
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def columns(self) -> List[str]:
+        fields = self.fields or [field.attname for field in self.model._meta.concrete_fields]
+        return list(fields) + self.extra
+
+    def rows(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict]:
+        queryset = self.model.objects.order_by(*self.ordering).values(*self.columns())
+        return queryset.iterator(chunk_size=chunk_size)
+
+
+EXPORT_DATASETS = {dataset.name: dataset for dataset in [
+    ExportDataset('apod', 'nasa_api.APOD', ordering=['date'],
+                  description='Astronomy Pictures of the Day'),
+    ExportDataset(
+        'neos', 'nasa_api.NearEarthObject',
+        extra=[
+            'close_approaches__close_approach_date',
+            'close_approaches__relative_velocity_kmh',
+            'close_approaches__miss_distance_km',
+            'close_approaches__orbiting_body',
+        ],
+        ordering=['pk', 'close_approaches__close_approach_date'],
+        description='Near Earth Objects, one row per close approach'
+    ),
+    ExportDataset('exoplanets', 'nasa_api.Exoplanet', description='Confirmed exoplanets'),
+    ExportDataset('spacex_launches', 'spacex_api.SpaceXLaunch',
+                  extra=['rocket__name', 'launchpad__name'],
+                  description='SpaceX launches with rocket and launchpad names'),
+    ExportDataset('spaceflight_news', 'spaceflightnews.SpaceflightNews',
+                  ordering=['published_at', 'pk'], description='Spaceflight news articles'),
+    ExportDataset('research_papers', 'users.ResearchPaper',
+                  ordering=['published_date', 'pk'], description='Cached research papers'),
+]}
+
+
+def _ndjson_lines(rows: Iterable[Dict]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+class _LineBuffer:
+    """File-like object returning what csv.writer writes"""
+
+    def write(self, value):
+        return value
+
+
+def _csv_lines(columns: List[str], rows: Iterable[Dict]) -> Iterator[str]:
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(columns)
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        values = []
+        for column in columns:
+            value = row[column]
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value, cls=DjangoJSONEncoder)
+            elif value is not None and not isinstance(value, (str, int, float, bool)):
+                value = encoder.default(value)
+            values.append(value)
+        yield writer.writerow(values)
+
+
+def _batched(lines: Iterable[str], target_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Group small lines into larger chunks to cut per-write overhead"""
+    buffer = io.StringIO()
+    for line in lines:
+        buffer.write(line)
+        if buffer.tell() >= target_size:
+            yield buffer.getvalue().encode('utf-8')
+            buffer = io.StringIO()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _gzipped(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream_export(dataset: ExportDataset, export_format: str = 'ndjson',
+                  compress: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Encoded byte chunks of a whole dataset"""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    rows = dataset.rows(chunk_size=chunk_size)
+    if export_format == 'csv':
+        lines = _csv_lines(dataset.columns(), rows)
+    else:
+        lines = _ndjson_lines(rows)
+
+    chunks = _batched(lines)
+    return _gzipped(chunks) if compress else chunks
+
+
+def export_filename(dataset: ExportDataset, export_format: str, compress: bool) -> str:
+    return f"{dataset.name}.{export_format}{'.gz' if compress else ''}"
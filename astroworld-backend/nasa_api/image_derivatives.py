@@ -0,0 +1,103 @@
+"""
+Content-addressed image derivatives.
+
+An upstream image is downloaded once, hashed (SHA-256 of the original bytes)
+and rendered into WebP variants stored under ``IMAGE_DERIVATIVE_DIR``:
+
+    <root>/<hash[:2]>/<hash>/<variant>.webp
+
+Since the path depends only on the content, identical originals share their
+derivatives and stored files never change, so they can be served with
+long-lived cache headers. The retention policy that deletes EPIC images
+removes the derivatives no remaining row references, which keeps the
+directory bounded by the retained images.
+"""
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from typing import Dict, Optional
+
+from django.conf import settings
+from PIL import Image
+
+# Variant -> longest side in pixels (None keeps the original size)
+VARIANTS = {
+    'thumb': 320,
+    'medium': 1024,
+    'full': None,
+}
+WEBP_QUALITY = 80
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def render_variant(image: Image.Image, max_side: Optional[int]) -> bytes:
+    """Encode a (possibly downscaled) copy of `image` as WebP"""
+    image = image.copy()
+    if max_side:
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    output = io.BytesIO()
+    image.save(output, format='WEBP', quality=WEBP_QUALITY, method=4)
+    return output.getvalue()
+
+
+class DerivativeStore:
+    """WebP variants of downloaded images, keyed by content hash"""
+
+    def __init__(self, root: str = None):
+        self._root = root
+
+    @property
+    def root(self) -> str:
+        return self._root or getattr(settings, 'IMAGE_DERIVATIVE_DIR', os.path.join(settings.BASE_DIR, 'image_cache'))
+
+    def entry_dir(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def path(self, digest: str, variant: str) -> str:
+        return os.path.join(self.entry_dir(digest), f'{variant}.webp')
+
+    def has(self, digest: str) -> bool:
+        return all(os.path.exists(self.path(digest, variant)) for variant in VARIANTS)
+
+    def store(self, data: bytes) -> str:
+        """Render and save every variant of an original image; returns its content hash"""
+        digest = content_hash(data)
+        if self.has(digest):
+            return digest
+
+        with Image.open(io.BytesIO(data)) as image:
+            image.load()
+            rendered: Dict[str, bytes] = {
+                variant: render_variant(image, max_side) for variant, max_side in VARIANTS.items()
+            }
+
+        for variant, encoded in rendered.items():
+            self._write(self.path(digest, variant), encoded)
+        return digest
+
+    def remove(self, digest: str):
+        """Delete every variant of an image; readers that lose the race re-derive it"""
+        shutil.rmtree(self.entry_dir(digest), ignore_errors=True)
+
+    def _write(self, path: str, data: bytes):
+        """Write atomically so readers never see a partial file"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+derivative_store = DerivativeStore()
@@ -0,0 +1,325 @@
+"""
+Image proxy with a size-bounded disk cache.
+
+Hot-linked upstream images (APOD, Mars rover photos, EPIC, NASA media,
+SpaceX patches) are fetched once, rendered into resized WebP variants and
+kept under ``IMAGE_PROXY_DIR``:
+
+    <root>/<key[:2]>/<key>/{thumb,medium}.webp + meta.json
+
+where ``key`` is the SHA-256 of the upstream URL. ``meta.json`` holds the
+content hash used for ETags, and its modification time is the entry's last
+use, which drives least-recently-used eviction once the cache grows past
+``IMAGE_PROXY_MAX_BYTES``. Concurrent requests for the same URL wait for a
+single fetch. Entries for freshly synced images are prewarmed in the
+background after each sync.
+
+Only https URLs on ``IMAGE_PROXY_ALLOWED_HOSTS`` are fetched (``normalize``
+upgrades http links, e.g. older Mars rover photos). Redirects are followed by
+hand, up to ``MAX_REDIRECTS`` hops, and every hop must pass the same check,
+so an open redirect on an allowed host can't point the proxy elsewhere.
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from django.conf import settings
+from django.core.cache import cache
+from django.dispatch import receiver
+from PIL import Image
+
+from astroworld.upstream import UpstreamSession
+
+from .image_derivatives import VARIANTS, content_hash, render_variant
+from .sync import sync_completed
+
+logger = logging.getLogger(__name__)
+
+PROXY_VARIANTS = ['thumb', 'medium']
+TOUCH_INTERVAL = 60  # Seconds between last-use updates of an entry
+FETCH_LOCK_TIMEOUT = 60
+MAX_REDIRECTS = 5
+
+
+class ImageProxyError(Exception):
+    """The upstream image could not be fetched or decoded"""
+
+
+class ImageProxyCache:
+    """Resized copies of upstream images with LRU eviction"""
+
+    def __init__(self, root: str = None, max_bytes: int = None):
+        self._root = root
+        self._max_bytes = max_bytes
+        self._size = None  # Approximate bytes on disk, exact after each eviction scan
+        self._size_lock = threading.Lock()
+        self._fetch_locks = defaultdict(threading.Lock)
+        self.session = UpstreamSession()
+
+    @property
+    def root(self) -> str:
+        return self._root or getattr(settings, 'IMAGE_PROXY_DIR', os.path.join(settings.BASE_DIR, 'image_proxy_cache'))
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes or getattr(settings, 'IMAGE_PROXY_MAX_BYTES', 1024 ** 3)
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def entry_dir(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def variant_path(self, key: str, variant: str) -> str:
+        return os.path.join(self.entry_dir(key), f'{variant}.webp')
+
+    @staticmethod
+    def normalize(url: str) -> str:
+        """Upgrade http image links to https"""
+        parts = urlsplit(url)
+        if parts.scheme == 'http':
+            return urlunsplit(('https',) + tuple(parts[1:]))
+        return url
+
+    def is_allowed(self, url: str) -> bool:
+        """Only proxy https URLs on the configured upstream image hosts"""
+        parts = urlsplit(url)
+        host = (parts.hostname or '').lower()
+        if parts.scheme != 'https' or not host:
+            return False
+        allowed = getattr(settings, 'IMAGE_PROXY_ALLOWED_HOSTS', [])
+        return any(host == suffix or host.endswith(f'.{suffix}') for suffix in allowed)
+
+    def _read_meta(self, key: str) -> Optional[Dict]:
+        try:
+            with open(os.path.join(self.entry_dir(key), 'meta.json')) as meta_file:
+                return json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, url: str, variant: str) -> Dict:
+        """Path and ETag of a cached variant, fetching the image on a miss"""
+        if variant not in PROXY_VARIANTS:
+            raise ValueError(f"Unknown variant: {variant}")
+
+        key = self.key(url)
+        meta = self._read_meta(key)
+        if meta is None:
+            meta = self._fetch_once(url, key)
+        else:
+            self._touch(key)
+        return {
+            'path': self.variant_path(key, variant),
+            'etag': f'"{meta["content_hash"][:32]}-{variant}"',
+        }
+
+    def _touch(self, key: str):
+        meta_path = os.path.join(self.entry_dir(key), 'meta.json')
+        try:
+            if time.time() - os.path.getmtime(meta_path) > TOUCH_INTERVAL:
+                os.utime(meta_path)
+        except OSError:
+            pass
+
+    def _fetch_once(self, url: str, key: str) -> Dict:
+        """Fetch an image at most once across threads and, via the cache, across processes"""
+        lock_key = f"image_proxy_fetch_{key}"
+        with self._fetch_locks[key]:
+            meta = self._read_meta(key)
+            if meta is not None:
+                return meta
+
+            if not cache.add(lock_key, True, FETCH_LOCK_TIMEOUT):
+                # Another process is fetching it; wait for its result
+                deadline = time.monotonic() + FETCH_LOCK_TIMEOUT
+                while time.monotonic() < deadline:
+                    time.sleep(0.2)
+                    meta = self._read_meta(key)
+                    if meta is not None:
+                        return meta
+                    if cache.get(lock_key) is None:
+                        break
+            try:
+                return self._fetch(url, key)
+            finally:
+                cache.delete(lock_key)
+                self._fetch_locks.pop(key, None)
+
+    def _fetch(self, url: str, key: str) -> Dict:
+        max_source = getattr(settings, 'IMAGE_PROXY_MAX_SOURCE_BYTES', 25 * 1024 ** 2)
+        try:
+            data = self._download(url, max_source)
+            with Image.open(io.BytesIO(data)) as image:
+                image.load()
+                rendered = {variant: render_variant(image, VARIANTS[variant]) for variant in PROXY_VARIANTS}
+        except ImageProxyError:
+            raise
+        except Exception as e:
+            raise ImageProxyError(f"Could not proxy {url}: {str(e)}")
+
+        entry_dir = self.entry_dir(key)
+        tmp_dir = f'{entry_dir}.{os.getpid()}.{threading.get_ident()}.tmp'
+        os.makedirs(tmp_dir, exist_ok=True)
+        size = 0
+        for variant, encoded in rendered.items():
+            with open(os.path.join(tmp_dir, f'{variant}.webp'), 'wb') as variant_file:
+                variant_file.write(encoded)
+            size += len(encoded)
+        meta = {'url': url, 'content_hash': content_hash(data), 'size': size}
+        # meta.json is written last: an entry counts as cached once it exists
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as meta_file:
+            json.dump(meta, meta_file)
+
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            # Another process stored the same entry first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return self._read_meta(key) or meta
+
+        self._account(size)
+        return meta
+
+    def _download(self, url: str, max_source: int) -> bytes:
+        """Read the image body, following only redirects to allowed URLs"""
+        location = url
+        for _ in range(MAX_REDIRECTS + 1):
+            with self.session.get(location, timeout=30, stream=True, allow_redirects=False) as response:
+                if response.is_redirect:
+                    location = urljoin(location, response.headers['Location'])
+                    if not self.is_allowed(location):
+                        raise ImageProxyError(f"Refusing redirect from {url} to {location}")
+                    continue
+                response.raise_for_status()
+                data = io.BytesIO()
+                for chunk in response.iter_content(64 * 1024):
+                    data.write(chunk)
+                    if data.tell() > max_source:
+                        raise ImageProxyError(f"Image larger than {max_source} bytes")
+                return data.getvalue()
+        raise ImageProxyError(f"Too many redirects for {url}")
+
+    def _account(self, added: int):
+        with self._size_lock:
+            if self._size is None:
+                self._size = self.disk_usage()
+            else:
+                self._size += added
+            over = self._size > self.max_bytes
+        if over:
+            self.evict()
+
+    def _entries(self) -> List[Dict]:
+        entries = []
+        if not os.path.isdir(self.root):
+            return entries
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.is_dir() or entry.name.endswith('.tmp'):
+                    continue
+                try:
+                    last_used = os.path.getmtime(os.path.join(entry.path, 'meta.json'))
+                except OSError:
+                    continue
+                size = sum(item.stat().st_size for item in os.scandir(entry.path))
+                entries.append({'path': entry.path, 'last_used': last_used, 'size': size})
+        return entries
+
+    def disk_usage(self) -> int:
+        return sum(entry['size'] for entry in self._entries())
+
+    def evict(self, target_ratio: float = 0.9) -> int:
+        """Remove least recently used entries until usage drops below target_ratio * max_bytes"""
+        entries = sorted(self._entries(), key=lambda entry: entry['last_used'])
+        total = sum(entry['size'] for entry in entries)
+        target = self.max_bytes * target_ratio
+        removed = 0
+        for entry in entries:
+            if total <= target:
+                break
+            shutil.rmtree(entry['path'], ignore_errors=True)
+            total -= entry['size']
+            removed += 1
+        with self._size_lock:
+            self._size = total
+        if removed:
+            logger.info(f"Image proxy evicted {removed} entries, {total} bytes remain")
+        return removed
+
+    def prewarm(self, urls: Iterable[str], variant: str = 'thumb') -> int:
+        """Fetch uncached images ahead of the first page view; returns how many were added"""
+        from .services import fetch_concurrently
+
+        pending = [
+            url for url in dict.fromkeys(self.normalize(url) for url in urls if url)
+            if self.is_allowed(url) and self._read_meta(self.key(url)) is None
+        ]
+
+        def warm(url):
+            try:
+                self.get(url, variant)
+                return True
+            except ImageProxyError as e:
+                logger.warning(str(e))
+                return False
+
+        return sum(fetch_concurrently(warm, pending)) if pending else 0
+
+
+image_proxy_cache = ImageProxyCache()
+
+
+def _apod_urls():
+    from .models import APOD
+    return APOD.objects.filter(media_type='image').values_list('url', flat=True)[:30]
+
+
+def _mars_photo_urls():
+    from .models import MarsRoverPhoto
+    return MarsRoverPhoto.objects.order_by('-earth_date', '-sol', 'id').values_list('img_src', flat=True)[:60]
+
+
+def _spacex_patch_urls():
+    from spacex_api.models import SpaceXLaunch
+    links = SpaceXLaunch.objects.order_by('-launch_date_utc').values_list('links', flat=True)[:40]
+    return [((link or {}).get('patch') or {}).get('small') for link in links]
+
+
+# Synced dataset -> recent image URLs to prewarm
+PREWARM_SOURCES = {
+    'apod': _apod_urls,
+    'mars_photos': _mars_photo_urls,
+    'spacex_launches': _spacex_patch_urls,
+}
+
+
+@receiver(sync_completed)
+def _prewarm_on_sync(sender, dataset, **kwargs):
+    source = PREWARM_SOURCES.get(dataset)
+    if source is None or not getattr(settings, 'IMAGE_PROXY_PREWARM', True):
+        return
+    urls = list(source())
+
+    def run():
+        from django.db import connections
+        try:
+            added = image_proxy_cache.prewarm(urls)
+            logger.info(f"Prewarmed {added} proxied images after {dataset} sync")
+        except Exception as e:
+            logger.error(f"Image prewarm after {dataset} sync failed: {str(e)}")
+        finally:
+            connections.close_all()
+
+    # Keep the sync itself fast; warming happens in the background
+    threading.Thread(target=run, name=f'image-prewarm-{dataset}', daemon=True).start()
@@ -0,0 +1,227 @@
+"""
+Database-backed job queue for deployments without Celery.
+
+Sync views (with ``SYNC_JOB_QUEUE`` on) and the scheduler insert ``SyncJob``
+rows naming a task by dotted path, e.g. ``nasa_api.tasks.sync_daily_nasa_data``
+or ``nasa_api.services.apod_service.sync_apod_data``. ``manage.py
+run_workers`` runs a pool of worker processes that claim due jobs with
+``SELECT ... FOR UPDATE SKIP LOCKED`` where the database supports it (a
+conditional status update guards backends that don't), so any number of
+workers can share one queue without a broker.
+
+Failed jobs are retried with exponential backoff up to ``max_attempts``.
+While a job runs, a heartbeat thread renews its lease (``locked_at``); the
+jobs of a worker process that died are requeued when ``run_workers`` restarts
+it, and jobs whose lease ran out, e.g. after the whole host died, by the next
+``requeue_stale``. A job already at ``max_attempts`` fails instead, so a job
+that kills its worker is not retried forever.
+The scheduler enqueues the entries of ``CELERY_BEAT_SCHEDULE`` when they are
+due, deduplicated per entry and minute so several schedulers can run at once.
+"""
+import json
+import logging
+import os
+import pkgutil
+import socket
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from astroworld.ratelimit import background
+
+from .models import SyncJob
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_DELAY = 60  # Seconds before the first retry; doubles per attempt
+
+
+def worker_id(pid: int = None) -> str:
+    return f"{socket.gethostname()}:{pid or os.getpid()}"
+
+
+def enqueue(task: str, kwargs: Dict = None, run_after: datetime = None,
+            max_attempts: int = None, schedule_entry: str = '',
+            unique_key: str = None) -> Optional[SyncJob]:
+    """Queue a call of `task`; None if a job with `unique_key` already exists"""
+    try:
+        with transaction.atomic():
+            return SyncJob.objects.create(
+                task=task,
+                kwargs=kwargs or {},
+                run_after=run_after or timezone.now(),
+                max_attempts=max_attempts or getattr(settings, 'SYNC_JOB_MAX_ATTEMPTS', 3),
+                schedule_entry=schedule_entry,
+                unique_key=unique_key,
+            )
+    except IntegrityError:
+        return None
+
+
+def run_or_enqueue(calls: Iterable[Tuple[str, str, Dict]]) -> Tuple[Dict, Dict]:
+    """
+    Run (name, task, kwargs) sync calls inline, or queue them when
+    ``SYNC_JOB_QUEUE`` is on. Returns (results, job ids) by name.
+    """
+    results, jobs = {}, {}
+    for name, task, kwargs in calls:
+        if getattr(settings, 'SYNC_JOB_QUEUE', False):
+            jobs[name] = enqueue(task, kwargs).pk
+        else:
+            results[name] = resolve(task)(**kwargs)
+    return results, jobs
+
+
+def resolve(task: str):
+    return pkgutil.resolve_name(task)
+
+
+def claim(worker: str) -> Optional[SyncJob]:
+    """Take the next due job, or None when the queue is empty"""
+    now = timezone.now()
+    with transaction.atomic():
+        queryset = SyncJob.objects.filter(status=SyncJob.QUEUED, run_after__lte=now).order_by('run_after', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        job = queryset.first()
+        if job is None:
+            return None
+        # Without row locks (SQLite) only one worker wins the status change
+        claimed = SyncJob.objects.filter(pk=job.pk, status=SyncJob.QUEUED).update(
+            status=SyncJob.RUNNING, locked_by=worker, locked_at=now, attempts=job.attempts + 1
+        )
+    if not claimed:
+        return None
+    job.refresh_from_db()
+    return job
+
+
+def _json_result(result):
+    try:
+        return json.loads(json.dumps(result, cls=DjangoJSONEncoder))
+    except (TypeError, ValueError):
+        return repr(result)
+
+
+def _heartbeat(job: SyncJob, stop: threading.Event, interval: float):
+    """Renew the lease of a running job until `stop` is set"""
+    try:
+        while not stop.wait(interval):
+            try:
+                SyncJob.objects.filter(
+                    pk=job.pk, status=SyncJob.RUNNING, locked_by=job.locked_by
+                ).update(locked_at=timezone.now())
+            except OperationalError as e:
+                # e.g. SQLite's write lock held by the job itself; retry next beat
+                logger.debug(f"Heartbeat of job {job.pk} failed: {str(e)}")
+    finally:
+        connection.close()
+
+
+def run_job(job: SyncJob) -> bool:
+    """Run a claimed job and record its outcome; True on success"""
+    logger.info(f"Running job {job.pk}: {job.task}")
+    stop = threading.Event()
+    heartbeat = threading.Thread(
+        target=_heartbeat, args=(job, stop, getattr(settings, 'SYNC_JOB_HEARTBEAT', 60)),
+        name=f'job-{job.pk}-heartbeat', daemon=True
+    )
+    heartbeat.start()
+    try:
+        with background():
+            result = resolve(job.task)(**job.kwargs)
+    except Exception as e:
+        logger.error(f"Job {job.pk} ({job.task}) failed on attempt {job.attempts}: {str(e)}")
+        job.error = str(e)[:2000]
+        job.locked_by = ''
+        job.locked_at = None
+        if job.attempts < job.max_attempts:
+            job.status = SyncJob.QUEUED
+            job.run_after = timezone.now() + timedelta(seconds=RETRY_BASE_DELAY * 2 ** (job.attempts - 1))
+        else:
+            job.status = SyncJob.FAILED
+            job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'locked_by', 'locked_at', 'run_after', 'finished_at'])
+        return False
+    finally:
+        stop.set()
+        heartbeat.join()
+
+    job.status = SyncJob.SUCCEEDED
+    job.result = _json_result(result)
+    job.error = ''
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+    return True
+
+
+def _release(running, reason: str) -> int:
+    """Requeue abandoned running jobs, failing those out of attempts"""
+    now = timezone.now()
+    failed = running.filter(attempts__gte=F('max_attempts')).update(
+        status=SyncJob.FAILED, error=reason, locked_by='', locked_at=None, finished_at=now
+    )
+    requeued = running.filter(attempts__lt=F('max_attempts')).update(
+        status=SyncJob.QUEUED, locked_by='', locked_at=None, run_after=now
+    )
+    if failed or requeued:
+        logger.warning(f"{reason}: requeued {requeued} jobs, failed {failed} out of attempts")
+    return failed + requeued
+
+
+def requeue_stale(lease: int = None) -> int:
+    """Requeue running jobs whose heartbeat stopped renewing their lease"""
+    lease = lease or getattr(settings, 'SYNC_JOB_LEASE', 600)
+    return _release(
+        SyncJob.objects.filter(status=SyncJob.RUNNING, locked_at__lt=timezone.now() - timedelta(seconds=lease)),
+        'Lease expired'
+    )
+
+
+def requeue_worker(worker: str) -> int:
+    """Requeue the running jobs of a worker process that died"""
+    return _release(
+        SyncJob.objects.filter(status=SyncJob.RUNNING, locked_by=worker),
+        f'Worker {worker} died'
+    )
+
+
+class Scheduler:
+    """Enqueue CELERY_BEAT_SCHEDULE entries when they are due"""
+
+    def __init__(self, schedule: Dict = None):
+        from celery.schedules import schedule as every
+
+        self.entries = {}
+        for name, entry in (getattr(settings, 'CELERY_BEAT_SCHEDULE', {}) if schedule is None else schedule).items():
+            run_every = entry['schedule']
+            if not hasattr(run_every, 'is_due'):
+                run_every = every(run_every)  # timedelta or seconds
+            self.entries[name] = (entry['task'], entry.get('kwargs', {}), run_every)
+        self.started_at = timezone.now()
+
+    def last_run(self, name: str) -> datetime:
+        last = SyncJob.objects.filter(schedule_entry=name).order_by('-created_at').values_list(
+            'created_at', flat=True
+        ).first()
+        # New entries wait for their next slot instead of firing at startup
+        return last or self.started_at
+
+    def tick(self) -> List[SyncJob]:
+        """Enqueue every due entry; returns the jobs created"""
+        created = []
+        for name, (task, kwargs, run_every) in self.entries.items():
+            if not run_every.is_due(self.last_run(name)).is_due:
+                continue
+            slot = timezone.now().strftime('%Y-%m-%dT%H:%M')
+            job = enqueue(task, kwargs, schedule_entry=name, unique_key=f"schedule:{name}:{slot}")
+            if job:
+                logger.info(f"Scheduled {name}: job {job.pk}")
+                created.append(job)
+        return created
@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from nasa_api.retention import RetentionEngine, get_policies
+
+
+class Command(BaseCommand):
+    help = 'Delete expired data in batches according to the retention policies'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--policies',
+            nargs='+',
+            help='Only apply these policies (default: all)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Rows deleted per transaction'
+        )
+        parser.add_argument(
+            '--archive',
+            action='store_true',
+            help='Archive rows to gzipped NDJSON before deleting them'
+        )
+        parser.add_argument(
+            '--archive-dir',
+            help='Directory for archive files'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0,
+            help='Seconds to sleep between batches'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count expired rows'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            policies = get_policies(options['policies'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['dry_run']:
+            for policy in policies:
+                count = policy.queryset().count()
+                self.stdout.write(f'{policy.name}: {count} expired rows ({policy.description})')
+            return
+
+        def report(name, deleted):
+            self.stdout.write(f'  {name}: {deleted} deleted', ending='\r')
+            self.stdout.flush()
+
+        engine = RetentionEngine(
+            batch_size=options['batch_size'],
+            archive=options['archive'] or None,
+            archive_dir=options['archive_dir'],
+            pause=options['pause'],
+            progress=report
+        )
+
+        for policy in policies:
+            self.stdout.write(f'Applying {policy.name}: {policy.description}')
+            deleted = engine.apply(policy)
+            self.stdout.write(self.style.SUCCESS(f'✓ {policy.name}: deleted {deleted} rows'))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from astroworld.versions import DATASETS, bump, get_versions
+
+
+class Command(BaseCommand):
+    help = 'Invalidate cached data of datasets by bumping their versions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'datasets',
+            nargs='*',
+            help='Datasets to bump (e.g. nasa_media tle gibs)'
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Bump every registered dataset'
+        )
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='Only list datasets and their current versions'
+        )
+
+    def handle(self, *args, **options):
+        if options['list']:
+            versions = get_versions(DATASETS)
+            for dataset, description in DATASETS.items():
+                self.stdout.write(f'{dataset:<26} {versions[dataset]:>16}  {description}')
+            return
+
+        datasets = list(DATASETS) if options['all'] else options['datasets']
+        if not datasets:
+            raise CommandError('Name at least one dataset, or pass --all')
+        unknown = set(datasets) - set(DATASETS)
+        if unknown:
+            raise CommandError(f"Unknown datasets: {', '.join(sorted(unknown))}")
+
+        for dataset in datasets:
+            bump(dataset)
+        self.stdout.write(self.style.SUCCESS(f'Bumped {len(datasets)} dataset versions'))
@@ -0,0 +1,69 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from nasa_api.exports import (
+    EXPORT_DATASETS, EXPORT_FORMATS, DEFAULT_CHUNK_SIZE, stream_export
+)
+
+
+class Command(BaseCommand):
+    help = 'Stream a dataset to a file or stdout as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'dataset',
+            choices=sorted(EXPORT_DATASETS),
+            help='Dataset to export'
+        )
+        parser.add_argument(
+            '--format',
+            dest='export_format',
+            choices=list(EXPORT_FORMATS),
+            default='ndjson',
+            help='Output format'
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Gzip-compress the output'
+        )
+        parser.add_argument(
+            '--output',
+            help='File to write (default: stdout)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Rows fetched per database round trip'
+        )
+
+    def handle(self, *args, **options):
+        dataset = EXPORT_DATASETS[options['dataset']]
+        chunks = stream_export(
+            dataset,
+            options['export_format'],
+            compress=options['gzip'],
+            chunk_size=options['chunk_size']
+        )
+
+        output = options['output']
+        try:
+            target = open(output, 'wb') if output else sys.stdout.buffer
+        except OSError as e:
+            raise CommandError(f'Cannot open {output}: {e}')
+
+        written = 0
+        try:
+            for chunk in chunks:
+                target.write(chunk)
+                written += len(chunk)
+        finally:
+            if output:
+                target.close()
+            else:
+                target.flush()
+
+        if output:
+            self.stdout.write(self.style.SUCCESS(f'✓ Wrote {written} bytes of {dataset.name} to {output}'))
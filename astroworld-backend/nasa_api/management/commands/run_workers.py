@@ -0,0 +1,113 @@
+import logging
+import multiprocessing
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections, connections
+
+from nasa_api.jobs import Scheduler, claim, requeue_stale, requeue_worker, run_job, worker_id
+
+logger = logging.getLogger(__name__)
+
+
+def _work(poll_interval: float, burst: bool):
+    """Worker process loop: claim and run jobs until told to stop"""
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *args: stopping.append(True))
+    signal.signal(signal.SIGINT, lambda *args: stopping.append(True))
+    worker = worker_id()
+    while not stopping:
+        close_old_connections()
+        try:
+            job = claim(worker)
+        except OperationalError as e:
+            # e.g. SQLite's database-wide write lock held by another worker
+            logger.debug(f'Claim failed, retrying: {str(e)}')
+            time.sleep(poll_interval)
+            continue
+        if job is None:
+            if burst:
+                break
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Run sync jobs from the database queue in a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=2,
+            help='Number of worker processes'
+        )
+        parser.add_argument(
+            '--no-scheduler',
+            action='store_true',
+            help="Don't enqueue CELERY_BEAT_SCHEDULE entries from this process"
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once the queue is empty'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=getattr(settings, 'SYNC_JOB_POLL_INTERVAL', 5),
+            help='Seconds between polls of an empty queue'
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(options['concurrency'], 1)
+        poll_interval = options['poll_interval']
+        burst = options['burst']
+        scheduler = None if options['no_scheduler'] or burst else Scheduler()
+
+        requeue_stale()
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+
+        def start():
+            process = multiprocessing.Process(target=_work, args=(poll_interval, burst), daemon=True)
+            process.start()
+            return process
+
+        workers = [start() for _ in range(concurrency)]
+        self.stdout.write(self.style.SUCCESS(
+            f'Started {concurrency} workers' + (' and the scheduler' if scheduler else '')
+        ))
+
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda *args: stopping.append(True))
+        try:
+            while not stopping:
+                if burst:
+                    if not any(process.is_alive() for process in workers):
+                        break
+                else:
+                    for index, process in enumerate(workers):
+                        if not process.is_alive():
+                            logger.warning(f'Worker {process.pid} exited with {process.exitcode}, restarting')
+                            requeue_worker(worker_id(process.pid))
+                            close_old_connections()
+                            workers[index] = start()
+                if scheduler:
+                    scheduler.tick()
+                    requeue_stale()
+                    close_old_connections()
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for process in workers:
+                if process.is_alive():
+                    process.terminate()
+            for process in workers:
+                process.join()
+        self.stdout.write('Workers stopped')
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from nasa_api.services import exoplanet_service
+
+
+class Command(BaseCommand):
+    help = 'Page through the Exoplanet Archive and upsert every confirmed planet'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=2000,
+            help='Planets requested per TAP query'
+        )
+        parser.add_argument(
+            '--max-pages',
+            type=int,
+            help='Stop after this many pages; the next run resumes from there'
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore the stored checkpoint and start from the first planet'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Syncing the Exoplanet Archive...')
+        count = exoplanet_service.sync_exoplanet_data(
+            page_size=options['page_size'],
+            resume=not options['restart'],
+            max_pages=options['max_pages']
+        )
+        self.stdout.write(self.style.SUCCESS(f'✓ Upserted {count} exoplanets'))
@@ -99,7 +99,7 @@ class Command(BaseCommand):
         if 'exoplanets' in apis:
             self.stdout.write('Syncing exoplanet data...')
             try:
-                count = exoplanet_service.sync_exoplanet_data(limit=500)
+                count = exoplanet_service.sync_exoplanet_data()
                 results['exoplanets'] = count
                 self.stdout.write(
                     self.style.SUCCESS(f'✓ Synced {count} exoplanets')
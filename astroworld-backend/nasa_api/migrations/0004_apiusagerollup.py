@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nasa_api', '0003_alter_usersaveditem_item_type_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='apiusagelog',
+            name='timestamp',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.CreateModel(
+            name='APIUsageRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('endpoint', models.CharField(max_length=100)),
+                ('bucket', models.DateTimeField(db_index=True)),
+                ('request_count', models.PositiveIntegerField(default=0)),
+                ('error_count', models.PositiveIntegerField(default=0)),
+                ('total_response_time', models.FloatField(default=0)),
+                ('max_response_time', models.FloatField(default=0)),
+            ],
+            options={
+                'ordering': ['-bucket'],
+                'unique_together': {('endpoint', 'bucket')},
+            },
+        ),
+    ]
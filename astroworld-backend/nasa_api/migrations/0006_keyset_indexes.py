@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nasa_api', '0005_syncstate'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='marsroverphoto',
+            index=models.Index(fields=['-earth_date', '-sol', 'id'], name='mars_photo_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nasa_api', '0006_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='spaceevent',
+            name='nasa_api_sp_event_t_9774e3_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='spaceevent',
+            name='nasa_api_sp_is_feat_ca5b20_idx',
+        ),
+        migrations.AddIndex(
+            model_name='epicimage',
+            index=models.Index(fields=['-date'], name='epic_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='marsroverphoto',
+            index=models.Index(fields=['rover', '-earth_date', '-sol', 'id'], name='mars_photo_rover_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='naturalevent',
+            index=models.Index(condition=models.Q(('closed', False)), fields=['-created_at'], name='natural_event_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='naturalevent',
+            index=models.Index(fields=['category_id', '-created_at'], name='natural_event_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='neocloseapproach',
+            index=models.Index(fields=['close_approach_date'], name='neo_approach_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='neocloseapproach',
+            index=models.Index(fields=['neo', 'close_approach_date'], name='neo_approach_neo_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='spaceevent',
+            index=models.Index(fields=['event_type', 'event_date'], name='space_event_type_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='spaceevent',
+            index=models.Index(condition=models.Q(('is_featured', True)), fields=['event_date'], name='space_event_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='spaceweatherevent',
+            index=models.Index(fields=['-event_time'], name='space_weather_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='spaceweatherevent',
+            index=models.Index(fields=['event_type', '-event_time'], name='space_weather_type_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usersaveditem',
+            index=models.Index(fields=['user', '-saved_at'], name='saved_item_user_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usertrackedobject',
+            index=models.Index(fields=['user', '-created_at'], name='tracked_object_user_recent_idx'),
+        ),
+    ]
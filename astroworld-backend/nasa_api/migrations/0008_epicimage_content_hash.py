@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nasa_api', '0007_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='epicimage',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
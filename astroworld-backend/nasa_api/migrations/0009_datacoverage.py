@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nasa_api', '0008_epicimage_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataCoverage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dataset', models.CharField(max_length=50)),
+                ('scope', models.CharField(blank=True, max_length=50)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['dataset', 'scope', 'start_date'],
+                'indexes': [models.Index(fields=['dataset', 'scope', 'start_date'], name='coverage_lookup_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nasa_api', '0009_datacoverage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UpstreamValidator',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('url', models.TextField()),
+                ('etag', models.CharField(blank=True, max_length=255)),
+                ('last_modified', models.CharField(blank=True, max_length=64)),
+                ('checked_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
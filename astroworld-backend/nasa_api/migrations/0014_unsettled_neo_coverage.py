@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:10
+
+from datetime import timedelta
+
+from django.db import migrations
+from django.utils import timezone
+
+
+def forget_unsettled_neo_coverage(apps, schema_editor):
+    """Drop NEO coverage from today on, which is no longer recorded as complete"""
+    DataCoverage = apps.get_model('nasa_api', 'DataCoverage')
+    today = timezone.now().date()
+    DataCoverage.objects.filter(dataset='neo', start_date__gte=today).delete()
+    DataCoverage.objects.filter(dataset='neo', end_date__gte=today).update(end_date=today - timedelta(days=1))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nasa_api', '0013_datasetversion'),
+    ]
+
+    operations = [
+        migrations.RunPython(forget_unsettled_neo_coverage, migrations.RunPython.noop),
+    ]
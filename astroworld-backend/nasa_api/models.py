@@ -48,6 +48,12 @@ class NEOCloseApproach(models.Model):
     relative_velocity_kmh = models.FloatField()
     miss_distance_km = models.FloatField()
     orbiting_body = models.CharField(max_length=50, default='Earth')
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['close_approach_date'], name='neo_approach_date_idx'),
+            models.Index(fields=['neo', 'close_approach_date'], name='neo_approach_neo_date_idx'),
+        ]
 
 # Mars Rover Photos
 class MarsRover(models.Model):
@@ -74,6 +80,13 @@ class MarsRoverPhoto(BaseNASAModel):
     earth_date = models.DateField()
     camera_name = models.CharField(max_length=50)
     camera_full_name = models.CharField(max_length=255)
+    
+    class Meta:
+        indexes = [
+            # Keyset pagination order (-earth_date, -sol, id)
+            models.Index(fields=['-earth_date', '-sol', 'id'], name='mars_photo_keyset_idx'),
+            models.Index(fields=['rover', '-earth_date', '-sol', 'id'], name='mars_photo_rover_keyset_idx'),
+        ]
 
 # EPIC - Earth Polychromatic Imaging Camera
 class EPICImage(BaseNASAModel):
@@ -86,6 +99,12 @@ class EPICImage(BaseNASAModel):
     lunar_j2000_position = models.JSONField(default=dict)
     sun_j2000_position = models.JSONField(default=dict)
     attitude_quaternions = models.JSONField(default=dict)
+    content_hash = models.CharField(max_length=64, blank=True)  # SHA-256 of the original; keys stored derivatives
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['-date'], name='epic_date_idx'),
+        ]
 
 # Exoplanets
 class Exoplanet(BaseNASAModel):
@@ -120,6 +139,12 @@ class SpaceWeatherEvent(BaseNASAModel):
     summary = models.TextField(blank=True)
     instruments = models.JSONField(default=list)
     linked_events = models.JSONField(default=list)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['-event_time'], name='space_weather_time_idx'),
+            models.Index(fields=['event_type', '-event_time'], name='space_weather_type_time_idx'),
+        ]
 
 # Natural Events (EONET)
 class NaturalEvent(BaseNASAModel):
@@ -133,6 +158,14 @@ class NaturalEvent(BaseNASAModel):
     class Meta:
         verbose_name = "Natural Event"
         verbose_name_plural = "Natural Events"
+        indexes = [
+            models.Index(
+                fields=['-created_at'],
+                condition=models.Q(closed=False),
+                name='natural_event_open_idx'
+            ),
+            models.Index(fields=['category_id', '-created_at'], name='natural_event_category_idx'),
+        ]
 
 class NaturalEventGeometry(models.Model):
     event = models.ForeignKey(NaturalEvent, on_delete=models.CASCADE, related_name='geometries')
@@ -162,7 +195,11 @@ class UserSavedItem(models.Model):
     tags = models.JSONField(default=list)
     
     class Meta:
+        # unique_together also serves (user, item_type, item_id) lookups
         unique_together = ['user', 'item_type', 'item_id']
+        indexes = [
+            models.Index(fields=['user', '-saved_at'], name='saved_item_user_recent_idx'),
+        ]
 
 class UserTrackedObject(models.Model):
     """For tracking objects like NEOs, events that users want notifications for"""
@@ -174,16 +211,136 @@ class UserTrackedObject(models.Model):
     
     class Meta:
         unique_together = ['user', 'object_type', 'object_id']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='tracked_object_user_recent_idx'),
+        ]
+
+class NEOAlertDelivery(models.Model):
+    """Close approach alert already emailed to a user"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='neo_alert_deliveries')
+    approach = models.ForeignKey(NEOCloseApproach, on_delete=models.CASCADE, related_name='alert_deliveries')
+    sent_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['user', 'approach']
 
 class APIUsageLog(models.Model):
     """Track API usage for rate limiting and analytics"""
     endpoint = models.CharField(max_length=100)
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the call is recorded, not when the buffered row is flushed
+    timestamp = models.DateTimeField(default=timezone.now, db_index=True)
     response_time = models.FloatField()
     status_code = models.IntegerField()
     error_message = models.TextField(blank=True)
 
+class APIUsageRollup(models.Model):
+    """Per-minute aggregate of API usage per endpoint"""
+    endpoint = models.CharField(max_length=100)
+    bucket = models.DateTimeField(db_index=True)  # Start of the minute
+    request_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    total_response_time = models.FloatField(default=0)
+    max_response_time = models.FloatField(default=0)
+    # Counts per latency bucket, aligned with instrumentation.HISTOGRAM_BUCKETS_MS
+    latency_buckets = models.JSONField(default=list)
+    
+    class Meta:
+        unique_together = ['endpoint', 'bucket']
+        ordering = ['-bucket']
+
+class SyncState(models.Model):
+    """Last run of each dataset sync"""
+    dataset = models.CharField(max_length=50, unique=True)
+    last_started_at = models.DateTimeField(null=True, blank=True)
+    last_success_at = models.DateTimeField(null=True, blank=True)
+    last_failure_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    last_item_count = models.IntegerField(default=0)
+    checkpoint = models.JSONField(default=dict, blank=True)  # Resume position for paged syncs
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['dataset']
+    
+    def __str__(self):
+        return self.dataset
+
+class DataCoverage(models.Model):
+    """Date range for which a dataset is completely stored locally"""
+    dataset = models.CharField(max_length=50)
+    scope = models.CharField(max_length=50, blank=True)  # e.g. rover name or DONKI event type
+    start_date = models.DateField()
+    end_date = models.DateField()  # inclusive
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['dataset', 'scope', 'start_date']
+        indexes = [
+            models.Index(fields=['dataset', 'scope', 'start_date'], name='coverage_lookup_idx'),
+        ]
+    
+    def __str__(self):
+        scope = f"/{self.scope}" if self.scope else ''
+        return f"{self.dataset}{scope} {self.start_date}..{self.end_date}"
+
+class DatasetVersion(models.Model):
+    """Version counter of a dataset, moved whenever its data changes (astroworld.versions)"""
+    name = models.CharField(max_length=100, unique=True)
+    version = models.BigIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+class UpstreamValidator(models.Model):
+    """ETag / Last-Modified of the last processed response for an upstream URL and parameter set"""
+    key = models.CharField(max_length=64, unique=True)  # SHA-256 of method, URL and sorted params
+    url = models.TextField()
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(max_length=64, blank=True)
+    checked_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return self.url
+
+class SyncJob(models.Model):
+    """Queued call of a sync task, run by `manage.py run_workers`"""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+    
+    task = models.CharField(max_length=255)  # Dotted path of the callable
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    run_after = models.DateTimeField(default=timezone.now)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    schedule_entry = models.CharField(max_length=100, blank=True, db_index=True)  # CELERY_BEAT_SCHEDULE name
+    unique_key = models.CharField(max_length=255, null=True, blank=True, unique=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='syncjob_claim_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.task} ({self.status})"
+
 # NASA Image and Video Library
 class NASAMediaItem(BaseNASAModel):
     MEDIA_TYPE_CHOICES = [
@@ -306,8 +463,12 @@ class SpaceEvent(BaseNASAModel):
         verbose_name_plural = "Space Events"
         indexes = [
             models.Index(fields=['event_date']),
-            models.Index(fields=['event_type']),
-            models.Index(fields=['is_featured']),
+            models.Index(fields=['event_type', 'event_date'], name='space_event_type_date_idx'),
+            models.Index(
+                fields=['event_date'],
+                condition=models.Q(is_featured=True),
+                name='space_event_featured_idx'
+            ),
             models.Index(fields=['is_upcoming']),
         ]
     
@@ -1,78 +1,137 @@
 # nasa_api/notifications.py
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, get_connection, send_mail
 from django.conf import settings
 from django.utils import timezone
+from collections import defaultdict
 from datetime import timedelta
+from itertools import groupby
 import logging
 
-from .models import UserTrackedObject, NearEarthObject
+from .models import NEOAlertDelivery, NEOCloseApproach, UserTrackedObject
 
 logger = logging.getLogger(__name__)
 
 class NotificationService:
     """Service for handling user notifications"""
     
+    # Digest emails sent per reused SMTP connection batch
+    NEO_ALERT_BATCH_SIZE = 100
+    
     @staticmethod
     def check_and_send_neo_alerts():
-        """Check for NEO close approaches and send alerts"""
+        """
+        Email every user a digest of their tracked NEOs approaching in the
+        next 24-48 hours.
+        
+        Trackers are loaded in one query (a semi-join on the approaching
+        NEOs), streamed in user order and grouped into one digest per user.
+        Digests go out in batches over a single reused connection, and each
+        delivered (user, approach) pair is recorded so reruns skip it.
+        """
         results = {
             'alerts_sent': 0,
+            'emails_sent': 0,
             'errors': 0,
-            'users_notified': []
+            'users_notified': 0,
         }
         
         # Get NEOs approaching in the next 24-48 hours
         tomorrow = timezone.now().date() + timedelta(days=1)
         day_after = timezone.now().date() + timedelta(days=2)
         
-        # Find close approaches
-        from .models import NEOCloseApproach
-        approaching_neos = NEOCloseApproach.objects.filter(
+        approaches = NEOCloseApproach.objects.filter(
             close_approach_date__date__gte=tomorrow,
             close_approach_date__date__lte=day_after
-        ).select_related('neo')
+        )
+        approaches_by_neo = defaultdict(list)
+        for approach in approaches.select_related('neo').order_by('close_approach_date'):
+            approaches_by_neo[approach.neo.nasa_id].append(approach)
+        if not approaches_by_neo:
+            return results
         
-        for approach in approaching_neos:
-            # Find users tracking this NEO
-            tracking_users = UserTrackedObject.objects.filter(
-                object_type='neo',
-                object_id=approach.neo.nasa_id,
-                notification_enabled=True
-            ).select_related('user')
-            
-            for tracking in tracking_users:
-                try:
-                    NotificationService.send_neo_alert(tracking.user, approach.neo, approach)
-                    results['alerts_sent'] += 1
-                    if tracking.user.username not in results['users_notified']:
-                        results['users_notified'].append(tracking.user.username)
-                except Exception as e:
-                    logger.error(f'Failed to send NEO alert to {tracking.user.email}: {e}')
-                    results['errors'] += 1
+        delivered = set(NEOAlertDelivery.objects.filter(
+            approach__in=approaches
+        ).values_list('user_id', 'approach_id'))
+        
+        trackers = UserTrackedObject.objects.filter(
+            object_type='neo',
+            notification_enabled=True,
+            object_id__in=approaches.values('neo__nasa_id'),
+        ).exclude(user__email='').select_related('user').order_by('user_id')
+        
+        connection = get_connection()
+        batch = []  # (message, deliveries)
+        for user, rows in groupby(trackers.iterator(chunk_size=2000), key=lambda tracking: tracking.user):
+            pending = [
+                approach
+                for tracking in rows
+                for approach in approaches_by_neo.get(tracking.object_id, [])
+                if (user.id, approach.id) not in delivered
+            ]
+            if not pending:
+                continue
+            message = NotificationService.build_neo_digest(user, pending, connection)
+            batch.append((message, [NEOAlertDelivery(user=user, approach=approach) for approach in pending]))
+            if len(batch) >= NotificationService.NEO_ALERT_BATCH_SIZE:
+                NotificationService._send_neo_batch(connection, batch, results)
+                batch = []
+        if batch:
+            NotificationService._send_neo_batch(connection, batch, results)
+        connection.close()
         
         return results
     
     @staticmethod
-    def send_neo_alert(user, neo, approach):
-        """Send NEO approach alert to user"""
-        if not user.email:
-            logger.warning(f'User {user.username} has no email address')
-            return
-            
-        subject = f'🚀 ASTROWORLD Alert: {neo.name} approaching Earth!'
+    def _send_neo_batch(connection, batch, results):
+        """Send digests over the shared connection and record the deliveries of those that went out"""
+        deliveries, sent = [], 0
+        for message, message_deliveries in batch:
+            # SMTP raises on the first refused recipient; one bad address must not drop the others
+            try:
+                connection.send_messages([message])
+            except Exception as e:
+                logger.error(f'Failed to send a NEO alert email to {message.to[0]}: {e}')
+                results['errors'] += 1
+                # Carry on over a fresh connection in case the failure broke this one
+                connection.close()
+                try:
+                    connection.open()
+                except Exception:
+                    pass  # send_messages opens it again for the next digest
+                continue
+            sent += 1
+            deliveries.extend(message_deliveries)
         
-        message = f"""
-Hi {user.first_name or user.username},
-
-The Near Earth Object "{neo.name}" that you're tracking will make a close approach to Earth on {approach.close_approach_date.strftime('%Y-%m-%d %H:%M UTC')}.
-
-Details:
+        NEOAlertDelivery.objects.bulk_create(deliveries, ignore_conflicts=True)
+        results['emails_sent'] += sent
+        results['users_notified'] += sent
+        results['alerts_sent'] += len(deliveries)
+        logger.info(f'Sent {sent} of {len(batch)} NEO alert emails covering {len(deliveries)} approaches')
+    
+    @staticmethod
+    def build_neo_digest(user, approaches, connection=None):
+        """Email listing the approaches of the NEOs a user tracks"""
+        if len(approaches) == 1:
+            subject = f'🚀 ASTROWORLD Alert: {approaches[0].neo.name} approaching Earth!'
+        else:
+            subject = f'🚀 ASTROWORLD Alert: {len(approaches)} tracked objects approaching Earth!'
+        
+        details = '\n'.join(
+            f"""
+{approach.neo.name} - close approach on {approach.close_approach_date.strftime('%Y-%m-%d %H:%M UTC')}
 - Miss Distance: {approach.miss_distance_km:,.0f} km
 - Relative Velocity: {approach.relative_velocity_kmh:,.0f} km/h
-- Potentially Hazardous: {'Yes' if neo.is_potentially_hazardous else 'No'}
-- Diameter: {neo.estimated_diameter_min_km:.2f} - {neo.estimated_diameter_max_km:.2f} km
+- Potentially Hazardous: {'Yes' if approach.neo.is_potentially_hazardous else 'No'}
+- Diameter: {approach.neo.estimated_diameter_min_km:.2f} - {approach.neo.estimated_diameter_max_km:.2f} km
+- View more details: {settings.FRONTEND_URL}/nasa/neo/{approach.neo.id}"""
+            for approach in approaches
+        )
+        
+        message = f"""
+Hi {user.first_name or user.username},
 
-View more details: {settings.FRONTEND_URL}/nasa/neo/{neo.id}
+Near Earth Objects that you're tracking will make a close approach to Earth soon:
+{details}
 
 To manage your tracking preferences: {settings.FRONTEND_URL}/dashboard
 
@@ -80,18 +139,13 @@ Happy stargazing!
 The ASTROWORLD Team
         """
         
-        try:
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [user.email],
-                fail_silently=False,
-            )
-            logger.info(f'NEO alert sent to {user.email} for {neo.name}')
-        except Exception as e:
-            logger.error(f'Failed to send NEO alert to {user.email}: {e}')
-            raise
+        return EmailMessage(
+            subject,
+            message,
+            settings.DEFAULT_FROM_EMAIL,
+            [user.email],
+            connection=connection,
+        )
     
     @staticmethod
     def send_space_weather_alert(user, event):
@@ -0,0 +1,189 @@
+"""
+Keyset (seek) pagination for large time-ordered feeds.
+
+Pages are addressed by an opaque cursor holding the ordering values of the
+last row served, so every page is an index range scan of ``page_size`` rows
+no matter how deep it is. ``?page=N`` keeps the old page-number behaviour for
+existing clients. The total count is estimated by default and only computed
+exactly on ``?count=exact``.
+"""
+import base64
+import json
+import logging
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_count(queryset):
+    """Cheap row count: planner estimate on PostgreSQL, exact COUNT elsewhere"""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    try:
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+                if row and row[0] >= 0:
+                    return row[0]
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+    except Exception as e:
+        logger.warning(f"Count estimate failed, falling back to COUNT(*): {str(e)}")
+        return queryset.count()
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a fixed ordering whose last field is unique.
+
+    Subclasses set ``ordering``, e.g. ('-earth_date', '-sol', 'id').
+    """
+    ordering = ('-id',)
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'  # exact | estimate | none
+    page_query_param = 'page'
+    legacy_pagination_class = PageNumberPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.legacy = None
+
+        if self.page_query_param in request.query_params and self.cursor_query_param not in request.query_params:
+            self.legacy = self.legacy_pagination_class()
+            self.legacy.page_size = self.page_size
+            self.legacy.page_size_query_param = self.page_size_query_param
+            self.legacy.max_page_size = self.max_page_size
+            return self.legacy.paginate_queryset(queryset, request, view)
+
+        self.page_size_value = self.get_page_size(request)
+        self.count = self.get_count(queryset, request)
+
+        queryset = queryset.order_by(*self.ordering)
+        cursor = self.decode_cursor(request, queryset.model)
+        if cursor is not None:
+            queryset = queryset.filter(self.seek_filter(cursor))
+
+        rows = list(queryset[:self.page_size_value + 1])
+        self.has_next = len(rows) > self.page_size_value
+        rows = rows[:self.page_size_value]
+        self.next_position = self.position_of(rows[-1]) if self.has_next and rows else None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+            if size > 0:
+                return min(size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param, 'estimate')
+        if mode == 'exact':
+            return queryset.count()
+        if mode == 'estimate':
+            return estimate_count(queryset)
+        return None
+
+    def _fields(self):
+        return [(field.lstrip('-'), field.startswith('-')) for field in self.ordering]
+
+    def position_of(self, obj):
+        values = []
+        for name, _ in self._fields():
+            value = getattr(obj, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return values
+
+    def seek_filter(self, position):
+        """Rows strictly after `position` in the configured ordering"""
+        fields = self._fields()
+        condition = Q()
+        for index, (name, descending) in enumerate(fields):
+            step = Q(**{f"{name}__{'lt' if descending else 'gt'}": position[index]})
+            for prior_index, (prior_name, _) in enumerate(fields[:index]):
+                step &= Q(**{prior_name: position[prior_index]})
+            condition |= step
+
+        # Redundant bound on the leading column lets the planner range-scan the index
+        lead_name, lead_descending = fields[0]
+        bound = Q(**{f"{lead_name}__{'lte' if lead_descending else 'gte'}": position[0]})
+        return bound & condition
+
+    def encode_cursor(self, position):
+        raw = json.dumps(position, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, request, model):
+        """Position of a cursor, with each value converted by its model field"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (TypeError, ValueError):
+            raise NotFound('Invalid cursor')
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound('Invalid cursor')
+        try:
+            values = [model._meta.get_field(name).to_python(value) for (name, _), value in zip(self._fields(), position)]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound('Invalid cursor')
+        if None in values:
+            raise NotFound('Invalid cursor')
+        return values
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data)
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('next', self.get_next_link()),
+            ('previous', None),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return PageNumberPagination().get_paginated_response_schema(schema)
+
+
+class APODKeysetPagination(KeysetPagination):
+    ordering = ('-date',)  # date is unique
+
+
+class MarsPhotoKeysetPagination(KeysetPagination):
+    ordering = ('-earth_date', '-sol', 'id')
+
+
+class PublishedKeysetPagination(KeysetPagination):
+    ordering = ('-published_at', 'id')
@@ -0,0 +1,222 @@
+"""
+Database-first answers for the consolidated /proxy/ NASA endpoints.
+
+Each function returns the upstream response shape built from local tables,
+fetching and storing only what the coverage registry reports as missing, or
+None when the request cannot be answered locally (the view then proxies the
+request upstream as before).
+"""
+import logging
+import os
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from typing import Dict, List, Optional
+
+from django.utils import timezone
+
+from .coverage import is_covered, missing_ranges, split_range
+from .models import (
+    APOD, EPICImage, MarsRover, MarsRoverPhoto, NEOCloseApproach, SpaceWeatherEvent, SyncState
+)
+from .services import (
+    apod_service, epic_service, mars_rover_service, neo_service, space_weather_service
+)
+
+logger = logging.getLogger(__name__)
+
+AU_KM = 149597870.7
+LUNAR_DISTANCE_KM = 384400
+EPIC_FRESHNESS = timedelta(hours=12)
+NEO_FEED_MAX_DAYS = 7  # Longest span, end - start, the upstream feed accepts
+
+
+def apod(apod_date: date = None) -> Optional[Dict]:
+    """APOD of a date (today by default), stored on first request"""
+    entry = APOD.objects.filter(date=apod_date or timezone.now().date()).first()
+    if entry is None:
+        data = apod_service.fetch_apod(date=apod_date)
+        entry = apod_service.store_apod(data)
+        if entry is None:
+            # Error payloads are passed through unchanged
+            return data
+    return {
+        'date': entry.date.strftime('%Y-%m-%d'),
+        'title': entry.title,
+        'explanation': entry.explanation,
+        'url': entry.url,
+        'hdurl': entry.hdurl,
+        'media_type': entry.media_type,
+        'copyright': entry.copyright,
+        'service_version': 'v1',
+    }
+
+
+def neo_feed(start: date, end: date) -> Optional[Dict]:
+    """NEO feed of a date range, fetching only the days not stored yet"""
+    if end < start or (end - start).days > NEO_FEED_MAX_DAYS:
+        return None
+    # Days from today on are never covered, so they are fetched on every call
+    for gap_start, gap_end in missing_ranges('neo', start, end):
+        for chunk_start, chunk_end in split_range(gap_start, gap_end, NEO_FEED_MAX_DAYS):
+            if neo_service.store_neo_chunk(chunk_start, chunk_end) is None:
+                return None
+
+    approaches = NEOCloseApproach.objects.filter(
+        close_approach_date__date__gte=start, close_approach_date__date__lte=end
+    ).select_related('neo').order_by('close_approach_date')
+
+    near_earth_objects = defaultdict(list)
+    for approach in approaches:
+        neo = approach.neo
+        approach_time = approach.close_approach_date.astimezone(dt_timezone.utc)
+        date_str = approach_time.strftime('%Y-%m-%d')
+        near_earth_objects[date_str].append({
+            'id': neo.nasa_id,
+            'name': neo.name,
+            'absolute_magnitude_h': neo.absolute_magnitude,
+            'estimated_diameter': {
+                'kilometers': {
+                    'estimated_diameter_min': neo.estimated_diameter_min_km,
+                    'estimated_diameter_max': neo.estimated_diameter_max_km,
+                }
+            },
+            'is_potentially_hazardous_asteroid': neo.is_potentially_hazardous,
+            'is_sentry_object': neo.is_sentry_object,
+            'close_approach_data': [{
+                'close_approach_date': date_str,
+                'close_approach_date_full': approach_time.strftime('%Y-%b-%d %H:%M'),
+                'relative_velocity': {
+                    'kilometers_per_second': str(approach.relative_velocity_kmh / 3600),
+                    'kilometers_per_hour': str(approach.relative_velocity_kmh),
+                },
+                'miss_distance': {
+                    'astronomical': str(approach.miss_distance_km / AU_KM),
+                    'lunar': str(approach.miss_distance_km / LUNAR_DISTANCE_KM),
+                    'kilometers': str(approach.miss_distance_km),
+                },
+                'orbiting_body': approach.orbiting_body,
+            }],
+        })
+
+    return {
+        'links': {},
+        'element_count': sum(len(neos) for neos in near_earth_objects.values()),
+        'near_earth_objects': dict(near_earth_objects),
+    }
+
+
+def _photo_dict(photo: MarsRoverPhoto, rover: MarsRover) -> Dict:
+    return {
+        'id': int(photo.nasa_id),
+        'sol': photo.sol,
+        'camera': {'name': photo.camera_name, 'full_name': photo.camera_full_name},
+        'img_src': photo.img_src,
+        'earth_date': photo.earth_date.strftime('%Y-%m-%d'),
+        'rover': {
+            'name': rover.get_name_display(),
+            'landing_date': rover.landing_date.strftime('%Y-%m-%d'),
+            'launch_date': rover.launch_date.strftime('%Y-%m-%d'),
+            'status': rover.status,
+        },
+    }
+
+
+def mars_photos(rover_name: str, sol: int = None, earth_date: date = None,
+                camera: str = None, page: int = 1) -> Optional[Dict]:
+    """One page of a rover's photos by sol or earth date, or its latest photos"""
+    rover = MarsRover.objects.filter(name=rover_name).first()
+    if rover is None:
+        return None
+
+    key = 'photos'
+    if sol is not None:
+        # A sol maps to a single earth date, known once any photo of it is stored
+        earth_date = MarsRoverPhoto.objects.filter(rover=rover, sol=sol).values_list('earth_date', flat=True).first()
+        if earth_date is None:
+            probe = mars_rover_service.fetch_rover_photos(rover_name, sol=sol)
+            if probe is None:
+                return None
+            if not probe.get('photos'):
+                return {key: []}
+            earth_date = datetime.strptime(probe['photos'][0]['earth_date'], '%Y-%m-%d').date()
+    elif earth_date is None:
+        if rover.max_date is None or not is_covered('mars_photos', rover.max_date, scope=rover_name):
+            return None
+        earth_date, key = rover.max_date, 'latest_photos'
+
+    if not is_covered('mars_photos', earth_date, scope=rover_name):
+        if not mars_rover_service.store_photos_for_date(rover_name, earth_date):
+            return None
+
+    photos = MarsRoverPhoto.objects.filter(rover=rover, earth_date=earth_date)
+    if sol is not None:
+        photos = photos.filter(sol=sol)
+    if camera:
+        photos = photos.filter(camera_name__iexact=camera)
+    if key == 'photos':
+        per_page = mars_rover_service.PHOTOS_PER_PAGE
+        page = max(page, 1)  # Negative slice starts are not supported by querysets
+        photos = photos.order_by('id')[(page - 1) * per_page:page * per_page]
+    return {key: [_photo_dict(photo, rover) for photo in photos]}
+
+
+def _epic_dict(image: EPICImage) -> Dict:
+    return {
+        'identifier': image.identifier,
+        'caption': image.caption,
+        'image': os.path.splitext(os.path.basename(image.image_url))[0],
+        'centroid_coordinates': image.centroid_coordinates,
+        'dscovr_j2000_position': image.dscovr_j2000_position,
+        'lunar_j2000_position': image.lunar_j2000_position,
+        'sun_j2000_position': image.sun_j2000_position,
+        'attitude_quaternions': image.attitude_quaternions,
+        'date': image.date.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def epic(epic_date: date = None) -> Optional[List[Dict]]:
+    """EPIC images of a date, or of the latest stored date while the sync is fresh"""
+    if epic_date is None:
+        state = SyncState.objects.filter(dataset='epic').first()
+        if state is None or not state.last_success_at or timezone.now() - state.last_success_at > EPIC_FRESHNESS:
+            return None
+        latest = EPICImage.objects.order_by('-date').values_list('date', flat=True).first()
+        if latest is None:
+            return None
+        epic_date = latest.date()
+    elif not is_covered('epic', epic_date):
+        if not epic_service.store_epic_date(epic_date):
+            return None
+
+    images = EPICImage.objects.filter(date__date=epic_date).order_by('date')
+    return [_epic_dict(image) for image in images]
+
+
+def donki(start: date, end: date, event_type: str = None) -> Optional[List[Dict]]:
+    """Space weather events of a date range, fetching only the missing slices per type"""
+    event_types = [event_type] if event_type else list(space_weather_service.DONKI_ENDPOINTS)
+
+    gaps = defaultdict(list)
+    for name in event_types:
+        for gap in missing_ranges('space_weather', start, end, scope=name):
+            gaps[gap].append(name)
+    for (gap_start, gap_end), names in gaps.items():
+        fetched = space_weather_service.fetch_event_types(gap_start, gap_end, names)
+        space_weather_service.store_fetched_events(gap_start, gap_end, fetched)
+        if any(events is None for events in fetched.values()):
+            return None
+
+    events = SpaceWeatherEvent.objects.filter(
+        event_type__in=event_types, event_time__date__gte=start, event_time__date__lte=end
+    ).order_by('event_time')
+    return [
+        {
+            'activityID': event.nasa_id.split('_', 1)[1],
+            'messageType': event.event_type,
+            'messageIssueTime': event.event_time.isoformat(),
+            'messageBody': event.summary or 'No details available',
+            'messageID': event.nasa_id.split('_', 1)[1],
+            'messageURL': event.link,
+        }
+        for event in events
+    ]
@@ -0,0 +1,203 @@
+"""
+Data retention engine.
+
+Each ``RetentionPolicy`` names a model and the rows that have expired. Rows
+are removed in primary-key ordered batches, each in its own short
+transaction, so cleanup never holds long locks or loads a whole table into
+memory. Models without dependent rows are deleted with a single raw DELETE
+per batch instead of going through Django's cascade collector. Expired rows
+can optionally be archived to gzip-compressed NDJSON before deletion, and a
+policy can release files owned by the rows once each batch is committed.
+"""
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from astroworld.versions import bump
+
+from .coverage import forget_before
+from .image_derivatives import derivative_store
+from .models import (
+    APOD, NearEarthObject, NEOCloseApproach, EPICImage, APIUsageLog, APIUsageRollup
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RetentionPolicy:
+    """Expired rows of one model"""
+
+    def __init__(self, name: str, model, filters: Callable[[], Dict],
+                 raw_delete: Optional[bool] = None, description: str = '',
+                 coverage: Optional[Tuple[str, Callable[[], date]]] = None,
+                 dataset: Optional[str] = None,
+                 release: Optional[Tuple[str, Callable[[Iterable], None]]] = None):
+        self.name = name
+        self.model = model
+        self.filters = filters
+        self.description = description
+        # (dataset, cutoff) of the coverage registry to trim along with the rows
+        self.coverage = coverage
+        # Version counter to bump when rows are deleted
+        self.dataset = dataset or (coverage[0] if coverage else None)
+        # (field, callback) called with the field values of each deleted batch
+        self.release = release
+        # Raw deletes skip cascades, so only use them when nothing references the model
+        self.raw_delete = not model._meta.related_objects if raw_delete is None else raw_delete
+
+    def queryset(self):
+        return self.model.objects.filter(**self.filters())
+
+
+def _days_ago(days: int):
+    return timezone.now() - timedelta(days=days)
+
+
+def _release_derivatives(digests: Iterable[str]):
+    """Remove stored derivatives that no remaining EPIC image references"""
+    digests = set(digests) - {''}
+    referenced = set(EPICImage.objects.filter(content_hash__in=digests).values_list('content_hash', flat=True))
+    for digest in digests - referenced:
+        derivative_store.remove(digest)
+
+
+RETENTION_POLICIES = [
+    RetentionPolicy(
+        'apod', APOD,
+        lambda: {'date__lt': _days_ago(730).date()},
+        description='APOD entries older than 2 years',
+        dataset='apod'
+    ),
+    RetentionPolicy(
+        'neo_approaches', NEOCloseApproach,
+        lambda: {'close_approach_date__lt': _days_ago(365)},
+        description='NEO close approaches more than 1 year in the past',
+        coverage=('neo', lambda: _days_ago(365).date())
+    ),
+    RetentionPolicy(
+        'neo_orphans', NearEarthObject,
+        # Runs after neo_approaches, so NEOs with future approaches are kept
+        lambda: {'close_approaches__isnull': True, 'updated_at__lt': _days_ago(1)},
+        raw_delete=True,
+        description='NEOs left without any close approach',
+        dataset='neo'
+    ),
+    RetentionPolicy(
+        'epic', EPICImage,
+        lambda: {'date__lt': _days_ago(180)},
+        description='EPIC images older than 6 months',
+        coverage=('epic', lambda: _days_ago(180).date()),
+        release=('content_hash', _release_derivatives)
+    ),
+    RetentionPolicy(
+        'api_usage_logs', APIUsageLog,
+        lambda: {'timestamp__lt': _days_ago(90)},
+        description='API usage logs older than 3 months'
+    ),
+    RetentionPolicy(
+        'api_usage_rollups', APIUsageRollup,
+        lambda: {'bucket__lt': _days_ago(400)},
+        description='Per-minute API usage rollups older than 400 days'
+    ),
+]
+
+
+class RetentionEngine:
+    """Apply retention policies in bounded batches"""
+
+    def __init__(self, batch_size: int = None, archive: bool = None,
+                 archive_dir: str = None, pause: float = 0,
+                 progress: Callable[[str, int], None] = None):
+        self.batch_size = batch_size or getattr(settings, 'RETENTION_BATCH_SIZE', 1000)
+        self.archive = getattr(settings, 'RETENTION_ARCHIVE', False) if archive is None else archive
+        self.archive_dir = archive_dir or getattr(settings, 'RETENTION_ARCHIVE_DIR', None)
+        self.pause = pause
+        self.progress = progress
+
+    def run(self, policies: List[RetentionPolicy] = None) -> Dict[str, int]:
+        results = {}
+        for policy in policies or RETENTION_POLICIES:
+            results[policy.name] = self.apply(policy)
+        return results
+
+    def apply(self, policy: RetentionPolicy) -> int:
+        """Delete the expired rows of one policy; returns the number deleted"""
+        queryset = policy.queryset()
+        archive_file = None
+        deleted = 0
+        last_pk = None
+
+        try:
+            while True:
+                batch = queryset.order_by('pk')
+                if last_pk is not None:
+                    batch = batch.filter(pk__gt=last_pk)
+                ids = list(batch.values_list('pk', flat=True).distinct()[:self.batch_size])
+                if not ids:
+                    break
+                last_pk = ids[-1]
+                if self.archive and archive_file is None:
+                    archive_file = self._open_archive(policy)
+
+                released = []
+                with transaction.atomic():
+                    # Re-apply the policy filter so rows that changed since selection are kept
+                    rows = policy.queryset().filter(pk__in=ids)
+                    if policy.release:
+                        released = list(rows.values_list(policy.release[0], flat=True))
+                    if archive_file:
+                        for row in rows.values().iterator():
+                            archive_file.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+                    if policy.raw_delete:
+                        deleted += rows._raw_delete(rows.db)
+                    else:
+                        deleted += rows.delete()[1].get(policy.model._meta.label, 0)
+                if released:
+                    # After the commit, so a rolled back batch keeps its files
+                    policy.release[1](released)
+
+                if self.progress:
+                    self.progress(policy.name, deleted)
+                logger.debug(f'Retention {policy.name}: {deleted} rows deleted so far')
+                if self.pause:
+                    time.sleep(self.pause)
+        finally:
+            if archive_file:
+                archive_file.close()
+
+        if policy.coverage:
+            # Deleted ranges must be fetched upstream again by read-through endpoints
+            dataset, cutoff = policy.coverage
+            forget_before(dataset, cutoff())
+
+        if deleted:
+            logger.info(f'Retention {policy.name}: deleted {deleted} rows')
+            if policy.dataset:
+                bump(policy.dataset)
+        return deleted
+
+    def _open_archive(self, policy: RetentionPolicy):
+        archive_dir = self.archive_dir or os.path.join(settings.BASE_DIR, 'archive')
+        os.makedirs(archive_dir, exist_ok=True)
+        stamp = timezone.now().strftime('%Y%m%dT%H%M%S')
+        path = os.path.join(archive_dir, f'{policy.name}-{stamp}.ndjson.gz')
+        return gzip.open(path, 'at', encoding='utf-8')
+
+
+def get_policies(names: List[str] = None) -> List[RetentionPolicy]:
+    """Policies by name, in their declared order"""
+    if not names:
+        return list(RETENTION_POLICIES)
+    unknown = set(names) - {policy.name for policy in RETENTION_POLICIES}
+    if unknown:
+        raise ValueError(f"Unknown retention policies: {', '.join(sorted(unknown))}")
+    return [policy for policy in RETENTION_POLICIES if policy.name in names]
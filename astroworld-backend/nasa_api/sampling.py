@@ -0,0 +1,96 @@
+"""
+Random row sampling without ORDER BY RANDOM().
+
+``RandomSampler`` keeps the primary-key range of the rows it samples in the
+cache, keyed on the version of the dataset it belongs to, and draws random
+keys inside it, so every sample is an index lookup rather than a full table
+sort. Keys that miss (deleted or filtered-out rows) are rejected and redrawn,
+which keeps every matching row equally likely; the draw grows with the miss
+rate seen so far. Only when the rows are too sparse for a few rounds does it
+fall back to random offsets into the matching rows.
+"""
+import random
+from typing import List
+
+from django.core.cache import cache
+from django.db.models import Max, Min
+
+from astroworld.versions import versioned_key
+
+from .models import APOD, MarsRoverPhoto, NASAMediaItem
+
+
+class RandomSampler:
+    """Sample random rows of a model via cached primary-key bounds"""
+
+    BOUNDS_TIMEOUT = 24 * 60 * 60  # Cache pk bounds for 24 hours; syncs bump the dataset version
+    OVERSAMPLE = 3  # Candidate keys drawn per requested row
+    MAX_ROUNDS = 4  # Rejection rounds before falling back to offsets
+    MAX_CANDIDATES = 1000  # Keys looked up per round
+
+    def __init__(self, model, dataset: str, name: str = None, select_related=(), **filters):
+        self.model = model
+        self.dataset = dataset
+        self.filters = filters
+        self.select_related = select_related
+        self.name = name or model._meta.label_lower
+
+    def get_queryset(self):
+        queryset = self.model.objects.filter(**self.filters)
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        return queryset
+
+    @property
+    def bounds_cache_key(self):
+        return versioned_key(f"random_sampler_bounds_{self.name}", [self.dataset])
+
+    def _bounds(self):
+        cache_key = self.bounds_cache_key
+        bounds = cache.get(cache_key)
+        if bounds is None:
+            # MIN/MAX on the primary key are answered from the index
+            result = self.model.objects.filter(**self.filters).aggregate(low=Min('pk'), high=Max('pk'))
+            bounds = (result['low'], result['high'])
+            cache.set(cache_key, bounds, self.BOUNDS_TIMEOUT)
+        return bounds
+
+    def sample(self, count: int = 1) -> List:
+        """Return up to `count` distinct random rows"""
+        low, high = self._bounds()
+        if low is None or count <= 0:
+            return []
+
+        queryset = self.get_queryset()
+        span = high - low + 1
+        picked, drawn, hits = {}, 0, 0
+        for _ in range(self.MAX_ROUNDS):
+            missing = count - len(picked)
+            if missing <= 0:
+                break
+            # Scale the draw by the hit rate so far; a miss is redrawn, never replaced by a neighbour
+            rate = hits / drawn if hits else 1 / self.OVERSAMPLE
+            size = min(int(missing / rate) + 1, self.MAX_CANDIDATES, span)
+            candidates = {random.randint(low, high) for _ in range(size)} - picked.keys()
+            found = list(queryset.filter(pk__in=candidates))
+            drawn += len(candidates)
+            hits += len(found)
+            for obj in random.sample(found, min(missing, len(found))):
+                picked[obj.pk] = obj
+
+        if len(picked) < count:
+            # Too sparse to hit by key: uniform offsets into the remaining rows
+            remaining = queryset.exclude(pk__in=list(picked)).order_by('pk')
+            total = remaining.count()
+            for offset in sorted(random.sample(range(total), min(count - len(picked), total)), reverse=True):
+                obj = remaining[offset]
+                picked[obj.pk] = obj
+
+        rows = list(picked.values())
+        random.shuffle(rows)
+        return rows
+
+
+apod_sampler = RandomSampler(APOD, 'apod')
+mars_photo_sampler = RandomSampler(MarsRoverPhoto, 'mars_photos', select_related=['rover'])
+media_image_sampler = RandomSampler(NASAMediaItem, 'nasa_media', name='nasa_media_image', media_type='image')
@@ -1,3 +1,4 @@
+from django.urls import reverse
 from rest_framework import serializers
 from .models import (
     APOD, NearEarthObject, NEOCloseApproach, MarsRover, MarsRoverPhoto,
@@ -5,6 +6,35 @@ from .models import (
     SpaceEvent, UserSavedItem, UserTrackedObject, NASAMediaItem, Satellite
 )
 
+
+def user_has_saved(context, item_type, item_id):
+    """Whether the requesting user saved an item; uses context['saved_items'] when preloaded"""
+    saved_items = context.get('saved_items')
+    if saved_items is not None:
+        return (item_type, item_id) in saved_items
+    request = context.get('request')
+    if request and request.user.is_authenticated:
+        return UserSavedItem.objects.filter(
+            user=request.user,
+            item_type=item_type,
+            item_id=item_id
+        ).exists()
+    return False
+
+def user_is_tracking(context, object_type, object_id):
+    """Whether the requesting user tracks an object; uses context['tracked_objects'] when preloaded"""
+    tracked_objects = context.get('tracked_objects')
+    if tracked_objects is not None:
+        return (object_type, object_id) in tracked_objects
+    request = context.get('request')
+    if request and request.user.is_authenticated:
+        return UserTrackedObject.objects.filter(
+            user=request.user,
+            object_type=object_type,
+            object_id=object_id
+        ).exists()
+    return False
+
 class APODSerializer(serializers.ModelSerializer):
     is_saved = serializers.SerializerMethodField()
     
@@ -13,14 +43,7 @@ class APODSerializer(serializers.ModelSerializer):
         fields = '__all__'
     
     def get_is_saved(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return UserSavedItem.objects.filter(
-                user=request.user,
-                item_type='apod',
-                item_id=obj.nasa_id
-            ).exists()
-        return False
+        return user_has_saved(self.context, 'apod', obj.nasa_id)
 
 class NEOCloseApproachSerializer(serializers.ModelSerializer):
     class Meta:
@@ -47,24 +70,10 @@ class NEOSerializer(serializers.ModelSerializer):
         return None
     
     def get_is_saved(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return UserSavedItem.objects.filter(
-                user=request.user,
-                item_type='neo',
-                item_id=obj.nasa_id
-            ).exists()
-        return False
+        return user_has_saved(self.context, 'neo', obj.nasa_id)
     
     def get_is_tracked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return UserTrackedObject.objects.filter(
-                user=request.user,
-                object_type='neo',
-                object_id=obj.nasa_id
-            ).exists()
-        return False
+        return user_is_tracking(self.context, 'neo', obj.nasa_id)
 
 class MarsRoverSerializer(serializers.ModelSerializer):
     class Meta:
@@ -80,31 +89,30 @@ class MarsRoverPhotoSerializer(serializers.ModelSerializer):
         fields = '__all__'
     
     def get_is_saved(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return UserSavedItem.objects.filter(
-                user=request.user,
-                item_type='mars_photo',
-                item_id=obj.nasa_id
-            ).exists()
-        return False
+        return user_has_saved(self.context, 'mars_photo', obj.nasa_id)
 
 class EPICImageSerializer(serializers.ModelSerializer):
     is_saved = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
+    webp_url = serializers.SerializerMethodField()
     
     class Meta:
         model = EPICImage
         fields = '__all__'
     
     def get_is_saved(self, obj):
+        return user_has_saved(self.context, 'epic', obj.nasa_id)
+    
+    def _variant_url(self, obj, variant):
+        url = reverse('nasa_api:epic-image-variant', args=[obj.nasa_id, variant])
         request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return UserSavedItem.objects.filter(
-                user=request.user,
-                item_type='epic',
-                item_id=obj.nasa_id
-            ).exists()
-        return False
+        return request.build_absolute_uri(url) if request else url
+    
+    def get_thumbnail_url(self, obj):
+        return self._variant_url(obj, 'thumb')
+    
+    def get_webp_url(self, obj):
+        return self._variant_url(obj, 'full')
 
 class ExoplanetSerializer(serializers.ModelSerializer):
     is_saved = serializers.SerializerMethodField()
@@ -116,24 +124,10 @@ class ExoplanetSerializer(serializers.ModelSerializer):
         fields = '__all__'
     
     def get_is_saved(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return UserSavedItem.objects.filter(
-                user=request.user,
-                item_type='exoplanet',
-                item_id=obj.nasa_id
-            ).exists()
-        return False
+        return user_has_saved(self.context, 'exoplanet', obj.nasa_id)
     
     def get_is_tracked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return UserTrackedObject.objects.filter(
-                user=request.user,
-                object_type='exoplanet',
-                object_id=obj.nasa_id
-            ).exists()
-        return False
+        return user_is_tracking(self.context, 'exoplanet', obj.nasa_id)
     
     def get_distance_light_years(self, obj):
         if obj.distance_from_earth:
@@ -149,24 +143,10 @@ class SpaceWeatherEventSerializer(serializers.ModelSerializer):
         fields = '__all__'
     
     def get_is_saved(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return UserSavedItem.objects.filter(
-                user=request.user,
-                item_type='space_weather',
-                item_id=obj.nasa_id
-            ).exists()
-        return False
+        return user_has_saved(self.context, 'space_weather', obj.nasa_id)
     
     def get_is_tracked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return UserTrackedObject.objects.filter(
-                user=request.user,
-                object_type='space_weather',
-                object_id=obj.nasa_id
-            ).exists()
-        return False
+        return user_is_tracking(self.context, 'space_weather', obj.nasa_id)
 
 class NaturalEventGeometrySerializer(serializers.ModelSerializer):
     class Meta:
@@ -190,24 +170,10 @@ class NaturalEventSerializer(serializers.ModelSerializer):
         return None
     
     def get_is_saved(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return UserSavedItem.objects.filter(
-                user=request.user,
-                item_type='natural_event',
-                item_id=obj.nasa_id
-            ).exists()
-        return False
+        return user_has_saved(self.context, 'natural_event', obj.nasa_id)
     
     def get_is_tracked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return UserTrackedObject.objects.filter(
-                user=request.user,
-                object_type='natural_event',
-                object_id=obj.nasa_id
-            ).exists()
-        return False
+        return user_is_tracking(self.context, 'natural_event', obj.nasa_id)
 
 
 class SpaceEventSerializer(serializers.ModelSerializer):
@@ -223,24 +189,10 @@ class SpaceEventSerializer(serializers.ModelSerializer):
         fields = '__all__'
     
     def get_is_saved(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return UserSavedItem.objects.filter(
-                user=request.user,
-                item_type='space_event',
-                item_id=obj.nasa_id
-            ).exists()
-        return False
+        return user_has_saved(self.context, 'space_event', obj.nasa_id)
     
     def get_is_tracked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return UserTrackedObject.objects.filter(
-                user=request.user,
-                object_type='space_event',
-                object_id=obj.nasa_id
-            ).exists()
-        return False
+        return user_is_tracking(self.context, 'space_event', obj.nasa_id)
 
 
 class UserSavedItemSerializer(serializers.ModelSerializer):
@@ -253,6 +205,14 @@ class UserSavedItemSerializer(serializers.ModelSerializer):
     
     def get_item_data(self, obj):
         """Get the actual saved item data"""
+        preloaded = self.context.get('item_objects')
+        if preloaded is not None:
+            item = preloaded.get((obj.item_type, obj.item_id))
+            serializer_class = SAVED_ITEM_SERIALIZERS.get(obj.item_type)
+            if item is None or serializer_class is None:
+                return None
+            return serializer_class(item, context=self.context).data
+        
         if obj.item_type == 'apod':
             try:
                 item = APOD.objects.get(nasa_id=obj.item_id)
@@ -274,6 +234,13 @@ class UserSavedItemSerializer(serializers.ModelSerializer):
         # Add more item types as needed
         return None
 
+# Serializers used to render saved items, keyed by UserSavedItem.item_type
+SAVED_ITEM_SERIALIZERS = {
+    'apod': APODSerializer,
+    'neo': NEOSerializer,
+    'mars_photo': MarsRoverPhotoSerializer,
+}
+
 class UserTrackedObjectSerializer(serializers.ModelSerializer):
     object_data = serializers.SerializerMethodField()
     
@@ -284,9 +251,15 @@ class UserTrackedObjectSerializer(serializers.ModelSerializer):
     
     def get_object_data(self, obj):
         """Get the actual tracked object data"""
+        preloaded = self.context.get('item_objects')
         if obj.object_type == 'neo':
             try:
-                item = NearEarthObject.objects.get(nasa_id=obj.object_id)
+                if preloaded is not None:
+                    item = preloaded.get(('neo', obj.object_id))
+                    if item is None:
+                        return None
+                else:
+                    item = NearEarthObject.objects.get(nasa_id=obj.object_id)
                 return {
                     'name': item.name,
                     'is_potentially_hazardous': item.is_potentially_hazardous,
@@ -296,7 +269,12 @@ class UserTrackedObjectSerializer(serializers.ModelSerializer):
                 return None
         elif obj.object_type == 'exoplanet':
             try:
-                item = Exoplanet.objects.get(nasa_id=obj.object_id)
+                if preloaded is not None:
+                    item = preloaded.get(('exoplanet', obj.object_id))
+                    if item is None:
+                        return None
+                else:
+                    item = Exoplanet.objects.get(nasa_id=obj.object_id)
                 return {
                     'name': item.name,
                     'host_star': item.host_star,
@@ -1,27 +1,64 @@
+import asyncio
+import contextvars
+import csv
+import math
+import threading
 import requests
 import logging
-from datetime import datetime, timedelta
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
 from django.conf import settings
+from django.db import connections
+from django.db.models import Count
 from django.utils import timezone
 from django.core.cache import cache
-from typing import Optional, Dict, List, Any
+from astroworld.circuit import get_breaker
+from astroworld.upstream import AsyncUpstreamClient, NotModified, UpstreamSession, async_client_scope
+from typing import Optional, Callable, Dict, Iterator, List, Any
+from urllib.parse import urlsplit
 import time
 
 from .models import (
     APOD, NearEarthObject, NEOCloseApproach, MarsRover, MarsRoverPhoto,
-    EPICImage, Exoplanet, SpaceWeatherEvent, NaturalEvent, NaturalEventGeometry,
-    APIUsageLog
+    EPICImage, Exoplanet, SpaceWeatherEvent, NaturalEvent, NaturalEventGeometry, SyncState
 )
+from .coverage import mark_covered, split_range
+from .image_derivatives import derivative_store
+from .usage import usage_buffer
+from .sync import mark_sync, track_sync
 
 logger = logging.getLogger(__name__)
 
+# Serializes derivative generation per image within a process; images share
+# a fixed set of locks by hash so the set never grows
+_derive_locks = [threading.Lock() for _ in range(64)]
+
+
+def fetch_concurrently(fetch: Callable, items: List, max_workers: int = None) -> List:
+    """Run `fetch` over `items` in a thread pool; results keep the order of `items`"""
+    max_workers = max_workers or getattr(settings, 'UPSTREAM_MAX_WORKERS', 8)
+    
+    # Workers inherit the caller's context, e.g. the upstream call priority
+    context = contextvars.copy_context()
+    
+    def run(item):
+        try:
+            return context.copy().run(fetch, item)
+        finally:
+            # Worker threads may open DB connections (e.g. usage log flushes)
+            connections.close_all()
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items) or 1)) as executor:
+        return list(executor.map(run, items))
+
 class NASAAPIService:
     """Base service for NASA API interactions"""
     
     def __init__(self):
         self.api_key = settings.NASA_API_KEY
         self.base_url = "https://api.nasa.gov"
-        self.session = requests.Session()
+        self.session = UpstreamSession()
         
     def _make_request(self, endpoint: str, params: Dict = None) -> Optional[Dict]:
         """Make a request to NASA API with error handling and logging"""
@@ -36,23 +73,21 @@ class NASAAPIService:
         try:
             response = self.session.get(url, params=params, timeout=30)
             response_time = time.time() - start_time
+            response.raise_for_status()
             
-            # Log API usage
-            APIUsageLog.objects.create(
+            # Log API usage (buffered, written in batches); failures are logged below
+            usage_buffer.record(
                 endpoint=endpoint,
-                timestamp=timezone.now(),
                 response_time=response_time,
                 status_code=response.status_code
             )
             
-            response.raise_for_status()
             return response.json()
             
         except requests.exceptions.RequestException as e:
             logger.error(f"NASA API request failed for {endpoint}: {str(e)}")
-            APIUsageLog.objects.create(
+            usage_buffer.record(
                 endpoint=endpoint,
-                timestamp=timezone.now(),
                 response_time=time.time() - start_time,
                 status_code=getattr(e.response, 'status_code', 0),
                 error_message=str(e)
@@ -73,6 +108,30 @@ class APODService(NASAAPIService):
             
         return self._make_request('planetary/apod', params)
     
+    def store_apod(self, data: Optional[Dict]) -> Optional[APOD]:
+        """Save one APOD API entry; returns None for errors and unparseable entries"""
+        if not data or 'error' in data or 'date' not in data:
+            return None
+        try:
+            apod_date = datetime.strptime(data['date'], '%Y-%m-%d').date()
+            apod, _ = APOD.objects.get_or_create(
+                date=apod_date,
+                defaults={
+                    'nasa_id': f"apod_{apod_date.strftime('%Y%m%d')}",
+                    'title': data.get('title', ''),
+                    'explanation': data.get('explanation', ''),
+                    'url': data.get('url', ''),
+                    'hdurl': data.get('hdurl'),
+                    'media_type': data.get('media_type', 'image'),
+                    'copyright': data.get('copyright')
+                }
+            )
+            return apod
+        except Exception as e:
+            logger.error(f"Error saving APOD for {data.get('date')}: {str(e)}")
+            return None
+    
+    @track_sync('apod')
     def sync_apod_data(self, days_back: int = 7) -> int:
         """Sync APOD data for the last N days"""
         synced_count = 0
@@ -84,24 +143,10 @@ class APODService(NASAAPIService):
             # Check if we already have this date
             if not APOD.objects.filter(date=current_date).exists():
                 data = self.fetch_apod(current_date)
-                if data and 'error' not in data:
-                    try:
-                        APOD.objects.create(
-                            nasa_id=f"apod_{current_date.strftime('%Y%m%d')}",
-                            date=current_date,
-                            title=data.get('title', ''),
-                            explanation=data.get('explanation', ''),
-                            url=data.get('url', ''),
-                            hdurl=data.get('hdurl'),
-                            media_type=data.get('media_type', 'image'),
-                            copyright=data.get('copyright')
-                        )
-                        synced_count += 1
-                    except Exception as e:
-                        logger.error(f"Error saving APOD for {current_date}: {str(e)}")
+                if self.store_apod(data):
+                    synced_count += 1
             
             current_date += timedelta(days=1)
-            time.sleep(0.1)  # Rate limiting
         
         return synced_count
 
@@ -126,30 +171,37 @@ class NEOService(NASAAPIService):
         """Fetch detailed info for specific NEO"""
         return self._make_request(f'neo/rest/v1/neo/{neo_id}')
     
+    @track_sync('neo')
     def sync_neo_data(self, days_ahead: int = 30) -> int:
         """Sync NEO data for upcoming days"""
-        synced_count = 0
         start_date = timezone.now().date()
-        end_date = start_date + timedelta(days=days_ahead)
+        return self.store_neo_range(start_date, start_date + timedelta(days=days_ahead))
+    
+    def store_neo_range(self, start_date, end_date) -> int:
+        """Fetch and store the NEO feed for a date range, recording the covered chunks"""
+        synced_count = 0
         
         # Fetch in chunks of 7 days (API limit)
-        current_start = start_date
-        while current_start < end_date:
-            current_end = min(current_start + timedelta(days=6), end_date)
-            
-            data = self.fetch_neo_feed(current_start, current_end)
-            if data and 'near_earth_objects' in data:
-                for date_str, neo_list in data['near_earth_objects'].items():
-                    for neo_data in neo_list:
-                        neo, created = self._save_neo_data(neo_data)
-                        if created:
-                            synced_count += 1
-            
-            current_start = current_end + timedelta(days=1)
-            time.sleep(0.5)  # Rate limiting
+        for chunk_start, chunk_end in split_range(start_date, end_date, 7):
+            synced_count += self.store_neo_chunk(chunk_start, chunk_end) or 0
         
         return synced_count
     
+    def store_neo_chunk(self, start_date, end_date) -> Optional[int]:
+        """Fetch and store at most 7 days of the NEO feed; None if the fetch failed"""
+        data = self.fetch_neo_feed(start_date, end_date)
+        if not data or 'near_earth_objects' not in data:
+            return None
+        synced_count = 0
+        for date_str, neo_list in data['near_earth_objects'].items():
+            for neo_data in neo_list:
+                neo, created = self._save_neo_data(neo_data)
+                if created:
+                    synced_count += 1
+        # Only settled days are recorded; today and later are fetched again next time
+        mark_covered('neo', start_date, end_date)
+        return synced_count
+    
     def _save_neo_data(self, neo_data: Dict) -> tuple:
         """Save NEO data to database"""
         neo_id = neo_data['id']
@@ -167,11 +219,14 @@ class NEOService(NASAAPIService):
             }
         )
         
-        # Save close approach data
+        # Save close approach data; predictions are refined, so refresh them
         for approach_data in neo_data.get('close_approach_data', []):
-            NEOCloseApproach.objects.get_or_create(
+            NEOCloseApproach.objects.update_or_create(
                 neo=neo,
-                close_approach_date=approach_data['close_approach_date_full'],
+                # e.g. "2024-Jan-05 13:47", in UTC
+                close_approach_date=datetime.strptime(
+                    approach_data['close_approach_date_full'], '%Y-%b-%d %H:%M'
+                ).replace(tzinfo=dt_timezone.utc),
                 defaults={
                     'relative_velocity_kmh': float(approach_data['relative_velocity']['kilometers_per_hour']),
                     'miss_distance_km': float(approach_data['miss_distance']['kilometers']),
@@ -184,6 +239,8 @@ class NEOService(NASAAPIService):
 class MarsRoverService(NASAAPIService):
     """Mars Rover Photos service"""
     
+    PHOTOS_PER_PAGE = 25
+    
     def fetch_rover_photos(self, rover: str, sol: int = None, earth_date: str = None, 
                           camera: str = None, page: int = 1) -> Optional[Dict]:
         """Fetch Mars rover photos"""
@@ -203,17 +260,15 @@ class MarsRoverService(NASAAPIService):
         """Fetch rover mission manifest"""
         return self._make_request(f'mars-photos/api/v1/manifests/{rover}')
     
-    def sync_rover_data(self, rover_name: str, latest_sols: int = 10) -> int:
-        """Sync latest photos from a rover"""
-        synced_count = 0
-        
-        # Get or create rover
+    @track_sync('mars_photos')
+    def sync_rover_data(self, rover_name: str, latest_sols: Optional[int] = 10) -> int:
+        """Sync photos of the latest sols (all sols when None) that are missing locally"""
         manifest_data = self.fetch_rover_manifest(rover_name)
         if not manifest_data:
             return 0
             
         rover_info = manifest_data['photo_manifest']
-        rover, created = MarsRover.objects.get_or_create(
+        rover, created = MarsRover.objects.update_or_create(
             name=rover_name,
             defaults={
                 'landing_date': rover_info['landing_date'],
@@ -225,31 +280,97 @@ class MarsRoverService(NASAAPIService):
             }
         )
         
-        # Sync photos from latest sols
+        # Diff the manifest's per-sol photo counts against what is stored
         max_sol = rover_info['max_sol']
-        start_sol = max(0, max_sol - latest_sols)
-        
-        for sol in range(start_sol, max_sol + 1):
-            photos_data = self.fetch_rover_photos(rover_name, sol=sol)
-            if photos_data and 'photos' in photos_data:
-                for photo_data in photos_data['photos']:
-                    photo, created = MarsRoverPhoto.objects.get_or_create(
-                        nasa_id=str(photo_data['id']),
-                        defaults={
-                            'rover': rover,
-                            'sol': photo_data['sol'],
-                            'img_src': photo_data['img_src'],
-                            'earth_date': photo_data['earth_date'],
-                            'camera_name': photo_data['camera']['name'],
-                            'camera_full_name': photo_data['camera']['full_name']
-                        }
-                    )
-                    if created:
-                        synced_count += 1
-            
-            time.sleep(0.2)  # Rate limiting
+        start_sol = 0 if latest_sols is None else max(0, max_sol - latest_sols)
+        stored = dict(
+            MarsRoverPhoto.objects.filter(rover=rover, sol__gte=start_sol)
+            .values('sol').annotate(count=Count('id')).values_list('sol', 'count')
+        )
+        requests_to_make = []
+        for sol_info in rover_info.get('photos', []):
+            sol = sol_info['sol']
+            if sol < start_sol or stored.get(sol, 0) >= sol_info['total_photos']:
+                continue
+            pages = math.ceil(sol_info['total_photos'] / self.PHOTOS_PER_PAGE)
+            requests_to_make.extend((sol, page) for page in range(1, pages + 1))
         
+        synced_count = 0
+        if requests_to_make:
+            logger.info(f"Fetching {len(requests_to_make)} photo pages for {rover_name}")
+            results = fetch_concurrently(
+                lambda item: self.fetch_rover_photos(rover_name, sol=item[0], page=item[1]),
+                requests_to_make
+            )
+            synced_count = self._store_photos(rover, results)
+        
+        self._mark_complete_dates(rover, rover_info.get('photos', []), start_sol)
         return synced_count
+    
+    def _store_photos(self, rover: MarsRover, results: List[Optional[Dict]]) -> int:
+        """Bulk insert the photos of several API pages; returns how many were new"""
+        photos = []
+        for photos_data in results:
+            for photo_data in (photos_data or {}).get('photos', []):
+                photos.append(MarsRoverPhoto(
+                    nasa_id=str(photo_data['id']),
+                    rover=rover,
+                    sol=photo_data['sol'],
+                    img_src=photo_data['img_src'],
+                    earth_date=photo_data['earth_date'],
+                    camera_name=photo_data['camera']['name'],
+                    camera_full_name=photo_data['camera']['full_name']
+                ))
+        
+        before = MarsRoverPhoto.objects.filter(rover=rover).count()
+        MarsRoverPhoto.objects.bulk_create(photos, batch_size=500, ignore_conflicts=True)
+        return MarsRoverPhoto.objects.filter(rover=rover).count() - before
+    
+    def _mark_complete_dates(self, rover: MarsRover, sols: List[Dict], start_sol: int):
+        """Record earth dates whose sols are all fully stored as covered"""
+        # One sol earlier, as an earth date can span two sols
+        first_sol = max(0, start_sol - 1)
+        stored = dict(
+            MarsRoverPhoto.objects.filter(rover=rover, sol__gte=first_sol)
+            .values('sol').annotate(count=Count('id')).values_list('sol', 'count')
+        )
+        complete = defaultdict(lambda: True)
+        for sol_info in sols:
+            if sol_info['sol'] >= first_sol:
+                earth_date = datetime.strptime(sol_info['earth_date'], '%Y-%m-%d').date()
+                complete[earth_date] &= stored.get(sol_info['sol'], 0) >= sol_info['total_photos']
+        
+        run = []
+        for earth_date in sorted(complete):
+            if complete[earth_date] and (not run or earth_date - run[-1] == timedelta(days=1)):
+                run.append(earth_date)
+                continue
+            if run:
+                mark_covered('mars_photos', run[0], run[-1], scope=rover.name)
+            run = [earth_date] if complete[earth_date] else []
+        if run:
+            mark_covered('mars_photos', run[0], run[-1], scope=rover.name)
+    
+    def store_photos_for_date(self, rover_name: str, earth_date) -> bool:
+        """Fetch every page of a rover's photos for one earth date; False if a page failed"""
+        rover = MarsRover.objects.filter(name=rover_name).first()
+        if rover is None:
+            return False
+        
+        results = []
+        page = 1
+        while True:
+            photos_data = self.fetch_rover_photos(rover_name, earth_date=earth_date.strftime('%Y-%m-%d'), page=page)
+            if photos_data is None:
+                return False
+            results.append(photos_data)
+            if len(photos_data.get('photos', [])) < self.PHOTOS_PER_PAGE:
+                break
+            page += 1
+        
+        self._store_photos(rover, results)
+        mark_covered('mars_photos', earth_date, earth_date, scope=rover_name)
+        return True
 
 class EPICService(NASAAPIService):
     """Earth Polychromatic Imaging Camera service"""
@@ -265,115 +386,209 @@ class EPICService(NASAAPIService):
         date_str = date.strftime('%Y-%m-%d')
         return self._make_request(f'EPIC/api/natural/date/{date_str}')
     
-    def sync_epic_data(self, days_back: int = 7) -> int:
-        """Sync EPIC images"""
-        synced_count = 0
+    @track_sync('epic')
+    def sync_epic_data(self, days_back: int = 7, derivatives: bool = None) -> int:
+        """Sync EPIC images of the last N days, fetching the dates concurrently"""
+        end_date = timezone.now().date()
+        dates = [end_date - timedelta(days=offset) for offset in range(days_back + 1)]
         
-        # Get available dates first
-        available_data = self.fetch_epic_images(available_dates=True)
-        if not available_data:
-            return 0
+        # Dates without imagery simply return an empty list
+        results = fetch_concurrently(self.fetch_epic_images, dates)
         
-        # Process recent dates
-        end_date = timezone.now().date()
-        start_date = end_date - timedelta(days=days_back)
+        synced_count = 0
+        for date_obj, images_data in zip(dates, results):
+            if images_data is not None:
+                synced_count += self._store_epic_images(date_obj, images_data)
+        
+        if derivatives is None:
+            derivatives = getattr(settings, 'EPIC_DERIVATIVES_ON_SYNC', True)
+        if derivatives and synced_count:
+            self.derive_images(EPICImage.objects.filter(date__date__gte=dates[-1], content_hash=''))
         
-        for date_item in available_data[-days_back:]:  # Get recent dates
+        return synced_count
+    
+    def _store_epic_images(self, date_obj, images_data: List[Dict]) -> int:
+        """Bulk insert the images of one date and record the date as covered"""
+        images = []
+        for image_data in images_data:
             try:
-                date_obj = datetime.strptime(date_item['date'], '%Y-%m-%d').date()
-                if start_date <= date_obj <= end_date:
-                    images_data = self.fetch_epic_images(date_obj)
-                    if images_data:
-                        for image_data in images_data:
-                            epic_image, created = EPICImage.objects.get_or_create(
-                                nasa_id=image_data['identifier'],
-                                defaults={
-                                    'identifier': image_data['identifier'],
-                                    'caption': image_data.get('caption', ''),
-                                    'image_url': f"https://api.nasa.gov/EPIC/archive/natural/{date_obj.strftime('%Y/%m/%d')}/png/{image_data['image']}.png",
-                                    'date': image_data['date'],
-                                    'centroid_coordinates': image_data.get('centroid_coordinates', {}),
-                                    'dscovr_j2000_position': image_data.get('dscovr_j2000_position', {}),
-                                    'lunar_j2000_position': image_data.get('lunar_j2000_position', {}),
-                                    'sun_j2000_position': image_data.get('sun_j2000_position', {}),
-                                    'attitude_quaternions': image_data.get('attitude_quaternions', {})
-                                }
-                            )
-                            if created:
-                                synced_count += 1
-                    
-                    time.sleep(0.3)  # Rate limiting
+                images.append(EPICImage(
+                    nasa_id=image_data['identifier'],
+                    identifier=image_data['identifier'],
+                    caption=image_data.get('caption', ''),
+                    image_url=f"https://api.nasa.gov/EPIC/archive/natural/{date_obj.strftime('%Y/%m/%d')}/png/{image_data['image']}.png",
+                    date=image_data['date'],
+                    centroid_coordinates=image_data.get('centroid_coordinates', {}),
+                    dscovr_j2000_position=image_data.get('dscovr_j2000_position', {}),
+                    lunar_j2000_position=image_data.get('lunar_j2000_position', {}),
+                    sun_j2000_position=image_data.get('sun_j2000_position', {}),
+                    attitude_quaternions=image_data.get('attitude_quaternions', {})
+                ))
+            except Exception as e:
+                logger.error(f"Error processing EPIC image on {date_obj}: {str(e)}")
+        
+        existing = set(EPICImage.objects.filter(
+            nasa_id__in=[image.nasa_id for image in images]
+        ).values_list('nasa_id', flat=True))
+        new_images = [image for image in images if image.nasa_id not in existing]
+        EPICImage.objects.bulk_create(new_images, batch_size=500, ignore_conflicts=True)
+        if len(images) == len(images_data):
+            mark_covered('epic', date_obj, date_obj)
+        return len(new_images)
+    
+    def store_epic_date(self, date_obj) -> bool:
+        """Fetch and store one date of EPIC imagery; False if the request failed"""
+        images_data = self.fetch_epic_images(date_obj)
+        if images_data is None:
+            return False
+        self._store_epic_images(date_obj, images_data)
+        return True
+    
+    def derive_image(self, epic_image: EPICImage) -> str:
+        """Download an EPIC original once and store its thumbnail and WebP variants"""
+        with _derive_locks[hash(epic_image.nasa_id) % len(_derive_locks)]:
+            if epic_image.content_hash and derivative_store.has(epic_image.content_hash):
+                return epic_image.content_hash
+            stored_hash = EPICImage.objects.filter(pk=epic_image.pk).values_list('content_hash', flat=True).first()
+            if stored_hash and derivative_store.has(stored_hash):
+                epic_image.content_hash = stored_hash
+                return stored_hash
+            # Not derived yet, or the files are gone (e.g. ephemeral disk after a redeploy)
+            
+            response = self.session.get(epic_image.image_url, params={'api_key': self.api_key}, timeout=60)
+            response.raise_for_status()
+            epic_image.content_hash = derivative_store.store(response.content)
+            EPICImage.objects.filter(pk=epic_image.pk).update(content_hash=epic_image.content_hash)
+            return epic_image.content_hash
+    
+    def derive_images(self, queryset) -> int:
+        """Create derivatives for many images concurrently; returns how many succeeded"""
+        def derive(epic_image):
+            try:
+                return bool(self.derive_image(epic_image))
             except Exception as e:
-                logger.error(f"Error processing EPIC date {date_item}: {str(e)}")
+                logger.error(f"EPIC derivative failed for {epic_image.nasa_id}: {str(e)}")
+                return False
         
-        return synced_count
+        return sum(fetch_concurrently(derive, list(queryset)))
 
 class ExoplanetService(NASAAPIService):
     """Exoplanet Archive service"""
     
+    # pscomppars holds one composite row per confirmed planet
+    ARCHIVE_TABLE = 'pscomppars'
+    ARCHIVE_COLUMNS = [
+        'pl_name', 'hostname', 'discoverymethod', 'disc_year', 'pl_orbper', 'pl_rade',
+        'pl_bmasse', 'sy_dist', 'pl_eqt', 'pl_insol'
+    ]
+    # Optimistic habitable zone in units of Earth's insolation
+    HABITABLE_INSOLATION = (0.35, 1.75)
+    UPDATE_FIELDS = [
+        'name', 'host_star', 'discovery_method', 'discovery_year', 'orbital_period',
+        'planet_radius', 'planet_mass', 'distance_from_earth', 'equilibrium_temperature',
+        'is_habitable_zone', 'updated_at'
+    ]
+    
     def __init__(self):
         super().__init__()
         self.exoplanet_base_url = "https://exoplanetarchive.ipac.caltech.edu/TAP/sync"
     
-    def fetch_exoplanets(self, limit: int = 100, where_clause: str = "") -> Optional[List[Dict]]:
-        """Fetch exoplanet data using TAP service"""
-        query = f"""
-        SELECT pl_name, hostname, discoverymethod, disc_year, pl_orbper, pl_rade, pl_masse,
-               sy_dist, pl_eqt, pl_habitable
-        FROM ps 
-        {where_clause}
-        ORDER BY disc_year DESC
-        LIMIT {limit}
-        """
-        
-        params = {
-            'query': query,
-            'format': 'json'
-        }
+    def fetch_exoplanet_page(self, after: Optional[str] = None, page_size: int = 2000,
+                            timeout: int = 120) -> Iterator[Dict]:
+        """Stream one page of the archive, ordered by planet name, as CSV rows"""
+        where_clause = ""
+        if after:
+            escaped = after.replace("'", "''")
+            where_clause = f"WHERE pl_name > '{escaped}'"
+        query = (
+            f"SELECT TOP {page_size} {', '.join(self.ARCHIVE_COLUMNS)} "
+            f"FROM {self.ARCHIVE_TABLE} {where_clause} ORDER BY pl_name"
+        )
         
-        try:
-            response = requests.get(self.exoplanet_base_url, params=params, timeout=30)
+        with self.session.get(
+            self.exoplanet_base_url,
+            params={'query': query, 'format': 'csv'},
+            timeout=timeout,
+            stream=True
+        ) as response:
             response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            logger.error(f"Exoplanet API error: {str(e)}")
-            return None
+            response.encoding = response.encoding or 'utf-8'
+            yield from csv.DictReader(response.iter_lines(decode_unicode=True))
     
-    def sync_exoplanet_data(self, limit: int = 1000) -> int:
-        """Sync exoplanet data"""
-        synced_count = 0
-        
-        data = self.fetch_exoplanets(limit=limit, where_clause="WHERE disc_year > 2020")
-        if not data:
-            return 0
-        
-        for planet_data in data:
-            try:
-                planet, created = Exoplanet.objects.get_or_create(
-                    name=planet_data['pl_name'],
-                    defaults={
-                        'nasa_id': planet_data['pl_name'].replace(' ', '_'),
-                        'host_star': planet_data.get('hostname', ''),
-                        'discovery_method': planet_data.get('discoverymethod', ''),
-                        'discovery_year': planet_data.get('disc_year'),
-                        'orbital_period': planet_data.get('pl_orbper'),
-                        'planet_radius': planet_data.get('pl_rade'),
-                        'planet_mass': planet_data.get('pl_masse'),
-                        'distance_from_earth': planet_data.get('sy_dist'),
-                        'equilibrium_temperature': planet_data.get('pl_eqt'),
-                        'is_habitable_zone': planet_data.get('pl_habitable') == 1
-                    }
+    def _exoplanet_from_row(self, row: Dict) -> Exoplanet:
+        def number(column, cast=float):
+            value = row.get(column)
+            return cast(float(value)) if value not in (None, '') else None
+        
+        insolation = number('pl_insol')
+        low, high = self.HABITABLE_INSOLATION
+        now = timezone.now()
+        return Exoplanet(
+            nasa_id=row['pl_name'].replace(' ', '_'),
+            name=row['pl_name'],
+            host_star=row.get('hostname') or '',
+            discovery_method=row.get('discoverymethod') or '',
+            discovery_year=number('disc_year', int),
+            orbital_period=number('pl_orbper'),
+            planet_radius=number('pl_rade'),
+            planet_mass=number('pl_bmasse'),
+            distance_from_earth=number('sy_dist'),
+            equilibrium_temperature=number('pl_eqt'),
+            is_habitable_zone=insolation is not None and low <= insolation <= high,
+            created_at=now,
+            updated_at=now
+        )
+    
+    @track_sync('exoplanets')
+    def sync_exoplanet_data(self, page_size: int = 2000, resume: bool = True,
+                            max_pages: Optional[int] = None, timeout: int = 120) -> int:
+        """Upsert the whole archive page by page, resuming from the last stored checkpoint"""
+        state = SyncState.objects.filter(dataset='exoplanets').first()
+        checkpoint = (state.checkpoint if state and resume else None) or {}
+        after = checkpoint.get('after')
+        synced_count = checkpoint.get('synced', 0) if after else 0
+        if after:
+            logger.info(f"Resuming exoplanet sync after {after!r} ({synced_count} already synced)")
+        
+        pages = 0
+        while max_pages is None or pages < max_pages:
+            planets = [self._exoplanet_from_row(row) for row in self.fetch_exoplanet_page(after, page_size, timeout)]
+            if planets:
+                Exoplanet.objects.bulk_create(
+                    planets,
+                    batch_size=500,
+                    update_conflicts=True,
+                    unique_fields=['nasa_id'],
+                    update_fields=self.UPDATE_FIELDS
                 )
-                if created:
-                    synced_count += 1
-            except Exception as e:
-                logger.error(f"Error saving exoplanet {planet_data.get('pl_name', 'unknown')}: {str(e)}")
+                synced_count += len(planets)
+                after = planets[-1].name
+            pages += 1
+            
+            if len(planets) < page_size:
+                after = None  # Reached the end of the archive
+                break
+            mark_sync('exoplanets', checkpoint={'after': after, 'synced': synced_count})
         
+        mark_sync('exoplanets', checkpoint={'after': after, 'synced': synced_count} if after else {})
+        logger.info(f"Exoplanet sync upserted {synced_count} planets")
         return synced_count
 
 class SpaceWeatherService(NASAAPIService):
     """Space Weather Database service"""
     
+    # Map event types to DONKI endpoints
+    DONKI_ENDPOINTS = {
+        'CME': 'DONKI/CME',
+        'FLR': 'DONKI/FLR', 
+        'SEP': 'DONKI/SEP',
+        'MPC': 'DONKI/MPC',
+        'GST': 'DONKI/GST',
+        'IPS': 'DONKI/IPS',
+        'RBE': 'DONKI/RBE',
+        'HSS': 'DONKI/HSS'
+    }
+    
     def fetch_space_weather_events(self, start_date: datetime = None, end_date: datetime = None, event_type: str = None) -> Optional[Dict]:
         """Fetch space weather events from DONKI"""
         if not start_date:
@@ -385,18 +600,7 @@ class SpaceWeatherService(NASAAPIService):
             'startDate': start_date.strftime('%Y-%m-%d'),
             'endDate': end_date.strftime('%Y-%m-%d')
         }
-        
-        # Map event types to DONKI endpoints
-        endpoints = {
-            'CME': 'DONKI/CME',
-            'FLR': 'DONKI/FLR', 
-            'SEP': 'DONKI/SEP',
-            'MPC': 'DONKI/MPC',
-            'GST': 'DONKI/GST',
-            'IPS': 'DONKI/IPS',
-            'RBE': 'DONKI/RBE',
-            'HSS': 'DONKI/HSS'
-        }
+        endpoints = self.DONKI_ENDPOINTS
         
         if event_type and event_type in endpoints:
             return self._make_request(endpoints[event_type], params)
@@ -411,16 +615,42 @@ class SpaceWeatherService(NASAAPIService):
                     all_events.extend(events)
             return all_events
     
+    @track_sync('space_weather')
     def sync_space_weather_data(self, days_back: int = 30) -> int:
         """Sync space weather events"""
+        end_date = timezone.now().date()
+        return self.store_space_weather_range(end_date - timedelta(days=days_back), end_date)
+    
+    def store_space_weather_range(self, start_date, end_date, event_types: List[str] = None) -> int:
+        """Fetch and store events of a date range, recording each fetched type as covered"""
+        fetched = self.fetch_event_types(start_date, end_date, event_types or list(self.DONKI_ENDPOINTS))
+        return self.store_fetched_events(start_date, end_date, fetched)
+    
+    def fetch_event_types(self, start_date, end_date, event_types: List[str]) -> Dict[str, Optional[List]]:
+        """Events per type, fetched concurrently; None for types whose request failed"""
+        params = {
+            'startDate': start_date.strftime('%Y-%m-%d'),
+            'endDate': end_date.strftime('%Y-%m-%d')
+        }
+        results = fetch_concurrently(
+            lambda event_type: self._make_request(self.DONKI_ENDPOINTS[event_type], dict(params)),
+            event_types
+        )
+        return dict(zip(event_types, results))
+    
+    def store_fetched_events(self, start_date, end_date, fetched: Dict[str, Optional[List]]) -> int:
+        synced_count = 0
+        for event_type, events in fetched.items():
+            if events is None:
+                continue
+            for event in events:
+                event['event_type'] = event_type
+            synced_count += self._store_events(events)
+            mark_covered('space_weather', start_date, end_date, scope=event_type)
+        return synced_count
+    
+    def _store_events(self, events_data: List[Dict]) -> int:
         synced_count = 0
-        end_date = timezone.now()
-        start_date = end_date - timedelta(days=days_back)
-        
-        events_data = self.fetch_space_weather_events(start_date, end_date)
-        if not events_data:
-            return 0
-            
         for event_data in events_data:
             try:
                 # Generate unique ID based on event type and identifier
@@ -452,7 +682,7 @@ class NaturalEventService:
     
     def __init__(self):
         self.base_url = "https://eonet.gsfc.nasa.gov/api/v3"
-        self.session = requests.Session()
+        self.session = UpstreamSession()
     
     def fetch_natural_events(self, status: str = 'open', category: str = None, limit: int = None) -> Optional[Dict]:
         """Fetch natural events from EONET"""
@@ -480,15 +710,28 @@ class NaturalEventService:
             logger.error(f"EONET categories API error: {str(e)}")
             return None
     
+    @track_sync('natural_events')
     def sync_natural_events_data(self, limit: int = 500) -> int:
         """Sync natural events data"""
         synced_count = 0
         
-        # Fetch open events
-        events_data = self.fetch_natural_events(status='open', limit=limit)
-        if not events_data or 'events' not in events_data:
+        # Fetch open events, unless they are unchanged since the last sync
+        try:
+            response, remember = self.session.get_if_modified(
+                f"{self.base_url}/events", params={'status': 'open', 'limit': limit}, timeout=30
+            )
+            response.raise_for_status()
+            events_data = response.json()
+        except NotModified:
+            logger.info("EONET open events unchanged since last sync")
+            return 0
+        except Exception as e:
+            logger.error(f"EONET API error: {str(e)}")
+            return 0
+        if 'events' not in events_data:
             return 0
             
+        errors = 0
         for event_data in events_data['events']:
             try:
                 event, created = NaturalEvent.objects.get_or_create(
@@ -519,7 +762,11 @@ class NaturalEventService:
                     synced_count += 1
             except Exception as e:
                 logger.error(f"Error saving natural event {event_data.get('id', 'unknown')}: {str(e)}")
+                errors += 1
         
+        # Keep the old validators after item errors so the next sync retries the listing
+        if not errors:
+            remember()
         return synced_count
 
 
@@ -527,7 +774,7 @@ class SpaceEventService:
     """Service for fetching and managing space events like eclipses, supermoons, etc."""
     
     def __init__(self):
-        self.session = requests.Session()
+        self.session = UpstreamSession()
         
     def fetch_astronomical_events(self) -> List[Dict]:
         """Fetch astronomical events from multiple sources"""
@@ -844,6 +1091,7 @@ class SpaceEventService:
         
         return events
     
+    @track_sync('space_events')
     def sync_space_events(self) -> int:
         """Sync space events to database from multiple sources"""
         from .models import SpaceEvent
@@ -888,7 +1136,7 @@ class LaunchLibraryService:
     BASE_URL = "https://ll.thespacedevs.com/2.2.0"
     
     def __init__(self):
-        self.session = requests.Session()
+        self.session = UpstreamSession()
         self.session.headers.update({
             'User-Agent': 'AstroWorld/1.0 (contact@astroworld.com)'
         })
@@ -904,6 +1152,22 @@ class LaunchLibraryService:
             logger.error(f"Launch Library API request failed for {endpoint}: {e}")
             return {}
     
+    def _fetch_if_modified(self, endpoint: str, params: dict) -> tuple:
+        """
+        Results of a listing and a callback remembering its validators; the
+        results are None when the listing is unchanged since the last sync
+        """
+        try:
+            response, remember = self.session.get_if_modified(f"{self.BASE_URL}{endpoint}", params=params)
+            response.raise_for_status()
+            return response.json().get('results', []), remember
+        except NotModified:
+            logger.info(f"Launch Library {endpoint} unchanged since last sync")
+            return None, lambda: None
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Launch Library API request failed for {endpoint}: {e}")
+            return [], lambda: None
+    
     def fetch_upcoming_launches(self, limit: int = 50) -> List[Dict]:
         """Fetch upcoming launches"""
         params = {
@@ -958,6 +1222,7 @@ class LaunchLibraryService:
         data = self._make_request("/agencies/", params)
         return data.get('results', [])
     
+    @track_sync('launch_library')
     def sync_launches_to_space_events(self, limit: int = 100) -> int:
         """Sync Launch Library launches to SpaceEvent model"""
         from .models import SpaceEvent
@@ -965,13 +1230,22 @@ class LaunchLibraryService:
         
         synced_count = 0
         
-        # Fetch both upcoming and recent launches
-        upcoming_launches = self.fetch_upcoming_launches(limit//2)
-        recent_launches = self.fetch_recent_launches(limit//2)
+        # Fetch both upcoming and recent launches, skipping unchanged listings
+        upcoming_launches, remember_upcoming = self._fetch_if_modified(
+            "/launch/upcoming/", {'limit': limit//2, 'ordering': 'net', 'mode': 'detailed'}
+        )
+        recent_launches, remember_recent = self._fetch_if_modified(
+            "/launch/previous/", {'limit': limit//2, 'ordering': '-net', 'mode': 'detailed'}
+        )
         
-        all_launches = upcoming_launches + recent_launches
+        all_launches = [
+            (launch_data, remember)
+            for launches, remember in ((upcoming_launches, remember_upcoming), (recent_launches, remember_recent))
+            for launch_data in launches or []
+        ]
+        incomplete = set()  # remember callbacks of listings with item errors
         
-        for launch_data in all_launches:
+        for launch_data, remember in all_launches:
             try:
                 # Parse launch data
                 launch_date = None
@@ -1024,17 +1298,28 @@ class LaunchLibraryService:
                 
             except Exception as e:
                 logger.error(f"Error syncing launch {launch_data.get('id')}: {e}")
+                incomplete.add(remember)
         
+        # Keep the old validators of a listing with item errors so the next sync retries it
+        for remember in (remember_upcoming, remember_recent):
+            if remember not in incomplete:
+                remember()
         return synced_count
     
+    @track_sync('launch_library_events')
     def sync_events_to_space_events(self, limit: int = 50) -> int:
         """Sync Launch Library events (dockings, spacewalks) to SpaceEvent model"""
         from .models import SpaceEvent
         from django.utils import timezone
         
         synced_count = 0
-        events_data = self.fetch_events(limit)
+        events_data, remember = self._fetch_if_modified(
+            "/event/upcoming/", {'limit': limit, 'ordering': 'date', 'mode': 'detailed'}
+        )
+        if events_data is None:
+            return 0
         
+        errors = 0
         for event_data in events_data:
             try:
                 # Parse event data
@@ -1086,7 +1371,11 @@ class LaunchLibraryService:
                 
             except Exception as e:
                 logger.error(f"Error syncing event {event_data.get('id')}: {e}")
+                errors += 1
         
+        # Keep the old validators after item errors so the next sync retries the listing
+        if not errors:
+            remember()
         return synced_count
 
 
@@ -1096,7 +1385,7 @@ class EnhancedSpaceflightNewsService:
     BASE_URL = "https://api.spaceflightnewsapi.net/v4"
     
     def __init__(self):
-        self.session = requests.Session()
+        self.session = UpstreamSession()
         self.session.headers.update({
             'User-Agent': 'AstroWorld/1.0 (contact@astroworld.com)'
         })
@@ -1142,6 +1431,7 @@ class EnhancedSpaceflightNewsService:
         data = self._make_request("/reports/", params)
         return data.get('results', [])
     
+    @track_sync('spaceflight_news_content')
     def sync_news_content(self, limit: int = 100) -> dict:
         """Sync all news content from Spaceflight News API"""
         from spaceflightnews.models import SpaceflightNews
@@ -1255,13 +1545,17 @@ enhanced_spaceflight_news_service = EnhancedSpaceflightNewsService()
 class NASAImageLibraryService:
     """NASA Image and Video Library service"""
     
+    # High-interest topics searched for popular images
+    POPULAR_QUERIES = ['hubble', 'mars', 'earth']
+    
     def __init__(self):
         self.base_url = "https://images-api.nasa.gov"
-        self.session = requests.Session()
+        self.session = UpstreamSession()
+        self.async_session = AsyncUpstreamClient()
     
-    def search_media(self, query: str, media_type: str = None, year_start: int = None, 
-                     year_end: int = None, page: int = 1, page_size: int = 100) -> Optional[Dict]:
-        """Search NASA media library"""
+    @staticmethod
+    def _search_params(query: str, media_type: str = None, year_start: int = None,
+                       year_end: int = None, page: int = 1, page_size: int = 100) -> Dict:
         params = {
             'q': query,
             'page': page,
@@ -1274,7 +1568,12 @@ class NASAImageLibraryService:
             params['year_start'] = year_start
         if year_end:
             params['year_end'] = year_end
-        
+        return params
+    
+    def search_media(self, query: str, media_type: str = None, year_start: int = None, 
+                     year_end: int = None, page: int = 1, page_size: int = 100) -> Optional[Dict]:
+        """Search NASA media library"""
+        params = self._search_params(query, media_type, year_start, year_end, page, page_size)
         try:
             response = self.session.get(f"{self.base_url}/search", params=params, timeout=30)
             response.raise_for_status()
@@ -1283,6 +1582,18 @@ class NASAImageLibraryService:
             logger.error(f"NASA Image Library search error: {str(e)}")
             return None
     
+    async def asearch_media(self, query: str, media_type: str = None, year_start: int = None,
+                            year_end: int = None, page: int = 1, page_size: int = 100) -> Optional[Dict]:
+        """Async variant of `search_media`"""
+        params = self._search_params(query, media_type, year_start, year_end, page, page_size)
+        try:
+            response = await self.async_session.get(f"{self.base_url}/search", params=params, timeout=30)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.error(f"NASA Image Library search error: {str(e)}")
+            return None
+    
     def get_asset_manifest(self, nasa_id: str) -> Optional[Dict]:
         """Get asset manifest for a media item"""
         try:
@@ -1315,17 +1626,27 @@ class NASAImageLibraryService:
     
     def get_popular_images(self, limit: int = 20) -> Optional[Dict]:
         """Get popular/featured images - searches for high-interest topics"""
-        popular_queries = [
-            'hubble', 'mars', 'earth', 'jupiter', 'saturn', 'nebula', 
-            'galaxy', 'astronaut', 'spacewalk', 'iss'
+        results = [
+            self.search_media(query, media_type='image', page_size=limit//3)
+            for query in self.POPULAR_QUERIES
         ]
-        
+        return self._merge_popular(results, limit)
+    
+    async def aget_popular_images(self, limit: int = 20) -> Optional[Dict]:
+        """Async variant of `get_popular_images`, searching all topics concurrently"""
+        async with async_client_scope():
+            results = await asyncio.gather(*(
+                self.asearch_media(query, media_type='image', page_size=limit//3)
+                for query in self.POPULAR_QUERIES
+            ))
+        return self._merge_popular(results, limit)
+    
+    @staticmethod
+    def _merge_popular(results: List[Optional[Dict]], limit: int) -> Dict:
         all_results = []
-        for query in popular_queries[:3]:  # Limit to avoid too many requests
-            result = self.search_media(query, media_type='image', page_size=limit//3)
+        for result in results:
             if result and 'collection' in result and 'items' in result['collection']:
                 all_results.extend(result['collection']['items'][:limit//3])
-            time.sleep(0.2)  # Rate limiting
         
         return {
             'collection': {
@@ -1338,9 +1659,56 @@ class NASAImageLibraryService:
 class TLEService:
     """Two-Line Element Set service for satellite tracking"""
     
+    POPULAR_SATELLITES = ['ISS', 'HUBBLE', 'TIANGONG', 'GPS', 'STARLINK']
+    
+    # Fallback static data when TLE API is not available
+    FALLBACK_SATELLITES = [
+        {
+            "satellite_id": 25544,
+            "name": "ISS (ZARYA)",
+            "orbit_type": "LEO",
+            "tle_line1": "1 25544U 98067A   25293.50000000  .00002182  00000-0  40768-4 0  9990",
+            "tle_line2": "2 25544  51.6461 339.7939 0001393  92.8340 267.3124 15.49309239000000",
+            "tle_date": "2025-10-20T00:00:00Z"
+        },
+        {
+            "satellite_id": 20580,
+            "name": "HST (HUBBLE SPACE TELESCOPE)",
+            "orbit_type": "LEO",
+            "tle_line1": "1 20580U 90037B   25293.50000000  .00000000  00000-0  00000-0 0  9999",
+            "tle_line2": "2 20580  28.4684 276.2531 0002978 321.7771  38.2675 15.09309239000000",
+            "tle_date": "2025-10-20T00:00:00Z"
+        },
+        {
+            "satellite_id": 48274,
+            "name": "TIANGONG-1",
+            "orbit_type": "LEO",
+            "tle_line1": "1 48274U 21035A   25293.50000000  .00001500  00000-0  28000-4 0  9999",
+            "tle_line2": "2 48274  41.4737 156.2039 0003040 315.0340  45.0234 15.61309239000000",
+            "tle_date": "2025-10-20T00:00:00Z"
+        },
+        {
+            "satellite_id": 32384,
+            "name": "NAVSTAR 53 (GPS BIIF-4)",
+            "orbit_type": "MEO",
+            "tle_line1": "1 32384U 07047A   25293.50000000 -.00000079  00000-0  00000-0 0  9999",
+            "tle_line2": "2 32384  55.0000 201.7039 0001000 180.0000 180.0000  2.00561393000000",
+            "tle_date": "2025-10-20T00:00:00Z"
+        },
+        {
+            "satellite_id": 44713,
+            "name": "STARLINK-1007",
+            "orbit_type": "LEO",
+            "tle_line1": "1 44713U 19074A   25293.50000000  .00001200  00000-0  90000-4 0  9999",
+            "tle_line2": "2 44713  53.0537  47.2039 0001532  90.0000 270.1234 15.05939239000000",
+            "tle_date": "2025-10-20T00:00:00Z"
+        }
+    ]
+    
     def __init__(self):
         self.base_url = "http://tle.ivanstanojevic.me/api/tle"
-        self.session = requests.Session()
+        self.session = UpstreamSession()
+        self.async_session = AsyncUpstreamClient()
     
     def search_satellite(self, query: str) -> Optional[List[Dict]]:
         """Search for satellite by name"""
@@ -1356,6 +1724,16 @@ class TLEService:
             logger.error(f"TLE search error for '{query}': {str(e)}")      
             return None
     
+    async def asearch_satellite(self, query: str) -> Optional[List[Dict]]:
+        """Async variant of `search_satellite`"""
+        try:
+            response = await self.async_session.get(self.base_url, params={'search': query}, timeout=30)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.error(f"TLE search error for '{query}': {str(e)}")
+            return None
+    
     def get_satellite_by_id(self, satellite_id: int) -> Optional[Dict]:
         """Get satellite TLE by satellite number"""
         try:
@@ -1378,60 +1756,20 @@ class TLEService:
     
     def get_popular_satellites(self) -> Optional[List[Dict]]:
         """Get TLE for popular satellites (ISS, Hubble, etc.)"""
-        # Fallback static data when TLE API is not available
-        fallback_satellites = [
-            {
-                "satellite_id": 25544,
-                "name": "ISS (ZARYA)",
-                "orbit_type": "LEO",
-                "tle_line1": "1 25544U 98067A   25293.50000000  .00002182  00000-0  40768-4 0  9990",
-                "tle_line2": "2 25544  51.6461 339.7939 0001393  92.8340 267.3124 15.49309239000000",
-                "tle_date": "2025-10-20T00:00:00Z"
-            },
-            {
-                "satellite_id": 20580,
-                "name": "HST (HUBBLE SPACE TELESCOPE)",
-                "orbit_type": "LEO",
-                "tle_line1": "1 20580U 90037B   25293.50000000  .00000000  00000-0  00000-0 0  9999",
-                "tle_line2": "2 20580  28.4684 276.2531 0002978 321.7771  38.2675 15.09309239000000",
-                "tle_date": "2025-10-20T00:00:00Z"
-            },
-            {
-                "satellite_id": 48274,
-                "name": "TIANGONG-1",
-                "orbit_type": "LEO",
-                "tle_line1": "1 48274U 21035A   25293.50000000  .00001500  00000-0  28000-4 0  9999",
-                "tle_line2": "2 48274  41.4737 156.2039 0003040 315.0340  45.0234 15.61309239000000",
-                "tle_date": "2025-10-20T00:00:00Z"
-            },
-            {
-                "satellite_id": 32384,
-                "name": "NAVSTAR 53 (GPS BIIF-4)",
-                "orbit_type": "MEO",
-                "tle_line1": "1 32384U 07047A   25293.50000000 -.00000079  00000-0  00000-0 0  9999",
-                "tle_line2": "2 32384  55.0000 201.7039 0001000 180.0000 180.0000  2.00561393000000",
-                "tle_date": "2025-10-20T00:00:00Z"
-            },
-            {
-                "satellite_id": 44713,
-                "name": "STARLINK-1007",
-                "orbit_type": "LEO",
-                "tle_line1": "1 44713U 19074A   25293.50000000  .00001200  00000-0  90000-4 0  9999",
-                "tle_line2": "2 44713  53.0537  47.2039 0001532  90.0000 270.1234 15.05939239000000",
-                "tle_date": "2025-10-20T00:00:00Z"
-            }
-        ]
+        # Skip straight to the static data while the TLE API is known to be down
+        if get_breaker(urlsplit(self.base_url).hostname).is_open():
+            return self.FALLBACK_SATELLITES
         
         # Try the API first, fallback to static data
         try:
-            popular_satellites = ['ISS', 'HUBBLE', 'TIANGONG', 'GPS', 'STARLINK']
             results = []
             
-            for sat_name in popular_satellites:
+            for sat_name in self.POPULAR_SATELLITES:
                 tle_data = self.search_satellite(sat_name)
-                if tle_data and isinstance(tle_data, list) and len(tle_data) > 0:
+                if tle_data is None:
+                    break  # Failing upstream, don't wait on the remaining searches
+                if isinstance(tle_data, list) and len(tle_data) > 0:
                     results.append(tle_data[0])
-                time.sleep(0.2)  # Rate limiting
             
             if results:
                 return results
@@ -1440,7 +1778,17 @@ class TLEService:
             logger.warning(f"TLE API unavailable, using fallback data: {str(e)}")
         
         # Return fallback data if API fails
-        return fallback_satellites
+        return self.FALLBACK_SATELLITES
+    
+    async def aget_popular_satellites(self) -> Optional[List[Dict]]:
+        """Async variant of `get_popular_satellites`, searching all satellites concurrently"""
+        if get_breaker(urlsplit(self.base_url).hostname).is_open():
+            return self.FALLBACK_SATELLITES
+        
+        async with async_client_scope():
+            found = await asyncio.gather(*(self.asearch_satellite(name) for name in self.POPULAR_SATELLITES))
+        results = [tle_data[0] for tle_data in found if isinstance(tle_data, list) and tle_data]
+        return results or self.FALLBACK_SATELLITES
 
 
 class GIBSService(NASAAPIService):
@@ -1517,7 +1865,7 @@ class GIBSService(NASAAPIService):
     def get_wmts_capabilities(self) -> Optional[str]:
         """Get WMTS capabilities document"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.wmts_base_url}/1.0.0/WMTSCapabilities.xml",
                 timeout=30
             )
@@ -1530,7 +1878,7 @@ class GIBSService(NASAAPIService):
     def get_wms_capabilities(self) -> Optional[str]:
         """Get WMS capabilities document"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.wms_base_url}/wms.cgi",
                 params={'SERVICE': 'WMS', 'REQUEST': 'GetCapabilities', 'VERSION': '1.3.0'},
                 timeout=30
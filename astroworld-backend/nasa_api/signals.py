@@ -0,0 +1,19 @@
+"""
+Model signal receivers.
+
+Saving or removing a saved/tracked item moves the owner's item version, so
+per-user cached responses embedding ``is_saved`` / ``is_tracked`` are rebuilt.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from astroworld.response_cache import user_items_dataset
+from astroworld.versions import bump
+
+from .models import UserSavedItem, UserTrackedObject
+
+
+@receiver([post_save, post_delete], sender=UserSavedItem)
+@receiver([post_save, post_delete], sender=UserTrackedObject)
+def _bump_user_items(sender, instance, **kwargs):
+    bump(user_items_dataset(instance.user_id))
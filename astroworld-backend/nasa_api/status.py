@@ -0,0 +1,88 @@
+"""
+API status summary built from the usage rollup and SyncState.
+
+Everything comes from two small indexed reads (rollup rows for the window and
+the SyncState table) and is cached briefly so monitoring can poll it freely.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from astroworld.instrumentation import Histogram
+
+from .models import APIUsageRollup, SyncState
+
+STATUS_CACHE_KEY = 'nasa_api_status'
+STATUS_CACHE_TTL = 30  # seconds
+
+
+def _summarize(histogram: Histogram, errors: int):
+    return {
+        'calls': histogram.count,
+        'avg_response_time': round(histogram.total_ms / histogram.count / 1000, 4) if histogram.count else 0,
+        'p50_response_time': _seconds(histogram.percentile(50)),
+        'p95_response_time': _seconds(histogram.percentile(95)),
+        'max_response_time': round(histogram.max_ms / 1000, 4),
+        'error_rate': round(errors / histogram.count, 4) if histogram.count else 0,
+    }
+
+
+def _seconds(value_ms):
+    return round(value_ms / 1000, 4) if value_ms is not None else None
+
+
+def build_api_status(hours: int = 24):
+    """Usage percentiles per endpoint and last sync times"""
+    rows = APIUsageRollup.objects.filter(
+        bucket__gte=timezone.now() - timedelta(hours=hours)
+    ).values_list(
+        'endpoint', 'request_count', 'error_count',
+        'total_response_time', 'max_response_time', 'latency_buckets'
+    )
+
+    overall = Histogram()
+    overall_errors = 0
+    per_endpoint = defaultdict(Histogram)
+    endpoint_errors = defaultdict(int)
+    for endpoint, count, errors, total_time, max_time, buckets in rows.iterator():
+        for histogram in (overall, per_endpoint[endpoint]):
+            histogram.merge(buckets, count, total_time * 1000, max_time * 1000)
+        overall_errors += errors
+        endpoint_errors[endpoint] += errors
+
+    summary = _summarize(overall, overall_errors)
+    sync_states = {state.dataset: state for state in SyncState.objects.all()}
+
+    return {
+        'api_calls_24h': summary['calls'],
+        'avg_response_time': summary['avg_response_time'],
+        'p50_response_time': summary['p50_response_time'],
+        'p95_response_time': summary['p95_response_time'],
+        'error_rate': summary['error_rate'],
+        'endpoints': {
+            endpoint: _summarize(histogram, endpoint_errors[endpoint])
+            for endpoint, histogram in sorted(per_endpoint.items())
+        },
+        'nasa_api_key_configured': bool(settings.NASA_API_KEY),
+        'celery_enabled': settings.USE_CELERY,
+        'last_sync': {
+            dataset: state.last_success_at for dataset, state in sync_states.items()
+        },
+        'sync_errors': {
+            dataset: state.last_error
+            for dataset, state in sync_states.items() if state.last_error
+        },
+        'generated_at': timezone.now(),
+    }
+
+
+def get_api_status():
+    """Cached API status summary"""
+    status = cache.get(STATUS_CACHE_KEY)
+    if status is None:
+        status = build_api_status()
+        cache.set(STATUS_CACHE_KEY, status, STATUS_CACHE_TTL)
+    return status
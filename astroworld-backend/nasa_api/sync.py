@@ -0,0 +1,68 @@
+"""
+Sync run bookkeeping.
+
+``track_sync`` wraps a service sync method so every run records its start,
+success or failure in ``SyncState``, bumps the dataset's version counter
+(``astroworld.versions``) and fires ``sync_completed`` once the data is in
+place. Upstream calls made during a sync count as background work
+for the rate limiter.
+"""
+import functools
+import logging
+
+from django.dispatch import Signal
+from django.utils import timezone
+
+from astroworld.ratelimit import background
+from astroworld.versions import bump
+
+logger = logging.getLogger(__name__)
+
+# Sent with dataset=<name>, result=<return value of the sync>
+sync_completed = Signal()
+
+
+def _item_count(result) -> int:
+    """Best-effort count of synced items from a sync return value"""
+    if isinstance(result, bool):
+        return int(result)
+    if isinstance(result, int):
+        return result
+    if isinstance(result, dict):
+        return sum(_item_count(value) for value in result.values())
+    return 0
+
+
+def mark_sync(dataset: str, **fields):
+    """Update (or create) the SyncState row of a dataset"""
+    from .models import SyncState
+
+    updated = SyncState.objects.filter(dataset=dataset).update(**fields)
+    if not updated:
+        SyncState.objects.update_or_create(dataset=dataset, defaults=fields)
+
+
+def track_sync(dataset: str):
+    """Decorator recording sync runs of `dataset` in SyncState"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            mark_sync(dataset, last_started_at=timezone.now())
+            try:
+                with background():
+                    result = func(*args, **kwargs)
+            except Exception as e:
+                mark_sync(dataset, last_failure_at=timezone.now(), last_error=str(e)[:2000])
+                raise
+
+            mark_sync(
+                dataset,
+                last_success_at=timezone.now(),
+                last_item_count=_item_count(result),
+                last_error='',
+            )
+            bump(dataset)
+            sync_completed.send(sender=func, dataset=dataset, result=result)
+            return result
+        return wrapper
+    return decorator
@@ -1,8 +1,6 @@
 # nasa_api/tasks.py
 from celery import shared_task
 from django.core.management import call_command
-from django.utils import timezone
-from datetime import timedelta
 import logging
 
 from .services import (
@@ -65,9 +63,6 @@ def sync_weekly_nasa_data():
         # EPIC comprehensive sync
         results['epic'] = epic_service.sync_epic_data(days_back=7)
         
-        # Exoplanet data sync
-        results['exoplanets'] = exoplanet_service.sync_exoplanet_data(limit=1000)
-        
         # Space weather comprehensive sync
         results['space_weather'] = space_weather_service.sync_space_weather_data(days_back=30)
         
@@ -80,6 +75,17 @@ def sync_weekly_nasa_data():
         logger.error(f'Weekly NASA data sync failed: {e}')
         raise
 
+@shared_task
+def sync_exoplanet_archive():
+    """Nightly full Exoplanet Archive refresh; resumes where a failed run stopped"""
+    try:
+        count = exoplanet_service.sync_exoplanet_data()
+        logger.info(f'Exoplanet archive sync completed: {count} planets')
+        return count
+    except Exception as e:
+        logger.error(f'Exoplanet archive sync failed: {e}')
+        raise
+
 @shared_task
 def send_neo_alerts():
     """Check and send NEO approach alerts"""
@@ -97,31 +103,10 @@ def send_neo_alerts():
 def cleanup_old_data():
     """Clean up old data to manage database size"""
     try:
-        from .models import APOD, NearEarthObject, EPICImage, APIUsageLog
-        
-        results = {}
+        from .retention import RetentionEngine
         
-        # Keep only last 2 years of APOD
-        cutoff_date = timezone.now().date() - timedelta(days=730)
-        deleted_apod = APOD.objects.filter(date__lt=cutoff_date).delete()
-        results['apod_deleted'] = deleted_apod[0] if deleted_apod[0] > 0 else 0
-        
-        # Keep only future + 1 year past NEO data
-        past_cutoff = timezone.now() - timedelta(days=365)
-        deleted_neo_approaches = NearEarthObject.objects.filter(
-            close_approaches__close_approach_date__lt=past_cutoff
-        ).delete()
-        results['neo_deleted'] = deleted_neo_approaches[0] if deleted_neo_approaches[0] > 0 else 0
-        
-        # Keep only last 6 months of EPIC images
-        epic_cutoff = timezone.now() - timedelta(days=180)
-        deleted_epic = EPICImage.objects.filter(date__lt=epic_cutoff).delete()
-        results['epic_deleted'] = deleted_epic[0] if deleted_epic[0] > 0 else 0
-        
-        # Keep only last 3 months of API usage logs
-        log_cutoff = timezone.now() - timedelta(days=90)
-        deleted_logs = APIUsageLog.objects.filter(timestamp__lt=log_cutoff).delete()
-        results['logs_deleted'] = deleted_logs[0] if deleted_logs[0] > 0 else 0
+        # Batched deletes per retention policy (see nasa_api.retention)
+        results = RetentionEngine().run()
         
         logger.info(f'Data cleanup completed: {results}')
         return results
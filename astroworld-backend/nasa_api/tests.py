@@ -1,3 +1,667 @@
-from django.test import TestCase
+import io
+import os
+import random
+import tempfile
+import threading
+from datetime import date, timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from astroworld.response_cache import user_items_dataset
+from users.models import User
+
+from . import read_through
+from .coverage import forget_before, is_covered, mark_covered, missing_ranges, split_range
+from .image_derivatives import DerivativeStore
+from .jobs import Scheduler, claim, enqueue, requeue_stale, requeue_worker, run_job
+from .models import (
+    NearEarthObject, NEOCloseApproach, MarsRover, MarsRoverPhoto, EPICImage,
+    SpaceWeatherEvent, NaturalEvent, SpaceEvent, UserSavedItem, DatasetVersion,
+    DataCoverage, SyncJob, UserTrackedObject, NEOAlertDelivery, NASAMediaItem
+)
+from .notifications import NotificationService
+from .pagination import KeysetPagination
+from .retention import RetentionEngine, get_policies
+from .sampling import RandomSampler
+from .services import launch_library_service, natural_event_service
+
+
+@skipUnless(connection.vendor in ('postgresql', 'sqlite'), 'Plan checks are implemented for PostgreSQL and SQLite')
+class QueryPlanTests(TestCase):
+    """
+    Seed realistic volumes, EXPLAIN the hot view queries and fail if any of
+    them stops using an index.
+    """
+    ROWS = 5000  # Rows seeded per table
+
+    @classmethod
+    def setUpTestData(cls):
+        now = cls.now = timezone.now()
+        rows = cls.ROWS
+
+        User.objects.bulk_create([
+            User(username=f'qp_user_{i}', email=f'qp_user_{i}@example.com')
+            for i in range(200)
+        ])
+        users = list(User.objects.filter(username__startswith='qp_user_'))
+        cls.user = users[0]
+
+        NearEarthObject.objects.bulk_create([
+            NearEarthObject(
+                nasa_id=f'qp_neo_{i}', name=f'QP {i}', designation=f'QP{i}',
+                estimated_diameter_min_km=0.1, estimated_diameter_max_km=0.3,
+                absolute_magnitude=20.0, is_potentially_hazardous=i % 10 == 0
+            ) for i in range(rows // 4)
+        ], batch_size=1000)
+        neos = list(NearEarthObject.objects.filter(nasa_id__startswith='qp_neo_'))
+        cls.neo = neos[0]
+        NEOCloseApproach.objects.bulk_create([
+            NEOCloseApproach(
+                neo=neos[i % len(neos)],
+                close_approach_date=now + timedelta(hours=random.randint(-24 * 3650, 24 * 3650)),
+                relative_velocity_kmh=50000.0, miss_distance_km=1e6
+            ) for i in range(rows)
+        ], batch_size=1000)
+
+        cls.rover = MarsRover.objects.create(
+            name='qp_rover', landing_date=date(2012, 8, 6), launch_date=date(2011, 11, 26),
+            status='active', max_sol=4000, max_date=date.today(), total_photos=rows
+        )
+        other_rover = MarsRover.objects.create(
+            name='qp_rover_2', landing_date=date(2021, 2, 18), launch_date=date(2020, 7, 30),
+            status='active', max_sol=1500, max_date=date.today(), total_photos=rows
+        )
+        MarsRoverPhoto.objects.bulk_create([
+            MarsRoverPhoto(
+                nasa_id=f'qp_photo_{i}', rover=cls.rover if i % 4 else other_rover,
+                sol=i // 50, earth_date=date(2012, 8, 6) + timedelta(days=i // 50),
+                img_src='https://example.com/photo.jpg', camera_name='NAVCAM',
+                camera_full_name='Navigation Camera'
+            ) for i in range(rows)
+        ], batch_size=1000)
+
+        EPICImage.objects.bulk_create([
+            EPICImage(
+                nasa_id=f'qp_epic_{i}', identifier=f'qp{i}', caption='',
+                image_url='https://example.com/epic.png', date=now - timedelta(hours=2 * i)
+            ) for i in range(rows)
+        ], batch_size=1000)
+
+        weather_types = [choice for choice, _ in SpaceWeatherEvent.EVENT_TYPE_CHOICES]
+        SpaceWeatherEvent.objects.bulk_create([
+            SpaceWeatherEvent(
+                nasa_id=f'qp_weather_{i}', event_type=weather_types[i % len(weather_types)],
+                event_time=now - timedelta(hours=i), link='https://example.com'
+            ) for i in range(rows)
+        ], batch_size=1000)
+
+        categories = ['wildfires', 'severeStorms', 'volcanoes', 'seaLakeIce',
+                      'floods', 'earthquakes', 'drought', 'dustHaze']
+        NaturalEvent.objects.bulk_create([
+            NaturalEvent(
+                nasa_id=f'qp_natural_{i}', title=f'QP {i}', closed=i % 10 != 0,
+                category_id=categories[i % len(categories)], category_title=''
+            ) for i in range(rows)
+        ], batch_size=1000)
+
+        event_types = [choice for choice, _ in SpaceEvent.EVENT_TYPE_CHOICES]
+        SpaceEvent.objects.bulk_create([
+            SpaceEvent(
+                nasa_id=f'qp_event_{i}', title=f'QP {i}', description='',
+                event_type=event_types[i % len(event_types)],
+                event_date=now + timedelta(hours=random.randint(-24 * 3650, 24 * 3650)),
+                is_featured=i % 50 == 0
+            ) for i in range(rows)
+        ], batch_size=1000)
+
+        item_types = [choice for choice, _ in UserSavedItem.ITEM_TYPE_CHOICES]
+        UserSavedItem.objects.bulk_create([
+            UserSavedItem(
+                user=users[i % len(users)], item_type=item_types[i % len(item_types)],
+                item_id=f'qp_item_{i}'
+            ) for i in range(rows)
+        ], batch_size=1000)
+
+        # Refresh planner statistics so plans reflect the seeded volumes
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def hot_queries(self):
+        """(name, queryset, table) for the filters the views run on every request"""
+        now = self.now
+        return [
+            ('neo_upcoming_approaches',
+             NEOCloseApproach.objects.filter(
+                 close_approach_date__gte=now, close_approach_date__lte=now + timedelta(days=7)
+             ).order_by('close_approach_date')[:50],
+             NEOCloseApproach._meta.db_table),
+            ('neo_next_approach',
+             NEOCloseApproach.objects.filter(
+                 neo=self.neo, close_approach_date__gte=now
+             ).order_by('close_approach_date')[:1],
+             NEOCloseApproach._meta.db_table),
+            ('mars_photos_keyset',
+             MarsRoverPhoto.objects.order_by('-earth_date', '-sol', 'id')[:20],
+             MarsRoverPhoto._meta.db_table),
+            ('mars_photos_by_rover',
+             MarsRoverPhoto.objects.filter(rover=self.rover).order_by('-earth_date', '-sol', 'id')[:20],
+             MarsRoverPhoto._meta.db_table),
+            ('epic_latest',
+             EPICImage.objects.order_by('-date')[:10],
+             EPICImage._meta.db_table),
+            ('space_weather_recent',
+             SpaceWeatherEvent.objects.filter(
+                 event_time__gte=now - timedelta(days=30)
+             ).order_by('-event_time')[:50],
+             SpaceWeatherEvent._meta.db_table),
+            ('space_weather_by_type',
+             SpaceWeatherEvent.objects.filter(event_type='CME').order_by('-event_time')[:50],
+             SpaceWeatherEvent._meta.db_table),
+            ('natural_events_open',
+             NaturalEvent.objects.filter(closed=False).order_by('-created_at')[:20],
+             NaturalEvent._meta.db_table),
+            ('natural_events_by_category',
+             NaturalEvent.objects.filter(category_id='wildfires').order_by('-created_at')[:50],
+             NaturalEvent._meta.db_table),
+            ('space_events_by_type',
+             SpaceEvent.objects.filter(event_type='METEOR_SHOWER').order_by('event_date')[:50],
+             SpaceEvent._meta.db_table),
+            ('space_events_featured',
+             SpaceEvent.objects.filter(is_featured=True).order_by('event_date')[:10],
+             SpaceEvent._meta.db_table),
+            ('saved_item_lookup',
+             UserSavedItem.objects.filter(
+                 user=self.user, item_type='apod', item_id='qp_item_0'
+             ),
+             UserSavedItem._meta.db_table),
+            ('saved_items_recent',
+             UserSavedItem.objects.filter(user=self.user).order_by('-saved_at')[:20],
+             UserSavedItem._meta.db_table),
+        ]
+
+    def plan_problems(self, plan, table):
+        problems = []
+        if connection.vendor == 'postgresql':
+            if f'Seq Scan on {table}' in plan:
+                problems.append(f'sequential scan on {table}')
+            if 'Index' not in plan:
+                problems.append('no index used')
+        else:
+            for line in plan.splitlines():
+                if f' {table}' not in line:
+                    continue
+                if 'INDEX' not in line and 'PRIMARY KEY' not in line:
+                    problems.append(f'full scan on {table}')
+            if 'TEMP B-TREE FOR ORDER BY' in plan:
+                problems.append('sort not served by an index')
+        return problems
+
+    def test_hot_queries_use_indexes(self):
+        for name, queryset, table in self.hot_queries():
+            with self.subTest(query=name):
+                plan = queryset.explain()
+                self.assertEqual(self.plan_problems(plan, table), [], f'{name}:\n{plan}')
+
+
+class ResponseCacheTests(TestCase):
+    """Per-user cached responses follow the user's saved items"""
+    url = '/api/nasa/space-events/featured/'
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='rc_user', email='rc_user@example.com')
+        SpaceEvent.objects.create(
+            nasa_id='rc_event', title='Total solar eclipse', description='',
+            event_type='ECLIPSE_SOLAR', event_date=timezone.now() + timedelta(days=3), is_featured=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_saving_an_item_changes_the_cached_response(self):
+        first = self.client.get(self.url)
+        self.assertFalse(first.data[0]['is_saved'])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            UserSavedItem.objects.create(user=self.user, item_type='space_event', item_id='rc_event')
+
+        second = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertTrue(second.data[0]['is_saved'])
+        self.assertNotEqual(second['ETag'], first['ETag'])
+
+    def test_user_version_is_shared_through_the_database(self):
+        first = self.client.get(self.url)
+        # A bump made by another process only touches the row
+        DatasetVersion.objects.filter(name=user_items_dataset(self.user.pk)).update(version=0)
+        UserSavedItem.objects.create(user=self.user, item_type='space_event', item_id='rc_event')
+
+        second = self.client.get(self.url)
+        self.assertTrue(second.data[0]['is_saved'])
+        self.assertNotEqual(second['ETag'], first['ETag'])
+
+
+class CoverageTests(TestCase):
+    """Coverage ranges merge, report gaps and respect settle windows"""
+    day = date(2024, 3, 1)
+
+    def days(self, offset, length=0):
+        start = self.day + timedelta(days=offset)
+        return start, start + timedelta(days=length)
+
+    def ranges(self, dataset='apod', scope=''):
+        return list(DataCoverage.objects.filter(dataset=dataset, scope=scope).order_by('start_date').values_list(
+            'start_date', 'end_date'
+        ))
+
+    def test_overlapping_and_adjacent_ranges_merge(self):
+        mark_covered('apod', *self.days(0, 4))
+        mark_covered('apod', *self.days(10, 4))
+        self.assertEqual(self.ranges(), [self.days(0, 4), self.days(10, 4)])
+
+        # Adjacent on the left, overlapping on the right: all three become one
+        mark_covered('apod', *self.days(5, 6))
+        self.assertEqual(self.ranges(), [self.days(0, 14)])
+
+        # Already covered: nothing changes
+        mark_covered('apod', *self.days(2, 2))
+        self.assertEqual(self.ranges(), [self.days(0, 14)])
+
+    def test_scopes_are_separate(self):
+        mark_covered('mars_photos', *self.days(0, 4), scope='curiosity')
+        self.assertEqual(self.ranges('mars_photos', 'curiosity'), [self.days(0, 4)])
+        self.assertEqual(missing_ranges('mars_photos', *self.days(0, 4), scope='perseverance'), [self.days(0, 4)])
+
+    def test_missing_ranges(self):
+        mark_covered('apod', *self.days(3, 2))
+        mark_covered('apod', *self.days(8, 1))
+        self.assertEqual(missing_ranges('apod', *self.days(0, 12)), [
+            self.days(0, 2), self.days(6, 1), self.days(10, 2)
+        ])
+        self.assertEqual(missing_ranges('apod', *self.days(3, 2)), [])
+        self.assertEqual(missing_ranges('apod', *self.days(4, 4)), [self.days(6, 1)])
+        self.assertTrue(is_covered('apod', self.days(8)[0]))
+        self.assertFalse(is_covered('apod', self.days(7)[0]))
+
+    def test_unsettled_days_are_not_covered(self):
+        today = timezone.now().date()
+        mark_covered('neo', today - timedelta(days=3), today + timedelta(days=30))
+        self.assertEqual(self.ranges('neo'), [(today - timedelta(days=3), today - timedelta(days=1))])
+        self.assertEqual(missing_ranges('neo', today, today + timedelta(days=7)), [(today, today + timedelta(days=7))])
+
+        # A range entirely inside the settle window records nothing
+        mark_covered('epic', today - timedelta(days=1), today)
+        self.assertEqual(self.ranges('epic'), [])
+
+    def test_forget_before(self):
+        mark_covered('apod', *self.days(0, 4))
+        mark_covered('apod', *self.days(10, 4))
+        self.assertEqual(forget_before('apod', self.days(12)[0]), 1)
+        self.assertEqual(self.ranges(), [self.days(12, 2)])
+
+    def test_split_range(self):
+        self.assertEqual(split_range(*self.days(0, 15), 7), [self.days(0, 6), self.days(7, 6), self.days(14, 1)])
+        self.assertEqual(split_range(*self.days(0), 7), [self.days(0)])
+
+
+class NEOFeedRangeTests(TestCase):
+    """The NEO feed rejects ranges upstream would reject, without calling it"""
+    url = '/api/nasa/proxy/neo/'
+
+    def test_long_or_reversed_ranges_are_rejected(self):
+        for start_date, end_date in [('2000-01-01', '2030-01-01'), ('2024-03-01', '2024-03-09'), ('2024-03-05', '2024-03-01')]:
+            with self.subTest(start_date=start_date, end_date=end_date):
+                response = self.client.get(self.url, {'start_date': start_date, 'end_date': end_date})
+                self.assertEqual(response.status_code, 400)
+
+
+def noop_task(**kwargs):
+    return kwargs
+
+
+def failing_task():
+    raise RuntimeError('upstream down')
+
+
+class SyncJobTests(TestCase):
+    """Claiming, retries, lease recovery and schedule dedup of the job queue"""
+
+    def test_claim_takes_due_jobs_in_order(self):
+        later = enqueue('nasa_api.tests.noop_task', run_after=timezone.now() + timedelta(hours=1))
+        first = enqueue('nasa_api.tests.noop_task')
+        second = enqueue('nasa_api.tests.noop_task')
+
+        job = claim('host:1')
+        self.assertEqual(job.pk, first.pk)
+        self.assertEqual((job.status, job.locked_by, job.attempts), (SyncJob.RUNNING, 'host:1', 1))
+        self.assertEqual(claim('host:2').pk, second.pk)
+        self.assertIsNone(claim('host:3'))
+        self.assertEqual(SyncJob.objects.get(pk=later.pk).status, SyncJob.QUEUED)
+
+    def test_claim_loses_a_race_for_the_same_row(self):
+        job = enqueue('nasa_api.tests.noop_task')
+        stale = SyncJob.objects.get(pk=job.pk)
+        self.assertIsNotNone(claim('host:1'))
+        # A second worker that read the row before the first one claimed it
+        with mock.patch('django.db.models.query.QuerySet.first', return_value=stale):
+            self.assertIsNone(claim('host:2'))
+        self.assertEqual(SyncJob.objects.get(pk=job.pk).locked_by, 'host:1')
+
+    def test_success_records_the_result(self):
+        enqueue('nasa_api.tests.noop_task', {'days_back': 3})
+        self.assertTrue(run_job(claim('host:1')))
+        job = SyncJob.objects.get()
+        self.assertEqual(job.status, SyncJob.SUCCEEDED)
+        self.assertEqual(job.result, {'days_back': 3})
+
+    def test_failures_retry_with_backoff_then_fail(self):
+        job = enqueue('nasa_api.tests.failing_task', max_attempts=3)
+        for attempt, delay in [(1, 60), (2, 120)]:
+            SyncJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+            before = timezone.now()
+            self.assertFalse(run_job(claim('host:1')))
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts, job.locked_by), (SyncJob.QUEUED, attempt, ''))
+            self.assertIn('upstream down', job.error)
+            self.assertGreaterEqual(job.run_after, before + timedelta(seconds=delay))
+            self.assertLess(job.run_after, before + timedelta(seconds=delay + 30))
+
+        SyncJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        self.assertFalse(run_job(claim('host:1')))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (SyncJob.FAILED, 3))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_dead_worker_jobs_are_requeued(self):
+        enqueue('nasa_api.tests.noop_task')
+        enqueue('nasa_api.tests.noop_task')
+        mine, other = claim('host:1'), claim('host:2')
+        self.assertEqual(requeue_worker('host:1'), 1)
+        self.assertEqual(SyncJob.objects.get(pk=mine.pk).status, SyncJob.QUEUED)
+        self.assertEqual(SyncJob.objects.get(pk=other.pk).status, SyncJob.RUNNING)
+
+    def test_expired_leases_are_requeued_or_failed(self):
+        fresh = enqueue('nasa_api.tests.noop_task')
+        expired = enqueue('nasa_api.tests.noop_task')
+        exhausted = enqueue('nasa_api.tests.noop_task', max_attempts=1)
+        for _ in range(3):
+            claim('host:1')
+        SyncJob.objects.filter(pk__in=[expired.pk, exhausted.pk]).update(
+            locked_at=timezone.now() - timedelta(seconds=601)
+        )
+
+        self.assertEqual(requeue_stale(lease=600), 2)
+        statuses = dict(SyncJob.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses, {
+            fresh.pk: SyncJob.RUNNING, expired.pk: SyncJob.QUEUED, exhausted.pk: SyncJob.FAILED
+        })
+
+    def test_scheduler_enqueues_each_due_slot_once(self):
+        schedule = {'every-minute': {'task': 'nasa_api.tests.noop_task', 'schedule': timedelta(minutes=1)}}
+        schedulers = [Scheduler(schedule), Scheduler(schedule)]
+        for scheduler in schedulers:
+            scheduler.started_at = timezone.now() - timedelta(minutes=5)
+
+        created = [job for scheduler in schedulers for job in scheduler.tick()]
+        self.assertEqual(len(created), 1)
+        self.assertEqual(created[0].schedule_entry, 'every-minute')
+        # The entry just ran, so it is not due again yet
+        self.assertEqual(schedulers[0].tick(), [])
+        self.assertEqual(SyncJob.objects.count(), 1)
+
+
+@skipUnless(connection.features.has_select_for_update_skip_locked, 'Needs SELECT ... FOR UPDATE SKIP LOCKED')
+class ConcurrentClaimTests(TransactionTestCase):
+    """Workers claiming from one queue at once never take the same job"""
+    JOBS = 40
+    WORKERS = 4
+
+    def test_each_job_is_claimed_once(self):
+        for _ in range(self.JOBS):
+            enqueue('nasa_api.tests.noop_task')
+        claimed = {}
+        barrier = threading.Barrier(self.WORKERS)
+
+        def work(worker):
+            try:
+                barrier.wait()
+                while (job := claim(worker)) is not None:
+                    claimed.setdefault(job.pk, []).append(worker)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=work, args=(f'host:{index}',)) for index in range(self.WORKERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(claimed), self.JOBS)
+        self.assertTrue(all(len(workers) == 1 for workers in claimed.values()))
+        self.assertFalse(SyncJob.objects.filter(status=SyncJob.QUEUED).exists())
+
+
+@override_settings(EMAIL_BACKEND='users.tests.RefusingEmailBackend')
+class NEOAlertTests(TestCase):
+    """A refused recipient costs only its own digest"""
+
+    def setUp(self):
+        neo = NearEarthObject.objects.create(
+            nasa_id='alert_neo', name='(2024 AB)', designation='2024 AB',
+            estimated_diameter_min_km=0.1, estimated_diameter_max_km=0.3, absolute_magnitude=20.0
+        )
+        tomorrow = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        self.approach = NEOCloseApproach.objects.create(
+            neo=neo, close_approach_date=tomorrow, relative_velocity_kmh=50000.0, miss_distance_km=1e6
+        )
+        self.users = [
+            User.objects.create(username=username, email=email) for username, email in [
+                ('alert_a', 'a@example.com'), ('alert_b', 'b@refused.example'), ('alert_c', 'c@example.com'),
+            ]
+        ]
+        for user in self.users:
+            UserTrackedObject.objects.create(user=user, object_type='neo', object_id='alert_neo')
+
+    @mock.patch.object(NotificationService, 'NEO_ALERT_BATCH_SIZE', 2)
+    def test_partial_batch_failure(self):
+        results = NotificationService.check_and_send_neo_alerts()
+        self.assertEqual((results['emails_sent'], results['errors']), (2, 1))
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['a@example.com', 'c@example.com'])
+        self.assertEqual(
+            sorted(NEOAlertDelivery.objects.values_list('user__username', flat=True)), ['alert_a', 'alert_c']
+        )
+
+        # A rerun only retries the refused user
+        results = NotificationService.check_and_send_neo_alerts()
+        self.assertEqual((results['emails_sent'], results['errors']), (0, 1))
+        self.assertEqual(len(mail.outbox), 2)
+
+
+class DerivativeRetentionTests(TestCase):
+    """Deleting expired EPIC images removes the derivatives nothing else references"""
+
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.store = DerivativeStore(root.name)
+        patcher = mock.patch('nasa_api.retention.derivative_store', self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def image(self, nasa_id, days_ago, color):
+        data = io.BytesIO()
+        Image.new('RGB', (8, 8), color).save(data, format='PNG')
+        return EPICImage.objects.create(
+            nasa_id=nasa_id, identifier=nasa_id, caption='', image_url='https://epic.gsfc.nasa.gov/',
+            date=timezone.now() - timedelta(days=days_ago), content_hash=self.store.store(data.getvalue()),
+        )
+
+    def test_expired_derivatives_are_removed(self):
+        expired = self.image('expired', 200, 'red')
+        shared = self.image('shared_old', 200, 'blue')
+        kept = self.image('shared_new', 10, 'blue')
+
+        deleted = RetentionEngine().apply(get_policies(['epic'])[0])
+        self.assertEqual(deleted, 2)
+        self.assertFalse(os.path.exists(self.store.entry_dir(expired.content_hash)))
+        # Still referenced by a retained image with the same content
+        self.assertEqual(shared.content_hash, kept.content_hash)
+        self.assertTrue(self.store.has(kept.content_hash))
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor pages, legacy page numbers and malformed cursors on the Mars photo feed"""
+
+    @classmethod
+    def setUpTestData(cls):
+        rover = MarsRover.objects.create(name='curiosity', landing_date=date(2012, 8, 6), launch_date=date(2011, 11, 26))
+        start = date(2024, 1, 1)
+        MarsRoverPhoto.objects.bulk_create([
+            MarsRoverPhoto(
+                nasa_id=f'page_photo_{i}', rover=rover, sol=4000 + i // 3, img_src=f'https://mars.nasa.gov/{i}.jpg',
+                earth_date=start + timedelta(days=i // 3), camera_name='NAVCAM', camera_full_name='Navigation Camera'
+            )
+            for i in range(7)
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    @staticmethod
+    def cursor(position):
+        return KeysetPagination().encode_cursor(position)
+
+    def test_cursor_round_trip(self):
+        seen = []
+        url = '/api/nasa/mars-photos/?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(photo['nasa_id'] for photo in response.data['results'])
+            url = response.data['next']
+        expected = MarsRoverPhoto.objects.order_by('-earth_date', '-sol', 'id').values_list('nasa_id', flat=True)
+        self.assertEqual(seen, list(expected))
+
+    def test_legacy_page_numbers(self):
+        response = self.client.get('/api/nasa/mars-photos/?page=2&page_size=3')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 7)
+        expected = MarsRoverPhoto.objects.order_by('-earth_date', '-sol', 'id').values_list('nasa_id', flat=True)
+        self.assertEqual([photo['nasa_id'] for photo in response.data['results']], list(expected[3:6]))
+
+    def test_invalid_cursors(self):
+        for url, cursor in [
+            ('/api/nasa/mars-photos/', 'not base64 json'),
+            ('/api/nasa/mars-photos/', self.cursor(['2024-01-01', 'abc', 1])),
+            ('/api/nasa/mars-photos/', self.cursor(['2024-01-01', 4000])),
+            ('/api/nasa/mars-photos/', self.cursor([None, 4000, 1])),
+            ('/api/nasa/apod/', self.cursor([{'a': 1}])),
+            ('/api/nasa/apod/', self.cursor(['2024-02-30'])),
+        ]:
+            with self.subTest(url=url, cursor=cursor):
+                response = self.client.get(url, {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+
+class RandomSamplerTests(TestCase):
+    """Rows after a gap in the keys are not favoured over the others"""
+
+    def setUp(self):
+        cache.clear()
+        random.seed(1234)
+
+    def test_filtered_sample_is_uniform(self):
+        items = NASAMediaItem.objects.bulk_create([
+            NASAMediaItem(nasa_id=f'sample_{i}', title=f'Item {i}', media_type='video' if 5 <= i < 35 else 'image')
+            for i in range(40)
+        ])
+        images = {item.nasa_id for item in items if item.media_type == 'image'}
+        sampler = RandomSampler(NASAMediaItem, 'nasa_media', name='test_media_image', media_type='image')
+
+        counts = {nasa_id: 0 for nasa_id in images}
+        for _ in range(1000):
+            (item,) = sampler.sample(1)
+            counts[item.nasa_id] += 1
+        # 100 expected per image; seeking past the videos gave sample_35 several times that
+        self.assertEqual(set(counts), images)
+        self.assertLess(max(counts.values()), 160)
+        self.assertGreater(min(counts.values()), 50)
+
+    def test_sparse_rows_fall_back_to_offsets(self):
+        NASAMediaItem.objects.bulk_create([
+            NASAMediaItem(nasa_id=f'sparse_{i}', title=f'Item {i}', media_type='image' if i in (0, 2999) else 'audio')
+            for i in range(3000)
+        ])
+        sampler = RandomSampler(NASAMediaItem, 'nasa_media', name='test_sparse_image', media_type='image')
+        rows = sampler.sample(5)
+        self.assertEqual(sorted(item.nasa_id for item in rows), ['sparse_0', 'sparse_2999'])
+
+
+class MarsPhotoPageTests(TestCase):
+    """Out of range pages of the read-through Mars endpoint are rejected, not sliced"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        rover = MarsRover.objects.create(name='curiosity', landing_date=date(2012, 8, 6), launch_date=date(2011, 11, 26))
+        MarsRoverPhoto.objects.create(
+            nasa_id='101', rover=rover, sol=100, img_src='https://mars.nasa.gov/101.jpg',
+            earth_date=date(2012, 11, 15), camera_name='NAVCAM', camera_full_name='Navigation Camera'
+        )
+        mark_covered('mars_photos', date(2012, 11, 15), date(2012, 11, 15), scope='curiosity')
+
+    def test_invalid_pages(self):
+        for page in ['0', '-1', 'abc']:
+            with self.subTest(page=page):
+                response = self.client.get('/api/nasa/proxy/mars/', {'sol': 100, 'page': page})
+                self.assertEqual(response.status_code, 400)
+
+    def test_first_page(self):
+        response = self.client.get('/api/nasa/proxy/mars/', {'sol': 100, 'page': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([photo['id'] for photo in response.data['photos']], [101])
+        # Callers outside the view get the first page for pages below 1
+        self.assertEqual(read_through.mars_photos('curiosity', sol=100, page=0), response.data)
+
+
+class ConditionalSyncTests(TestCase):
+    """Validators of a listing are stored only when every item of it was saved"""
+
+    def launch(self, launch_id, **fields):
+        return {'id': launch_id, 'name': f'Launch {launch_id}', 'net': '2030-01-01T12:00:00Z', **fields}
+
+    def test_listing_with_item_errors_is_refetched(self):
+        remember_upcoming, remember_recent = mock.Mock(), mock.Mock()
+        listings = [
+            ([self.launch('ok_1'), self.launch('broken', pad=None)], remember_upcoming),
+            ([self.launch('ok_2')], remember_recent),
+        ]
+        with mock.patch.object(launch_library_service, '_fetch_if_modified', side_effect=listings):
+            synced = launch_library_service.sync_launches_to_space_events()
+
+        self.assertEqual(synced, 2)
+        remember_upcoming.assert_not_called()
+        remember_recent.assert_called_once_with()
+
+    def test_eonet_validators_wait_for_clean_run(self):
+        remember = mock.Mock()
+        response = mock.Mock(status_code=200)
+        response.json.return_value = {'events': [{'id': 'EONET_1', 'title': 'Wildfire', 'geometry': []}]}
+        session = natural_event_service.session
+        with mock.patch.object(session, 'get_if_modified', return_value=(response, remember)):
+            self.assertEqual(natural_event_service.sync_natural_events_data(), 1)
+        remember.assert_called_once_with()
+
+        remember.reset_mock()
+        response.json.return_value = {'events': [{'id': 'EONET_2', 'title': 'Storm', 'geometry': [{}]}]}
+        with mock.patch.object(session, 'get_if_modified', return_value=(response, remember)):
+            natural_event_service.sync_natural_events_data()
+        remember.assert_not_called()
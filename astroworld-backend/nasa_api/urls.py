@@ -2,6 +2,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
 from . import views_extended  # Import extended views
+from . import views_export
 
 app_name = 'nasa_api'
 
@@ -23,16 +24,20 @@ urlpatterns = [
     # Mars Rover endpoints
     path('mars-photos/', views.MarsRoverPhotoListView.as_view(), name='mars-photos-list'),
     path('mars-photos/latest/', views.get_latest_mars_photos, name='mars-photos-latest'),
+    path('mars-photos/random/', views.get_random_mars_photos, name='mars-photos-random'),
     path('mars-rovers/status/', views.get_rovers_status, name='mars-rovers-status'),
     
     # EPIC endpoints
     path('epic/', views.EPICImageListView.as_view(), name='epic-list'),
     path('epic/latest/', views.get_latest_epic, name='epic-latest'),
+    path('epic/<str:nasa_id>/image/<str:variant>/', views.get_epic_image_variant, name='epic-image-variant'),
     
     # Exoplanet endpoints
     path('exoplanets/', views.ExoplanetListView.as_view(), name='exoplanets-list'),
     path('exoplanets/habitable/', views.get_habitable_exoplanets, name='exoplanets-habitable'),
     path('exoplanets/search/', views.search_exoplanets, name='exoplanets-search'),
+    path('exoplanets/histogram/', views.get_exoplanet_histogram, name='exoplanets-histogram'),
+    path('exoplanets/scatter/', views.get_exoplanet_scatter, name='exoplanets-scatter'),
     path('exoplanets/<str:nasa_id>/', views.ExoplanetDetailView.as_view(), name='exoplanet-detail'),
     
     # Space Weather endpoints
@@ -82,6 +87,7 @@ urlpatterns = [
     # NASA Image and Video Library
     path('images/search/', views_extended.nasa_image_search, name='images-search'),
     path('images/popular/', views_extended.nasa_image_popular, name='images-popular'),
+    path('images/random/', views_extended.nasa_image_random, name='images-random'),
     path('images/asset/<str:nasa_id>/', views_extended.nasa_image_asset, name='images-asset'),
     path('images/metadata/<str:nasa_id>/', views_extended.nasa_image_metadata, name='images-metadata'),
     
@@ -102,6 +108,11 @@ urlpatterns = [
     path('proxy/neo/', views_extended.nasa_neo_feed, name='proxy-neo'),
     path('proxy/mars/', views_extended.nasa_mars_photos, name='proxy-mars'),
     path('proxy/epic/', views_extended.nasa_epic, name='proxy-epic'),
+    path('proxy/image/', views_extended.image_proxy, name='proxy-image'),
     path('proxy/donki/', views_extended.nasa_donki, name='proxy-donki'),
     path('proxy/exoplanets/count/', views_extended.nasa_exoplanets_count, name='proxy-exoplanets-count'),
+    
+    # Bulk exports (staff only)
+    path('export/', views_export.export_datasets, name='export-datasets'),
+    path('export/<str:dataset>/', views_export.export_dataset, name='export-dataset'),
 ]
\ No newline at end of file
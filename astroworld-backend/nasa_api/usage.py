@@ -0,0 +1,153 @@
+"""
+Buffered API usage logging.
+
+Upstream calls are recorded in memory and written with ``bulk_create`` once
+``API_USAGE_BUFFER_SIZE`` records are pending or ``API_USAGE_FLUSH_INTERVAL``
+seconds have passed, so sync loops no longer pay a DB write per fetch. When
+``API_USAGE_ROLLUP`` is enabled each flush also folds the records into
+per-minute ``APIUsageRollup`` rows.
+
+Records of a failed flush go back into the buffer for the next flush, up to
+``API_USAGE_MAX_PENDING`` records (oldest dropped first), and inline flushes
+pause for one flush interval so a database outage doesn't slow every call.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from astroworld.instrumentation import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+class APIUsageBuffer:
+    """Thread-safe in-memory buffer of APIUsageLog rows"""
+
+    def __init__(self, max_size: int = None, flush_interval: float = None):
+        self.max_size = max_size or getattr(settings, 'API_USAGE_BUFFER_SIZE', 100)
+        self.flush_interval = flush_interval or getattr(settings, 'API_USAGE_FLUSH_INTERVAL', 5)
+        self.max_pending = getattr(settings, 'API_USAGE_MAX_PENDING', self.max_size * 50)
+        self._pending = []
+        self._retry_after = 0.0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+
+    def record(self, endpoint: str, response_time: float, status_code: int,
+               error_message: str = '', user=None):
+        """Queue a usage record; flushes inline once the buffer is full"""
+        with self._lock:
+            self._pending.append({
+                'endpoint': endpoint[:100],
+                'user': user,
+                'timestamp': timezone.now(),
+                'response_time': response_time,
+                'status_code': status_code,
+                'error_message': error_message,
+            })
+            full = len(self._pending) >= self.max_size and time.monotonic() >= self._retry_after
+        self._ensure_flusher()
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all pending records; returns the number written"""
+        with self._flush_lock:
+            with self._lock:
+                records, self._pending = self._pending, []
+            if not records:
+                return 0
+
+            from .models import APIUsageLog
+
+            try:
+                with transaction.atomic():
+                    APIUsageLog.objects.bulk_create(
+                        [APIUsageLog(**record) for record in records],
+                        batch_size=500
+                    )
+                    if getattr(settings, 'API_USAGE_ROLLUP', True):
+                        self._update_rollups(records)
+            except Exception as e:
+                logger.error(f"Failed to flush {len(records)} API usage records, will retry: {str(e)}")
+                self._requeue(records)
+                return 0
+            self._retry_after = 0.0
+            return len(records)
+
+    def _requeue(self, records: List[Dict]):
+        """Put records of a failed flush back in front of newer ones"""
+        with self._lock:
+            self._pending = records + self._pending
+            dropped = len(self._pending) - self.max_pending
+            if dropped > 0:
+                del self._pending[:dropped]
+                logger.warning(f"API usage buffer full, dropped {dropped} oldest records")
+            self._retry_after = time.monotonic() + self.flush_interval
+
+    def _update_rollups(self, records: List[Dict]):
+        """Fold records into per-minute rollup rows"""
+        from .models import APIUsageRollup
+
+        buckets = defaultdict(Histogram)
+        errors = defaultdict(int)
+        for record in records:
+            key = (record['endpoint'], record['timestamp'].replace(second=0, microsecond=0))
+            buckets[key].observe(record['response_time'] * 1000)
+            if record['status_code'] >= 400 or record['status_code'] == 0:
+                errors[key] += 1
+
+        for (endpoint, minute), histogram in buckets.items():
+            for attempt in range(2):
+                try:
+                    with transaction.atomic():
+                        rollup = APIUsageRollup.objects.select_for_update().filter(
+                            endpoint=endpoint, bucket=minute
+                        ).first()
+                        if rollup is None:
+                            rollup = APIUsageRollup(endpoint=endpoint, bucket=minute)
+                        merged = Histogram()
+                        merged.merge(rollup.latency_buckets, 0, 0, 0)
+                        merged.merge(histogram.buckets, 0, 0, 0)
+                        rollup.request_count += histogram.count
+                        rollup.error_count += errors[(endpoint, minute)]
+                        rollup.total_response_time += histogram.total_ms / 1000
+                        rollup.max_response_time = max(rollup.max_response_time, histogram.max_ms / 1000)
+                        rollup.latency_buckets = merged.buckets
+                        rollup.save()
+                    break
+                except IntegrityError:
+                    # Another process created the bucket first; retry as an update
+                    if attempt:
+                        raise
+
+    def _ensure_flusher(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name='api-usage-flusher', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            close_old_connections()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+usage_buffer = APIUsageBuffer()
+atexit.register(usage_buffer.flush)
@@ -4,9 +4,12 @@ from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
+from django.http import FileResponse, HttpResponseNotModified
 from django.db.models import Q, Count
 from django.conf import settings
 from datetime import datetime, timedelta
+import logging
+from astroworld.response_cache import cache_response
 
 from .models import (
     APOD, NearEarthObject, NEOCloseApproach, MarsRoverPhoto, EPICImage, Exoplanet,
@@ -17,10 +20,17 @@ from .serializers import (
     ExoplanetSerializer, SpaceWeatherEventSerializer, NaturalEventSerializer,
     SpaceEventSerializer, UserSavedItemSerializer, UserTrackedObjectSerializer
 )
-from .services import (
-    apod_service, neo_service, mars_rover_service, epic_service, exoplanet_service,
-    space_weather_service, natural_event_service, space_event_service
-)
+from .services import apod_service, epic_service
+from .sampling import apod_sampler, mars_photo_sampler
+from .jobs import run_or_enqueue
+from .pagination import APODKeysetPagination, MarsPhotoKeysetPagination
+from .exoplanet_store import exoplanet_store, parse_ranges, NUMERIC_FIELDS
+from .image_derivatives import derivative_store, VARIANTS
+
+logger = logging.getLogger(__name__)
+
+# Datasets whose syncs write SpaceEvent rows
+SPACE_EVENT_DATASETS = ['space_events', 'launch_library', 'launch_library_events']
 
 class StandardPagination(PageNumberPagination):
     page_size = 20
@@ -31,7 +41,7 @@ class StandardPagination(PageNumberPagination):
 class APODListView(generics.ListAPIView):
     """List Astronomy Pictures of the Day"""
     serializer_class = APODSerializer
-    pagination_class = StandardPagination
+    pagination_class = APODKeysetPagination
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     
     def get_queryset(self):
@@ -80,14 +90,18 @@ def get_latest_apod(request):
 @permission_classes([permissions.IsAuthenticatedOrReadOnly])
 def get_random_apod(request):
     """Get random APOD images"""
-    count = int(request.query_params.get('count', 1))
-    count = min(count, 10)  # Limit to 10
+    try:
+        count = min(int(request.query_params.get('count', 1)), 10)  # Limit to 10
+    except ValueError:
+        count = 0
+    if count < 1:
+        return Response({'error': 'count must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
     
     # Try to get from database first
-    random_apods = APOD.objects.order_by('?')[:count]
+    random_apods = apod_sampler.sample(count)
     
     if len(random_apods) >= count:
-        serializer = APODSerializer(random_apods, many=True)
+        serializer = APODSerializer(random_apods, many=True, context={'request': request})
         return Response(serializer.data)
     else:
         # Fetch from API
@@ -155,11 +169,11 @@ def get_upcoming_neo_approaches(request):
 class MarsRoverPhotoListView(generics.ListAPIView):
     """List Mars Rover Photos"""
     serializer_class = MarsRoverPhotoSerializer
-    pagination_class = StandardPagination
+    pagination_class = MarsPhotoKeysetPagination
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     
     def get_queryset(self):
-        queryset = MarsRoverPhoto.objects.all().order_by('-earth_date', '-sol')
+        queryset = MarsRoverPhoto.objects.select_related('rover').order_by('-earth_date', '-sol', 'id')
         
         # Filters
         rover = self.request.query_params.get('rover')
@@ -180,6 +194,7 @@ class MarsRoverPhotoListView(generics.ListAPIView):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticatedOrReadOnly])
+@cache_response(['mars_photos'])
 def get_rovers_status(request):
     """Get status of all Mars rovers"""
     from .models import MarsRover
@@ -223,33 +238,30 @@ class EPICImageListView(generics.ListAPIView):
 
 # Exoplanet Views
 class ExoplanetListView(generics.ListAPIView):
-    """List Exoplanets"""
+    """List Exoplanets from the in-memory columnar store"""
     serializer_class = ExoplanetSerializer
     pagination_class = StandardPagination
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     
-    def get_queryset(self):
-        queryset = Exoplanet.objects.all().order_by('-discovery_year', 'name')
+    def list(self, request, *args, **kwargs):
+        params = request.query_params
+        try:
+            ranges = parse_ranges(params)
+            discovery_year = params.get('discovery_year')
+            if discovery_year:
+                ranges['discovery_year'] = (int(discovery_year), int(discovery_year))
+        except ValueError:
+            return Response({'error': 'Range filters must be numbers'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Filters
-        discovery_year = self.request.query_params.get('discovery_year')
-        habitable = self.request.query_params.get('habitable')
-        discovery_method = self.request.query_params.get('discovery_method')
-        min_radius = self.request.query_params.get('min_radius')
-        max_radius = self.request.query_params.get('max_radius')
+        habitable = params.get('habitable')
+        positions = exoplanet_store.snapshot().select(
+            ranges=ranges,
+            habitable=None if habitable is None else habitable.lower() == 'true',
+            discovery_method=params.get('discovery_method'),
+        )
         
-        if discovery_year:
-            queryset = queryset.filter(discovery_year=int(discovery_year))
-        if habitable is not None:
-            queryset = queryset.filter(is_habitable_zone=habitable.lower() == 'true')
-        if discovery_method:
-            queryset = queryset.filter(discovery_method__icontains=discovery_method)
-        if min_radius:
-            queryset = queryset.filter(planet_radius__gte=float(min_radius))
-        if max_radius:
-            queryset = queryset.filter(planet_radius__lte=float(max_radius))
-            
-        return queryset
+        page = self.paginate_queryset(positions.tolist())
+        return self.get_paginated_response(exoplanet_store.rows(page, request))
 
 class ExoplanetDetailView(generics.RetrieveAPIView):
     """Get specific exoplanet details"""
@@ -359,6 +371,11 @@ class SpaceEventListView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     pagination_class = StandardPagination
     
+    # Short timeout: days_until_event and the upcoming/past split move with time
+    @cache_response(SPACE_EVENT_DATASETS, timeout=300, per_user=True)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
     def get_queryset(self):
         queryset = SpaceEvent.objects.all().order_by('event_date')
         
@@ -404,6 +421,7 @@ class SpaceEventDetailView(generics.RetrieveAPIView):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticatedOrReadOnly])
+@cache_response(SPACE_EVENT_DATASETS, timeout=300, per_user=True)
 def get_featured_space_events(request):
     """Get featured space events"""
     events = SpaceEvent.objects.filter(is_featured=True).order_by('event_date')[:10]
@@ -436,7 +454,12 @@ def get_space_events_by_type(request, event_type):
 def sync_space_events(request):
     """Sync space events data (Admin only)"""
     try:
-        synced_count = space_event_service.sync_space_events()
+        results, jobs = run_or_enqueue([
+            ('space_events', 'nasa_api.services.space_event_service.sync_space_events', {})
+        ])
+        if jobs:
+            return Response({'message': 'Sync queued', 'jobs': jobs}, status=status.HTTP_202_ACCEPTED)
+        synced_count = results['space_events']
         return Response({
             'message': f'Successfully synced {synced_count} space events',
             'synced_count': synced_count
@@ -666,19 +689,43 @@ def get_hazardous_neos(request):
 def get_latest_epic(request):
     """Get latest EPIC images"""
     latest_epic = EPICImage.objects.order_by('-date')[:10]
-    serializer = EPICImageSerializer(latest_epic, many=True)
+    serializer = EPICImageSerializer(latest_epic, many=True, context={'request': request})
     return Response(serializer.data)
 
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def get_epic_image_variant(request, nasa_id, variant):
+    """Serve a locally stored WebP variant of an EPIC image, deriving it on first use"""
+    if variant not in VARIANTS:
+        return Response({'error': f'variant must be one of: {", ".join(VARIANTS)}'}, status=status.HTTP_404_NOT_FOUND)
+    
+    epic_image = get_object_or_404(EPICImage, nasa_id=nasa_id)
+    try:
+        digest = epic_service.derive_image(epic_image)
+    except Exception as e:
+        logger.error(f"EPIC derivative failed for {nasa_id}: {str(e)}")
+        return Response({'error': 'Image is not available'}, status=status.HTTP_502_BAD_GATEWAY)
+    
+    etag = f'"{digest}-{variant}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        try:
+            response = FileResponse(open(derivative_store.path(digest, variant), 'rb'), content_type='image/webp')
+        except FileNotFoundError:
+            # Removed between derive_image's check and the open; the next request re-derives
+            logger.warning(f"EPIC derivative {digest}/{variant} disappeared for {nasa_id}")
+            return Response({'error': 'Image is not available'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticatedOrReadOnly])
 def get_habitable_exoplanets(request):
     """Get potentially habitable exoplanets"""
-    habitable = Exoplanet.objects.filter(
-        is_habitable_zone=True
-    ).order_by('-discovery_year')[:20]
-    
-    serializer = ExoplanetSerializer(habitable, many=True)
-    return Response(serializer.data)
+    positions = exoplanet_store.snapshot().select(habitable=True)[:20]
+    return Response(exoplanet_store.rows(positions.tolist(), request))
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticatedOrReadOnly])
@@ -689,12 +736,50 @@ def search_exoplanets(request):
     if len(query) < 2:
         return Response({'error': 'Query must be at least 2 characters'}, status=status.HTTP_400_BAD_REQUEST)
     
-    exoplanets = Exoplanet.objects.filter(
-        Q(name__icontains=query) | Q(host_star__icontains=query) | Q(discovery_method__icontains=query)
-    )[:20]
+    positions = exoplanet_store.snapshot().select(query=query)[:20]
+    return Response(exoplanet_store.rows(positions.tolist(), request))
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticatedOrReadOnly])
+def get_exoplanet_histogram(request):
+    """Histogram of one exoplanet attribute, honoring the list range filters"""
+    field = request.query_params.get('field', 'radius')
+    if field not in NUMERIC_FIELDS:
+        return Response({'error': f'field must be one of: {", ".join(NUMERIC_FIELDS)}'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        bins = min(max(int(request.query_params.get('bins', 20)), 1), 200)
+        ranges = parse_ranges(request.query_params)
+    except ValueError:
+        return Response({'error': 'bins and range filters must be numbers'}, status=status.HTTP_400_BAD_REQUEST)
     
-    serializer = ExoplanetSerializer(exoplanets, many=True)
-    return Response(serializer.data)
+    snapshot = exoplanet_store.snapshot()
+    positions = snapshot.select(ranges=ranges)
+    log = request.query_params.get('log', 'false').lower() == 'true'
+    return Response(snapshot.histogram(field, positions, bins=bins, log=log))
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticatedOrReadOnly])
+def get_exoplanet_scatter(request):
+    """Downsampled x/y points for exoplanet scatter plots"""
+    x = request.query_params.get('x', 'mass')
+    y = request.query_params.get('y', 'radius')
+    if x not in NUMERIC_FIELDS or y not in NUMERIC_FIELDS:
+        return Response({'error': f'x and y must be one of: {", ".join(NUMERIC_FIELDS)}'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        max_points = min(max(int(request.query_params.get('max_points', 2000)), 1), 10000)
+        ranges = parse_ranges(request.query_params)
+    except ValueError:
+        return Response({'error': 'max_points and range filters must be numbers'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    snapshot = exoplanet_store.snapshot()
+    positions = snapshot.select(ranges=ranges)
+    return Response(snapshot.scatter(
+        x, y, positions, max_points=max_points,
+        log_x=request.query_params.get('log_x', 'false').lower() == 'true',
+        log_y=request.query_params.get('log_y', 'false').lower() == 'true',
+    ))
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
@@ -704,38 +789,63 @@ def sync_nasa_data(request):
         return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
     
     data_type = request.data.get('type', 'all')
-    results = {}
+    
+    # (result name, service method, kwargs); queued as one job each when
+    # SYNC_JOB_QUEUE is on, so the datasets sync in parallel
+    calls = []
+    if data_type == 'all' or data_type == 'apod':
+        calls.append(('apod', 'nasa_api.services.apod_service.sync_apod_data', {'days_back': 7}))
+    
+    if data_type == 'all' or data_type == 'neo':
+        calls.append(('neo', 'nasa_api.services.neo_service.sync_neo_data', {'days_ahead': 30}))
+    
+    if data_type == 'all' or data_type == 'mars':
+        for rover in ['curiosity', 'perseverance', 'opportunity']:
+            calls.append((
+                f'mars_rovers.{rover}', 'nasa_api.services.mars_rover_service.sync_rover_data',
+                {'rover_name': rover, 'latest_sols': 5}
+            ))
+    
+    if data_type == 'all' or data_type == 'epic':
+        # Inline, only store the metadata; variants are derived on first request
+        epic_kwargs = {'days_back': 3}
+        if not getattr(settings, 'SYNC_JOB_QUEUE', False):
+            epic_kwargs['derivatives'] = False
+        calls.append(('epic', 'nasa_api.services.epic_service.sync_epic_data', epic_kwargs))
+    
+    if data_type == 'all' or data_type == 'exoplanets':
+        # The full archive only runs as a queued job; inline, sync one page per
+        # request (resuming from the checkpoint) to stay within the worker timeout
+        exoplanet_kwargs = {} if getattr(settings, 'SYNC_JOB_QUEUE', False) else {'page_size': 500, 'max_pages': 1, 'timeout': 30}
+        calls.append(('exoplanets', 'nasa_api.services.exoplanet_service.sync_exoplanet_data', exoplanet_kwargs))
+    
+    if data_type == 'all' or data_type == 'space_weather':
+        calls.append((
+            'space_weather', 'nasa_api.services.space_weather_service.sync_space_weather_data', {'days_back': 30}
+        ))
+    
+    if data_type == 'all' or data_type == 'natural_events':
+        calls.append((
+            'natural_events', 'nasa_api.services.natural_event_service.sync_natural_events_data', {'limit': 500}
+        ))
+    
+    if data_type == 'all' or data_type == 'space_events':
+        calls.append(('space_events', 'nasa_api.services.space_event_service.sync_space_events', {}))
     
     try:
-        if data_type == 'all' or data_type == 'apod':
-            results['apod'] = apod_service.sync_apod_data(days_back=7)
-        
-        if data_type == 'all' or data_type == 'neo':
-            results['neo'] = neo_service.sync_neo_data(days_ahead=30)
-        
-        if data_type == 'all' or data_type == 'mars':
-            results['mars_rovers'] = {}
-            for rover in ['curiosity', 'perseverance', 'opportunity']:
-                results['mars_rovers'][rover] = mars_rover_service.sync_rover_data(rover, latest_sols=5)
-        
-        if data_type == 'all' or data_type == 'epic':
-            results['epic'] = epic_service.sync_epic_data(days_back=3)
-        
-        if data_type == 'all' or data_type == 'exoplanets':
-            results['exoplanets'] = exoplanet_service.sync_exoplanet_data(limit=100)
-        
-        if data_type == 'all' or data_type == 'space_weather':
-            results['space_weather'] = space_weather_service.sync_space_weather_data(days_back=30)
-        
-        if data_type == 'all' or data_type == 'natural_events':
-            results['natural_events'] = natural_event_service.sync_natural_events_data(limit=500)
-        
-        if data_type == 'all' or data_type == 'space_events':
-            results['space_events'] = space_event_service.sync_space_events()
-        
+        results, jobs = run_or_enqueue(calls)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    if jobs:
+        return Response({'message': 'Sync queued', 'jobs': jobs}, status=status.HTTP_202_ACCEPTED)
+    
+    mars_rovers = {
+        name.split('.', 1)[1]: results.pop(name) for name in list(results) if name.startswith('mars_rovers.')
+    }
+    if mars_rovers:
+        results['mars_rovers'] = mars_rovers
+    
     return Response({
         'message': 'Sync completed',
         'results': results
@@ -745,26 +855,9 @@ def sync_nasa_data(request):
 @permission_classes([permissions.IsAuthenticatedOrReadOnly])
 def get_api_status(request):
     """Get API status and limits"""
-    from .models import APIUsageLog
-    
-    # Get recent API usage stats
-    recent_logs = APIUsageLog.objects.filter(
-        timestamp__gte=timezone.now() - timedelta(hours=24)
-    )
+    from .status import get_api_status as build_status
     
-    stats = {
-        'api_calls_24h': recent_logs.count(),
-        'avg_response_time': recent_logs.aggregate(avg_time=Count('response_time'))['avg_time'] or 0,
-        'error_rate': recent_logs.filter(status_code__gte=400).count() / max(recent_logs.count(), 1),
-        'nasa_api_key_configured': bool(settings.NASA_API_KEY),
-        'celery_enabled': settings.USE_CELERY,
-        'last_sync': {
-            'apod': APOD.objects.aggregate(latest=Count('created_at'))['latest'],
-            'neo': NearEarthObject.objects.aggregate(latest=Count('created_at'))['latest'],
-        }
-    }
-    
-    return Response(stats)
+    return Response(build_status())
 
 # Additional user endpoints
 @api_view(['GET'])
@@ -880,6 +973,24 @@ def get_latest_mars_photos(request):
     serializer = MarsRoverPhotoSerializer(photos, many=True)
     return Response(serializer.data)
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticatedOrReadOnly])
+def get_random_mars_photos(request):
+    """Get random Mars rover photos"""
+    try:
+        count = min(int(request.query_params.get('count', 1)), 10)  # Limit to 10
+    except ValueError:
+        count = 0
+    if count < 1:
+        return Response({'error': 'count must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    photos = mars_photo_sampler.sample(count)
+    if not photos:
+        return Response({'error': 'No Mars photos available'}, status=status.HTTP_404_NOT_FOUND)
+    
+    serializer = MarsRoverPhotoSerializer(photos, many=True, context={'request': request})
+    return Response(serializer.data)
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticatedOrReadOnly])
 def get_recent_space_weather(request):
@@ -992,35 +1103,7 @@ def get_popular_content(request):
 @permission_classes([permissions.IsAuthenticated])
 def get_dashboard_data(request):
     """Get dashboard data for user"""
-    user = request.user
-    
-    # Get recent user activity
-    recent_saves = UserSavedItem.objects.filter(user=user).order_by('-saved_at')[:5]
-    recent_tracking = UserTrackedObject.objects.filter(user=user).order_by('-created_at')[:5]
-    
-    # Get latest NASA data
-    latest_apod = APOD.objects.first()
-    upcoming_neos = NearEarthObject.objects.filter(
-        next_close_approach_date__gte=timezone.now().date()
-    ).order_by('next_close_approach_date')[:3]
-    
-    recent_mars_photos = MarsRoverPhoto.objects.order_by('-earth_date')[:5]
-    
-    dashboard_data = {
-        'user_stats': {
-            'favorites_count': recent_saves.count(),
-            'tracking_count': recent_tracking.count(),
-        },
-        'recent_activity': {
-            'saves': UserSavedItemSerializer(recent_saves, many=True).data,
-            'tracking': UserTrackedObjectSerializer(recent_tracking, many=True).data,
-        },
-        'latest_content': {
-            'apod': APODSerializer(latest_apod).data if latest_apod else None,
-            'upcoming_neos': NEOSerializer(upcoming_neos, many=True).data,
-            'mars_photos': MarsRoverPhotoSerializer(recent_mars_photos, many=True).data,
-        }
-    }
+    from .dashboard import build_user_dashboard
     
-    return Response(dashboard_data)
+    return Response(build_user_dashboard(request))
 
@@ -0,0 +1,65 @@
+# nasa_api/views_export.py
+"""
+Streaming bulk export views
+"""
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework import status, permissions
+import logging
+
+from .exports import (
+    EXPORT_DATASETS, EXPORT_FORMATS, DEFAULT_CHUNK_SIZE, stream_export, export_filename
+)
+
+logger = logging.getLogger(__name__)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def export_datasets(request):
+    """List datasets available for bulk export"""
+    return Response({
+        'datasets': {name: dataset.description for name, dataset in EXPORT_DATASETS.items()},
+        'formats': list(EXPORT_FORMATS),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def export_dataset(request, dataset):
+    """Stream a whole dataset as NDJSON or CSV (?fmt=ndjson|csv&gzip=1)"""
+    export = EXPORT_DATASETS.get(dataset)
+    if export is None:
+        return Response(
+            {'error': f'Unknown dataset. Available: {", ".join(EXPORT_DATASETS)}'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    export_format = request.GET.get('fmt', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return Response(
+            {'error': f'Unsupported format. Use one of: {", ".join(EXPORT_FORMATS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    compress = request.GET.get('gzip', '').lower() in ('1', 'true', 'yes')
+    try:
+        chunk_size = min(int(request.GET.get('chunk_size', DEFAULT_CHUNK_SIZE)), 10000)
+    except ValueError:
+        chunk_size = 0
+    if chunk_size < 1:
+        return Response(
+            {'error': 'chunk_size must be a positive integer'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    logger.info(f"Streaming export of {dataset} ({export_format}, gzip={compress}) for {request.user}")
+    response = StreamingHttpResponse(
+        stream_export(export, export_format, compress=compress, chunk_size=chunk_size),
+        content_type='application/gzip' if compress else EXPORT_FORMATS[export_format]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{export_filename(export, export_format, compress)}"'
+    )
+    return response
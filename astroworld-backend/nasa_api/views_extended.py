@@ -6,6 +6,8 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from django.core.cache import cache
+from django.http import FileResponse, HttpResponseNotModified, HttpResponseRedirect, JsonResponse
+from django.views.decorators.http import require_GET
 from django.utils import timezone
 from datetime import timedelta
 import logging
@@ -13,6 +15,13 @@ import logging
 from .services import nasa_image_service, tle_service, gibs_service
 from .models import NASAMediaItem, Satellite
 from .serializers import NASAMediaItemSerializer, SatelliteSerializer
+from .sampling import media_image_sampler
+from .image_proxy import image_proxy_cache, ImageProxyError, PROXY_VARIANTS
+from . import read_through
+from astroworld.versions import aversioned_key, versioned_key
+
+DAY = 86400
+WEEK = 7 * DAY
 
 logger = logging.getLogger(__name__)
 
@@ -39,7 +48,7 @@ def nasa_image_search(request):
         )
     
     # Build cache key
-    cache_key = f"nasa_image_search_{query}_{request.GET.get('media_type', 'all')}_{request.GET.get('page', 1)}"
+    cache_key = versioned_key('nasa_image_search', ['nasa_media'], sorted(request.GET.lists()))
     
     # Check cache
     cached_data = cache.get(cache_key)
@@ -68,22 +77,23 @@ def nasa_image_search(request):
     return Response(result)
 
 
-@api_view(['GET'])
-@permission_classes([permissions.AllowAny])
-def nasa_image_popular(request):
+# Async view: the topic searches run concurrently, so a cold cache costs the
+# slowest search rather than their sum
+@require_GET
+async def nasa_image_popular(request):
     """Get popular/featured NASA images"""
     limit = min(int(request.GET.get('limit', 20)), 100)
     
-    cache_key = f"nasa_image_popular_{limit}"
-    cached_data = cache.get(cache_key)
+    cache_key = await aversioned_key('nasa_image_popular', ['nasa_media'], limit)
+    cached_data = await cache.aget(cache_key)
     
     if cached_data:
-        return Response(cached_data)
+        return JsonResponse(cached_data, safe=False)
     
-    result = nasa_image_service.get_popular_images(limit=limit)
+    result = await nasa_image_service.aget_popular_images(limit=limit)
     
     if not result:
-        return Response(
+        return JsonResponse(
             {'error': 'Failed to fetch popular images'},
             status=status.HTTP_503_SERVICE_UNAVAILABLE
         )
@@ -92,16 +102,41 @@ def nasa_image_popular(request):
     items = result.get('collection', {}).get('items', [])
     
     # Cache for 6 hours
-    cache.set(cache_key, items, 21600)
+    await cache.aset(cache_key, items, 21600)
+    
+    return JsonResponse(items, safe=False)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def nasa_image_random(request):
+    """Get random NASA library images stored locally"""
+    try:
+        count = min(int(request.GET.get('count', 1)), 20)
+    except ValueError:
+        count = 0
+    if count < 1:
+        return Response(
+            {'error': 'count must be a positive integer'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    items = media_image_sampler.sample(count)
+    if not items:
+        return Response(
+            {'error': 'No stored images available'},
+            status=status.HTTP_404_NOT_FOUND
+        )
     
-    return Response(items)
+    serializer = NASAMediaItemSerializer(items, many=True)
+    return Response(serializer.data)
 
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def nasa_image_asset(request, nasa_id):
     """Get asset manifest for a specific media item"""
-    cache_key = f"nasa_asset_{nasa_id}"
+    cache_key = versioned_key('nasa_asset', ['nasa_media'], nasa_id)
     cached_data = cache.get(cache_key)
     
     if cached_data:
@@ -115,8 +150,8 @@ def nasa_image_asset(request, nasa_id):
             status=status.HTTP_404_NOT_FOUND
         )
     
-    # Cache for 24 hours
-    cache.set(cache_key, result, 86400)
+    # Cache for 7 days (manifests of published items don't change)
+    cache.set(cache_key, result, WEEK)
     
     return Response(result)
 
@@ -125,7 +160,7 @@ def nasa_image_asset(request, nasa_id):
 @permission_classes([permissions.AllowAny])
 def nasa_image_metadata(request, nasa_id):
     """Get metadata for a specific media item"""
-    cache_key = f"nasa_metadata_{nasa_id}"
+    cache_key = versioned_key('nasa_metadata', ['nasa_media'], nasa_id)
     cached_data = cache.get(cache_key)
     
     if cached_data:
@@ -139,8 +174,8 @@ def nasa_image_metadata(request, nasa_id):
             status=status.HTTP_404_NOT_FOUND
         )
     
-    # Cache for 24 hours
-    cache.set(cache_key, result, 86400)
+    # Cache for 7 days (metadata of published items doesn't change)
+    cache.set(cache_key, result, WEEK)
     
     return Response(result)
 
@@ -162,7 +197,7 @@ def tle_search(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    cache_key = f"tle_search_{query}"
+    cache_key = versioned_key('tle_search', ['tle'], query)
     cached_data = cache.get(cache_key)
     
     if cached_data:
@@ -186,7 +221,7 @@ def tle_search(request):
 @permission_classes([permissions.AllowAny])
 def tle_by_id(request, satellite_id):
     """Get TLE data for a specific satellite by NORAD ID"""
-    cache_key = f"tle_id_{satellite_id}"
+    cache_key = versioned_key('tle_id', ['tle'], satellite_id)
     cached_data = cache.get(cache_key)
     
     if cached_data:
@@ -206,28 +241,28 @@ def tle_by_id(request, satellite_id):
     return Response(result)
 
 
-@api_view(['GET'])
-@permission_classes([permissions.AllowAny])
-def tle_popular(request):
+# Async view: the satellite searches run concurrently
+@require_GET
+async def tle_popular(request):
     """Get TLE data for popular satellites (ISS, Hubble, etc.)"""
-    cache_key = "tle_popular"
-    cached_data = cache.get(cache_key)
+    cache_key = await aversioned_key('tle_popular', ['tle'])
+    cached_data = await cache.aget(cache_key)
     
     if cached_data:
-        return Response(cached_data)
+        return JsonResponse(cached_data, safe=False)
     
-    result = tle_service.get_popular_satellites()
+    result = await tle_service.aget_popular_satellites()
     
     if not result:
-        return Response(
+        return JsonResponse(
             {'error': 'Failed to fetch popular satellites'},
             status=status.HTTP_503_SERVICE_UNAVAILABLE
         )
     
     # Cache for 6 hours
-    cache.set(cache_key, result, 21600)
+    await cache.aset(cache_key, result, 21600)
     
-    return Response(result)
+    return JsonResponse(result, safe=False)
 
 
 # GIBS (Global Imagery Browse Services) Views
@@ -236,7 +271,7 @@ def tle_popular(request):
 @permission_classes([permissions.AllowAny])
 def gibs_layers(request):
     """Get available GIBS layers"""
-    cache_key = "gibs_layers"
+    cache_key = versioned_key('gibs_layers', ['gibs'])
     cached_data = cache.get(cache_key)
     
     if cached_data:
@@ -244,8 +279,8 @@ def gibs_layers(request):
     
     result = gibs_service.get_available_layers()
     
-    # Cache for 24 hours (layers don't change often)
-    cache.set(cache_key, result, 86400)
+    # Cache for 7 days (layers don't change often)
+    cache.set(cache_key, result, WEEK)
     
     return Response(result)
 
@@ -254,7 +289,7 @@ def gibs_layers(request):
 @permission_classes([permissions.AllowAny])
 def gibs_latest(request, layer_id):
     """Get latest imagery for a specific layer"""
-    cache_key = f"gibs_latest_{layer_id}"
+    cache_key = versioned_key('gibs_latest', ['gibs'], layer_id)
     cached_data = cache.get(cache_key)
     
     if cached_data:
@@ -377,7 +412,7 @@ def gibs_imagery(request):
     width = int(request.GET.get('width', 512))
     height = int(request.GET.get('height', 512))
     
-    cache_key = f"gibs_imagery_{layer}_{date}_{region}_{format_type}_{width}_{height}"
+    cache_key = versioned_key('gibs_imagery', ['gibs'], layer, date, region, format_type, width, height)
     cached_data = cache.get(cache_key)
     
     if cached_data:
@@ -400,8 +435,8 @@ def gibs_imagery(request):
                 status=status.HTTP_503_SERVICE_UNAVAILABLE
             )
         
-        # Cache for 1 hour (imagery data doesn't change often)
-        cache.set(cache_key, result, 3600)
+        # Cache for 24 hours (imagery of a past date doesn't change)
+        cache.set(cache_key, result, DAY)
         
         return Response(result)
         
@@ -418,31 +453,31 @@ def gibs_imagery(request):
 @permission_classes([permissions.AllowAny])
 def nasa_apod(request):
     """Get Astronomy Picture of the Day"""
+    from .services import apod_service
+    from datetime import datetime
+    
     date_param = request.GET.get('date')
     count = request.GET.get('count')
     
-    cache_key = f"nasa_apod_{date_param or 'today'}_{count or '1'}"
+    try:
+        date_obj = datetime.strptime(date_param, '%Y-%m-%d').date() if date_param else None
+    except ValueError:
+        return Response(
+            {'error': 'Invalid date format. Use YYYY-MM-DD'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    cache_key = versioned_key('nasa_apod', ['apod'], date_obj or timezone.now().date(), count)
     cached_data = cache.get(cache_key)
     
     if cached_data:
         return Response(cached_data)
     
-    from .services import apod_service
-    from datetime import datetime
-    
-    if date_param:
-        try:
-            date_obj = datetime.strptime(date_param, '%Y-%m-%d')
-            result = apod_service.fetch_apod(date=date_obj)
-        except ValueError:
-            return Response(
-                {'error': 'Invalid date format. Use YYYY-MM-DD'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-    elif count:
+    if count:
         result = apod_service.fetch_apod(count=int(count))
     else:
-        result = apod_service.fetch_apod()
+        # Served from the APOD table, stored on first request
+        result = read_through.apod(date_obj)
     
     if not result:
         return Response(
@@ -450,8 +485,8 @@ def nasa_apod(request):
             status=status.HTTP_503_SERVICE_UNAVAILABLE
         )
     
-    # Cache for 12 hours
-    cache.set(cache_key, result, 43200)
+    # Cache for 7 days; random picks (count) for 12 hours
+    cache.set(cache_key, result, 43200 if count else WEEK)
     
     return Response(result)
 
@@ -466,30 +501,39 @@ def nasa_neo_feed(request):
     start_date = request.GET.get('start_date')
     end_date = request.GET.get('end_date')
     
-    cache_key = f"nasa_neo_{start_date or 'today'}_{end_date or 'week'}"
-    cached_data = cache.get(cache_key)
-    
-    if cached_data:
-        return Response(cached_data)
-    
     try:
-        start = datetime.strptime(start_date, '%Y-%m-%d') if start_date else None
-        end = datetime.strptime(end_date, '%Y-%m-%d') if end_date else None
-        result = neo_service.fetch_neo_feed(start, end)
+        start = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else timezone.now().date()
+        end = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else start + timedelta(days=7)
     except ValueError:
         return Response(
             {'error': 'Invalid date format. Use YYYY-MM-DD'},
             status=status.HTTP_400_BAD_REQUEST
         )
     
+    # Same limit as the upstream feed, so one request never fans out into many upstream calls
+    if end < start or (end - start).days > read_through.NEO_FEED_MAX_DAYS:
+        return Response(
+            {'error': f'end_date must be within {read_through.NEO_FEED_MAX_DAYS} days after start_date'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    cache_key = versioned_key('nasa_neo', ['neo'], start, end)
+    cached_data = cache.get(cache_key)
+    
+    if cached_data:
+        return Response(cached_data)
+    
+    # Only days missing locally are fetched upstream
+    result = read_through.neo_feed(start, end) or neo_service.fetch_neo_feed(start, end)
+    
     if not result:
         return Response(
             {'error': 'Failed to fetch NEO data'},
             status=status.HTTP_503_SERVICE_UNAVAILABLE
         )
     
-    # Cache for 6 hours
-    cache.set(cache_key, result, 21600)
+    # Cache for 24 hours
+    cache.set(cache_key, result, DAY)
     
     return Response(result)
 
@@ -499,26 +543,45 @@ def nasa_neo_feed(request):
 def nasa_mars_photos(request):
     """Get Mars Rover photos"""
     from .services import mars_rover_service
+    from datetime import datetime
     
     rover = request.GET.get('rover', 'curiosity')
     sol = request.GET.get('sol')
     earth_date = request.GET.get('earth_date')
     camera = request.GET.get('camera')
-    page = int(request.GET.get('page', 1))
+    try:
+        page = int(request.GET.get('page', 1))
+        if page < 1:
+            raise ValueError
+    except ValueError:
+        return Response({'error': 'page must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
     
-    cache_key = f"nasa_mars_{rover}_{sol or earth_date or 'latest'}_{camera or 'all'}_{page}"
+    cache_key = versioned_key('nasa_mars', ['mars_photos'], rover, sol, earth_date, camera, page)
     cached_data = cache.get(cache_key)
     
     if cached_data:
         return Response(cached_data)
     
-    result = mars_rover_service.fetch_rover_photos(
-        rover=rover,
-        sol=int(sol) if sol else None,
-        earth_date=earth_date,
-        camera=camera,
-        page=page
+    try:
+        sol = int(sol) if sol else None
+        earth_date_obj = datetime.strptime(earth_date, '%Y-%m-%d').date() if earth_date else None
+    except ValueError:
+        return Response(
+            {'error': 'Invalid sol or earth_date. Use an integer sol or YYYY-MM-DD'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    result = read_through.mars_photos(
+        rover.lower(), sol=sol, earth_date=earth_date_obj, camera=camera, page=page
     )
+    if result is None:
+        result = mars_rover_service.fetch_rover_photos(
+            rover=rover,
+            sol=sol,
+            earth_date=earth_date,
+            camera=camera,
+            page=page
+        )
     
     if not result:
         return Response(
@@ -526,8 +589,8 @@ def nasa_mars_photos(request):
             status=status.HTTP_503_SERVICE_UNAVAILABLE
         )
     
-    # Cache for 12 hours
-    cache.set(cache_key, result, 43200)
+    # Cache for 24 hours
+    cache.set(cache_key, result, DAY)
     
     return Response(result)
 
@@ -542,7 +605,7 @@ def nasa_epic(request):
     date_param = request.GET.get('date')
     available_dates = request.GET.get('available_dates', 'false').lower() == 'true'
     
-    cache_key = f"nasa_epic_{date_param or 'recent'}_{available_dates}"
+    cache_key = versioned_key('nasa_epic', ['epic'], date_param, available_dates)
     cached_data = cache.get(cache_key)
     
     if cached_data:
@@ -552,13 +615,15 @@ def nasa_epic(request):
         result = epic_service.fetch_epic_images(available_dates=True)
     else:
         try:
-            date_obj = datetime.strptime(date_param, '%Y-%m-%d') if date_param else None
-            result = epic_service.fetch_epic_images(date=date_obj)
+            date_obj = datetime.strptime(date_param, '%Y-%m-%d').date() if date_param else None
         except ValueError:
             return Response(
                 {'error': 'Invalid date format. Use YYYY-MM-DD'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        result = read_through.epic(date_obj)
+        if result is None:
+            result = epic_service.fetch_epic_images(date=date_obj)
     
     if not result:
         return Response(
@@ -566,8 +631,8 @@ def nasa_epic(request):
             status=status.HTTP_503_SERVICE_UNAVAILABLE
         )
     
-    # Cache for 12 hours
-    cache.set(cache_key, result, 43200)
+    # Cache for 7 days for a given date, 12 hours for the latest images
+    cache.set(cache_key, result, WEEK if date_param else 43200)
     
     return Response(result)
 
@@ -583,22 +648,32 @@ def nasa_donki(request):
     end_date = request.GET.get('end_date')
     event_type = request.GET.get('type')
     
-    cache_key = f"nasa_donki_{start_date or 'month'}_{event_type or 'all'}"
-    cached_data = cache.get(cache_key)
-    
-    if cached_data:
-        return Response(cached_data)
-    
     try:
         start = datetime.strptime(start_date, '%Y-%m-%d') if start_date else None
         end = datetime.strptime(end_date, '%Y-%m-%d') if end_date else None
-        result = space_weather_service.fetch_space_weather_events(start, end, event_type)
     except ValueError:
         return Response(
             {'error': 'Invalid date format. Use YYYY-MM-DD'},
             status=status.HTTP_400_BAD_REQUEST
         )
     
+    end_day = (end or timezone.now()).date()
+    start_day = start.date() if start else end_day - timedelta(days=30)
+    
+    cache_key = versioned_key('nasa_donki', ['space_weather'], start_day, end_day, event_type)
+    cached_data = cache.get(cache_key)
+    
+    if cached_data:
+        return Response(cached_data)
+    
+    if event_type is None or event_type in space_weather_service.DONKI_ENDPOINTS:
+        transformed_events = read_through.donki(start_day, end_day, event_type)
+        if transformed_events is not None:
+            # Cache for 24 hours
+            cache.set(cache_key, transformed_events, DAY)
+            return Response(transformed_events)
+    
+    result = space_weather_service.fetch_space_weather_events(start, end, event_type)
     if not result:
         return Response(
             {'error': 'Failed to fetch DONKI data'},
@@ -642,7 +717,7 @@ def nasa_exoplanets_count(request):
     """Get count of confirmed exoplanets"""
     from .services import exoplanet_service
     
-    cache_key = "nasa_exoplanets_count"
+    cache_key = versioned_key('nasa_exoplanets_count', ['exoplanets'])
     cached_data = cache.get(cache_key)
     
     if cached_data:
@@ -650,10 +725,9 @@ def nasa_exoplanets_count(request):
     
     # Simple count query
     query = "SELECT count(*) as count FROM ps"
-    import requests
     
     try:
-        response = requests.get(
+        response = exoplanet_service.session.get(
             "https://exoplanetarchive.ipac.caltech.edu/TAP/sync",
             params={'query': query, 'format': 'json'},
             timeout=30
@@ -668,7 +742,53 @@ def nasa_exoplanets_count(request):
             status=status.HTTP_503_SERVICE_UNAVAILABLE
         )
     
-    # Cache for 24 hours
-    cache.set(cache_key, result, 86400)
+    # Cache for 7 days (exoplanet syncs invalidate it)
+    cache.set(cache_key, result, WEEK)
     
     return Response(result)
+
+
+# Image proxy
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def image_proxy(request):
+    """
+    Serve a resized, disk-cached copy of an upstream image
+    Query params:
+    - url: upstream image URL (required, must be on an allowed host)
+    - size: thumb or medium (default: thumb)
+    """
+    url = image_proxy_cache.normalize(request.GET.get('url', ''))
+    size = request.GET.get('size', 'thumb')
+    
+    if size not in PROXY_VARIANTS:
+        return Response(
+            {'error': f'size must be one of: {", ".join(PROXY_VARIANTS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if not image_proxy_cache.is_allowed(url):
+        return Response(
+            {'error': 'url must be an https image on an allowed host'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        cached = image_proxy_cache.get(url, size)
+    except ImageProxyError as e:
+        logger.warning(str(e))
+        # Let the browser load the original instead of showing a broken image
+        return HttpResponseRedirect(url)
+    
+    if cached['etag'] in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        try:
+            response = FileResponse(open(cached['path'], 'rb'), content_type='image/webp')
+        except FileNotFoundError:
+            # Evicted between lookup and open
+            return HttpResponseRedirect(url)
+    response['ETag'] = cached['etag']
+    # Cache for 30 days
+    response['Cache-Control'] = 'public, max-age=2592000'
+    return response
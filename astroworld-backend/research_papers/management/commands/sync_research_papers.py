@@ -4,6 +4,7 @@ Usage: python manage.py sync_research_papers
 """
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from astroworld.versions import bump
 from research_papers.services import PaperFetchService
 from users.models import ResearchPaper
 
@@ -71,6 +72,9 @@ class Command(BaseCommand):
                 error_count += 1
                 self.stdout.write(self.style.ERROR(f'Error saving paper {paper_data.get("paper_id")}: {e}'))
         
+        if created_count or updated_count:
+            bump('research_papers')
+        
         self.stdout.write(self.style.SUCCESS(
             f'\nSync complete!\n'
             f'Created: {created_count}\n'
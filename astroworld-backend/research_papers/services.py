@@ -2,15 +2,18 @@
 Research Paper API Integration Service
 Fetches papers from NASA ADS, arXiv, and Crossref APIs
 """
-import requests
 from datetime import datetime, timedelta
 from django.conf import settings
 from django.utils import timezone
 from typing import List, Dict, Optional
 import logging
 
+from astroworld.upstream import UpstreamSession
+
 logger = logging.getLogger(__name__)
 
+session = UpstreamSession()
+
 
 class PaperFetchService:
     """Service for fetching astronomical research papers from multiple sources"""
@@ -46,7 +49,7 @@ class PaperFetchService:
                 'sortOrder': 'descending'
             }
             
-            response = requests.get(cls.ARXIV_BASE_URL, params=params, timeout=30)
+            response = session.get(cls.ARXIV_BASE_URL, params=params, timeout=30)
             response.raise_for_status()
             
             # Parse XML response
@@ -146,7 +149,7 @@ class PaperFetchService:
                 'fl': 'bibcode,title,author,abstract,pubdate,doi,pub,citation_count'
             }
             
-            response = requests.get(cls.ADS_BASE_URL, headers=headers, params=params, timeout=30)
+            response = session.get(cls.ADS_BASE_URL, headers=headers, params=params, timeout=30)
             response.raise_for_status()
             
             data = response.json()
@@ -216,7 +219,7 @@ class PaperFetchService:
                 'order': 'desc'
             }
             
-            response = requests.get(cls.CROSSREF_BASE_URL, params=params, timeout=30)
+            response = session.get(cls.CROSSREF_BASE_URL, params=params, timeout=30)
             response.raise_for_status()
             
             data = response.json()
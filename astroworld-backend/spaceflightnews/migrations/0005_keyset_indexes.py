@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spaceflightnews', '0004_alter_spaceflightnews_image_url'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='spaceflightnews',
+            index=models.Index(fields=['-published_at', 'id'], name='news_published_keyset_idx'),
+        ),
+    ]
@@ -24,6 +24,10 @@ class SpaceflightNews(BaseNASAModel):
         verbose_name = "Spaceflight News"
         verbose_name_plural = "Spaceflight News"
         ordering = ['-published_at']
+        indexes = [
+            # Keyset pagination order (-published_at, id)
+            models.Index(fields=['-published_at', 'id'], name='news_published_keyset_idx'),
+        ]
 
     def get_authors(self):
         """Get NewsAuthor objects for this article"""
@@ -5,6 +5,8 @@ from datetime import datetime, timedelta
 from django.conf import settings
 from django.utils import timezone
 from django.core.cache import cache
+from astroworld.upstream import NotModified, UpstreamSession
+from nasa_api.sync import track_sync
 from typing import Optional, Dict, List, Any
 import time 
 from spaceflightnews.models import SpaceflightNews, NewsAuthor
@@ -16,7 +18,7 @@ class SpaceflightNewsService:
     
     def __init__(self):
         self.base_url = "https://api.spaceflightnewsapi.net/v4"
-        self.session = requests.Session()
+        self.session = UpstreamSession()
     
     def fetch_articles(self, limit: int = 100, offset: int = 0, 
                       news_site: str = None, search: str = None,
@@ -71,6 +73,7 @@ class SpaceflightNewsService:
             logger.error(f"Spaceflight News API request failed for {endpoint}: {str(e)}")
             return None
     
+    @track_sync('spaceflight_news')
     def sync_news_data(self, days_back: int = 7, article_types: List[str] = None) -> Dict:
         """Sync spaceflight news data"""
         if article_types is None:
@@ -80,26 +83,34 @@ class SpaceflightNewsService:
         end_date = timezone.now()
         start_date = end_date - timedelta(days=days_back)
         
-        start_date_str = start_date.strftime('%Y-%m-%dT%H:%M:%S')
-        end_date_str = end_date.strftime('%Y-%m-%dT%H:%M:%S')
+        # Day granularity keeps the query stable between polls, so conditional
+        # requests can match the stored validators
+        start_date_str = start_date.strftime('%Y-%m-%dT00:00:00')
         
         for article_type in article_types:
             synced_counts[article_type] = 0
             
+            if article_type not in ['articles', 'blogs', 'reports']:
+                continue
+            params = {'limit': 100, 'offset': 0}
             if article_type == 'articles':
-                data = self.fetch_articles(
-                    limit=100, 
-                    published_at_gte=start_date_str,
-                    published_at_lte=end_date_str
+                params['published_at_gte'] = start_date_str
+            
+            try:
+                response, remember = self.session.get_if_modified(
+                    f"{self.base_url}/{article_type}/", params=params, timeout=30
                 )
-            elif article_type == 'blogs':
-                data = self.fetch_blogs(limit=100)
-            elif article_type == 'reports':
-                data = self.fetch_reports(limit=100)
-            else:
+                response.raise_for_status()
+                data = response.json()
+            except NotModified:
+                logger.info(f"Spaceflight News {article_type} unchanged since last sync")
+                continue
+            except (requests.exceptions.RequestException, ValueError) as e:
+                logger.error(f"Spaceflight News API request failed for {article_type}: {str(e)}")
                 continue
                 
             if data and 'results' in data:
+                errors = 0
                 for item in data['results']:
                     # Filter by date for blogs and reports
                     if article_type in ['blogs', 'reports']:
@@ -149,6 +160,10 @@ class SpaceflightNewsService:
                             
                     except Exception as e:
                         logger.error(f"Error saving {article_type} item {item.get('id', 'unknown')}: {str(e)}")
+                        errors += 1
+                # Keep the old validators after item errors so the next sync retries the listing
+                if not errors:
+                    remember()
         
         return synced_counts
 
@@ -1,11 +1,12 @@
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination as StandardPagination
 from django.db.models import Q
+from astroworld.response_cache import cache_response
 from .models import SpaceflightNews, UserNewsPreference
 from .serializers import SpaceflightNewsSerializer, UserNewsPreferenceSerializer
-from .services import spaceflight_news_service
+from nasa_api.jobs import run_or_enqueue
+from nasa_api.pagination import PublishedKeysetPagination
 
 
 
@@ -13,11 +14,11 @@ from .services import spaceflight_news_service
 class SpaceflightNewsListView(generics.ListAPIView):
     """List Spaceflight News"""
     serializer_class = SpaceflightNewsSerializer
-    pagination_class = StandardPagination
+    pagination_class = PublishedKeysetPagination
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     
     def get_queryset(self):
-        queryset = SpaceflightNews.objects.all().order_by('-published_at')
+        queryset = SpaceflightNews.objects.all().order_by('-published_at', 'id')
         
         # Filters
         article_type = self.request.query_params.get('type')
@@ -70,6 +71,7 @@ def get_featured_news(request):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticatedOrReadOnly])
+@cache_response(['spaceflight_news', 'spaceflight_news_content'])
 def get_news_sites(request):
     """Get available news sites"""
     sites = SpaceflightNews.objects.values_list('news_site', flat=True).distinct()
@@ -112,7 +114,13 @@ def sync_spaceflight_news(request):
     article_types = request.data.get('types', ['articles', 'blogs', 'reports'])
     
     try:
-        results = spaceflight_news_service.sync_news_data(days_back, article_types)
+        results, jobs = run_or_enqueue([(
+            'news', 'spaceflightnews.services.spaceflight_news_service.sync_news_data',
+            {'days_back': days_back, 'article_types': article_types}
+        )])
+        if jobs:
+            return Response({'message': 'Sync queued', 'jobs': jobs}, status=status.HTTP_202_ACCEPTED)
+        results = results['news']
         return Response({
             'message': 'Sync completed',
             'results': results
@@ -71,7 +71,7 @@ class UserSavedSpaceXItemAdmin(admin.ModelAdmin):
 
 @admin.register(UserTrackedSpaceXLaunch)
 class UserTrackedSpaceXLaunchAdmin(admin.ModelAdmin):
-    list_display = ('user', 'launch', 'notification_enabled', 'notify_before_hours', 'created_at')
+    list_display = ('user', 'launch', 'notification_enabled', 'notify_before_hours', 'notify_at', 'notified_at', 'created_at')
     list_filter = ('notification_enabled', 'notify_before_hours', 'created_at')
     search_fields = ('user__username', 'launch__mission_name')
-    readonly_fields = ('created_at',)
+    readonly_fields = ('created_at', 'notify_at', 'notified_at')
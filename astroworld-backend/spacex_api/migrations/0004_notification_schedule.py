@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-19 07:10
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def schedule_tracked_launches(apps, schema_editor):
+    """Set notify_at of trackers of upcoming launches"""
+    UserTrackedSpaceXLaunch = apps.get_model('spacex_api', 'UserTrackedSpaceXLaunch')
+    pending = UserTrackedSpaceXLaunch.objects.filter(
+        notification_enabled=True,
+        launch__upcoming=True,
+        launch__launch_date_utc__gt=timezone.now(),
+    ).select_related('launch')
+    changed = []
+    for tracked in pending.iterator(chunk_size=500):
+        tracked.notify_at = tracked.launch.launch_date_utc - timedelta(hours=tracked.notify_before_hours)
+        changed.append(tracked)
+    UserTrackedSpaceXLaunch.objects.bulk_update(changed, ['notify_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spacex_api', '0003_source_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usertrackedspacexlaunch',
+            name='notified_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='usertrackedspacexlaunch',
+            name='notify_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(schedule_tracked_launches, migrations.RunPython.noop),
+    ]
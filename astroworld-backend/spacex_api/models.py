@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from datetime import timedelta
 import json
 
 User = get_user_model()
@@ -7,6 +9,7 @@ User = get_user_model()
 class SpaceXRocket(models.Model):
     """SpaceX Rocket information"""
     spacex_id = models.CharField(max_length=50, unique=True)
+    source_hash = models.CharField(max_length=64, blank=True)  # Hash of the synced fields, to skip unchanged rows
     name = models.CharField(max_length=200)
     type = models.CharField(max_length=100, blank=True)
     active = models.BooleanField(default=True)
@@ -46,6 +49,7 @@ class SpaceXRocket(models.Model):
 class SpaceXLaunchpad(models.Model):
     """SpaceX Launch pads"""
     spacex_id = models.CharField(max_length=50, unique=True)
+    source_hash = models.CharField(max_length=64, blank=True)  # Hash of the synced fields, to skip unchanged rows
     name = models.CharField(max_length=200)
     full_name = models.CharField(max_length=500, blank=True)
     locality = models.CharField(max_length=200, blank=True)
@@ -73,6 +77,7 @@ class SpaceXLaunch(models.Model):
     ]
     
     spacex_id = models.CharField(max_length=50, unique=True)
+    source_hash = models.CharField(max_length=64, blank=True)  # Hash of the synced fields, to skip unchanged rows
     flight_number = models.IntegerField(null=True, blank=True)
     mission_name = models.CharField(max_length=200)
     mission_id = models.JSONField(default=list, blank=True)
@@ -133,6 +138,7 @@ class SpaceXLaunch(models.Model):
 class SpaceXHistoricalEvent(models.Model):
     """SpaceX Historical Events and Milestones"""
     spacex_id = models.CharField(max_length=50, unique=True)
+    source_hash = models.CharField(max_length=64, blank=True)  # Hash of the synced fields, to skip unchanged rows
     title = models.CharField(max_length=300)
     event_date_utc = models.DateTimeField()
     event_date_unix = models.BigIntegerField(null=True, blank=True)
@@ -154,6 +160,7 @@ class SpaceXHistoricalEvent(models.Model):
 class SpaceXMission(models.Model):
     """SpaceX Mission information"""
     spacex_id = models.CharField(max_length=50, unique=True)
+    source_hash = models.CharField(max_length=64, blank=True)  # Hash of the synced fields, to skip unchanged rows
     mission_name = models.CharField(max_length=200)
     mission_id = models.CharField(max_length=100, blank=True)
     manufacturers = models.JSONField(default=list, blank=True)
@@ -174,6 +181,7 @@ class SpaceXMission(models.Model):
 class SpaceXStarlink(models.Model):
     """SpaceX Starlink Satellite information"""
     spacex_id = models.CharField(max_length=50, unique=True)
+    source_hash = models.CharField(max_length=64, blank=True)  # Hash of the synced fields, to skip unchanged rows
     version = models.CharField(max_length=50, blank=True)
     launch = models.CharField(max_length=100, blank=True)
     longitude = models.FloatField(null=True, blank=True)
@@ -190,6 +198,7 @@ class SpaceXStarlink(models.Model):
 class SpaceXCore(models.Model):
     """SpaceX Core (booster) information"""
     spacex_id = models.CharField(max_length=50, unique=True)
+    source_hash = models.CharField(max_length=64, blank=True)  # Hash of the synced fields, to skip unchanged rows
     serial = models.CharField(max_length=100, blank=True)
     block = models.IntegerField(null=True, blank=True)
     status = models.CharField(max_length=50, blank=True)
@@ -210,6 +219,7 @@ class SpaceXCore(models.Model):
 class SpaceXCapsule(models.Model):
     """SpaceX Capsule information"""
     spacex_id = models.CharField(max_length=50, unique=True)
+    source_hash = models.CharField(max_length=64, blank=True)  # Hash of the synced fields, to skip unchanged rows
     serial = models.CharField(max_length=100, blank=True)
     status = models.CharField(max_length=50, blank=True)
     type = models.CharField(max_length=100, blank=True)
@@ -259,9 +269,29 @@ class UserTrackedSpaceXLaunch(models.Model):
     notification_enabled = models.BooleanField(default=True)
     notify_before_hours = models.IntegerField(default=24)  # Notify X hours before launch
     created_at = models.DateTimeField(auto_now_add=True)
+    # When the pending notification is due; None once sent or when none is pending
+    notify_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    notified_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         unique_together = ('user', 'launch')
     
     def __str__(self):
         return f"{self.user.username} tracking {self.launch.mission_name}"
+    
+    def schedule_notification(self):
+        """Set notify_at from the launch date, unless already notified for it"""
+        launch_date = self.launch.launch_date_utc if self.launch.upcoming else None
+        due = launch_date - timedelta(hours=self.notify_before_hours) if launch_date else None
+        pending = (
+            due is not None and launch_date > timezone.now() and self.notification_enabled
+            and (self.notified_at is None or self.notified_at < due)
+        )
+        self.notify_at = due if pending else None
+    
+    def save(self, *args, **kwargs):
+        self.schedule_notification()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'notify_at' not in update_fields:
+            kwargs['update_fields'] = list(update_fields) + ['notify_at']
+        super().save(*args, **kwargs)
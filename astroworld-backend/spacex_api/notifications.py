@@ -0,0 +1,66 @@
+"""
+Launch reminders for users tracking SpaceX launches, dispatched by
+``users.notifications`` from the indexed ``notify_at`` column.
+"""
+import logging
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+
+from users.notifications import PendingNotification
+
+from .models import UserTrackedSpaceXLaunch
+
+logger = logging.getLogger(__name__)
+
+
+def reschedule_launch_notifications(spacex_ids: Iterable[str]) -> int:
+    """Recompute notify_at of the trackers of launches whose date or status moved"""
+    changed = []
+    trackers = UserTrackedSpaceXLaunch.objects.filter(
+        launch__spacex_id__in=list(spacex_ids)
+    ).select_related('launch')
+    # Already notified rows included: a launch that slipped is due again
+    for tracked in trackers.iterator(chunk_size=500):
+        scheduled = tracked.notify_at
+        tracked.schedule_notification()
+        if tracked.notify_at != scheduled:
+            changed.append(tracked)
+    if changed:
+        UserTrackedSpaceXLaunch.objects.bulk_update(changed, ['notify_at'], batch_size=500)
+        logger.info(f"Rescheduled {len(changed)} launch notifications")
+    return len(changed)
+
+
+class LaunchSource:
+    """Reminders for tracked upcoming launches"""
+
+    channels = ['email', 'in_app']
+
+    def due(self, now: datetime):
+        return UserTrackedSpaceXLaunch.objects.filter(notify_at__lte=now).select_related('user', 'launch')
+
+    def build(self, tracked: UserTrackedSpaceXLaunch, now: datetime) -> Optional[PendingNotification]:
+        launch = tracked.launch
+        if not tracked.notification_enabled or not launch.upcoming or not launch.launch_date_utc:
+            return None
+        if launch.launch_date_utc <= now:
+            return None  # Launched (or slipped into the past) before we got to it
+        hours = max(int((launch.launch_date_utc - now).total_seconds() // 3600), 1)
+        return PendingNotification(
+            user=tracked.user,
+            title=f"SpaceX launch: {launch.mission_name}",
+            message=(
+                f"{launch.mission_name} is scheduled to launch on "
+                f"{launch.launch_date_utc:%B %d, %Y at %H:%M} UTC, in about {hours} hours."
+            ),
+            link=f"{settings.FRONTEND_URL}/spacex",
+            channels=list(self.channels),
+        )
+
+    def mark_done(self, ids: List[int], now: datetime):
+        UserTrackedSpaceXLaunch.objects.filter(pk__in=ids).update(notify_at=None, notified_at=now)
+
+    def defer(self, ids: List[int], until: datetime):
+        UserTrackedSpaceXLaunch.objects.filter(pk__in=ids).update(notify_at=until)
@@ -107,4 +107,4 @@ class UserTrackedSpaceXLaunchSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserTrackedSpaceXLaunch
         fields = '__all__'
-        read_only_fields = ('user',)
\ No newline at end of file
+        read_only_fields = ('user', 'notify_at', 'notified_at')
\ No newline at end of file
@@ -1,10 +1,10 @@
 from celery import shared_task
-from django.utils import timezone
-from datetime import timedelta
 import logging
 
+from users.notifications import dispatch_due_notifications
+
 from .services import SpaceXDataSyncService
-from .models import SpaceXLaunch, UserTrackedSpaceXLaunch
+from .models import SpaceXLaunch
 
 logger = logging.getLogger(__name__)
 
@@ -120,34 +120,10 @@ def sync_all_spacex_data(self, starlink_limit=500):
 
 @shared_task
 def send_launch_notifications():
-    """Send notifications for upcoming SpaceX launches"""
+    """Send notifications for upcoming SpaceX launches that are due"""
     try:
-        now = timezone.now()
-        
-        # Get all tracked launches that are within notification window
-        tracked_launches = UserTrackedSpaceXLaunch.objects.filter(
-            notification_enabled=True,
-            launch__upcoming=True,
-            launch__launch_date_utc__isnull=False
-        )
-        
-        notifications_sent = 0
-        
-        for tracked in tracked_launches:
-            launch = tracked.launch
-            notify_time = launch.launch_date_utc - timedelta(hours=tracked.notify_before_hours)
-            
-            # Check if it's time to send notification
-            if now >= notify_time and now < launch.launch_date_utc:
-                # Here you would integrate with your notification system
-                # For now, we'll just log it
-                logger.info(
-                    f"Notification for user {tracked.user.username}: "
-                    f"SpaceX launch '{launch.mission_name}' in {tracked.notify_before_hours} hours"
-                )
-                notifications_sent += 1
-        
-        return f"Sent {notifications_sent} launch notifications"
+        results = dispatch_due_notifications(['launches'])['launches']
+        return f"Sent {results['processed'] - results['skipped']} launch notifications: {results['sent']}"
         
     except Exception as exc:
         logger.error(f"Launch notifications failed: {exc}")
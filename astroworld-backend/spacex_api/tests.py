@@ -1,3 +1,52 @@
+from datetime import timedelta
+from unittest import mock
+
 from django.test import TestCase
+from django.utils import timezone
+
+from users.models import User
+
+from .models import SpaceXLaunch, UserTrackedSpaceXLaunch
+from .services import SpaceXDataSyncService
+
+
+class LaunchRescheduleTests(TestCase):
+    """A launch sync moves the reminders of launches whose date changed, and only those"""
+
+    def setUp(self):
+        self.now = timezone.now().replace(microsecond=0)
+        self.user = User.objects.create(username='tracker', email='tracker@example.com')
+        self.service = SpaceXDataSyncService()
+
+    def launch(self, spacex_id, launch_date):
+        return SpaceXLaunch.objects.create(
+            spacex_id=spacex_id, mission_name=spacex_id, launch_date_utc=launch_date, upcoming=True
+        )
+
+    def sync(self, launches):
+        payload = [
+            {'id': launch.spacex_id, 'name': launch.mission_name, 'date_utc': launch_date.isoformat(), 'upcoming': True}
+            for launch, launch_date in launches
+        ]
+        with mock.patch.object(self.service.api_service, 'fetch_launches', return_value=payload):
+            self.service.sync_launches()
+
+    def test_slipped_launch_is_notified_again(self):
+        slipped = self.launch('slipped', self.now + timedelta(hours=20))
+        tracked = UserTrackedSpaceXLaunch.objects.create(user=self.user, launch=slipped, notify_before_hours=24)
+        # Notified for the original date
+        UserTrackedSpaceXLaunch.objects.filter(pk=tracked.pk).update(notify_at=None, notified_at=self.now)
+
+        self.sync([(slipped, self.now + timedelta(days=3))])
+        tracked.refresh_from_db()
+        self.assertEqual(tracked.notify_at, self.now + timedelta(days=2))
+
+    def test_unchanged_launches_are_not_rescheduled(self):
+        steady = self.launch('steady', self.now + timedelta(days=3))
+        tracked = UserTrackedSpaceXLaunch.objects.create(user=self.user, launch=steady, notify_before_hours=24)
+        marker = self.now + timedelta(days=1, minutes=5)
+        UserTrackedSpaceXLaunch.objects.filter(pk=tracked.pk).update(notify_at=marker)
 
-# Create your tests here.
+        self.sync([(steady, steady.launch_date_utc)])
+        tracked.refresh_from_db()
+        self.assertEqual(tracked.notify_at, marker)
@@ -6,6 +6,7 @@ from django.utils import timezone
 from django.db.models import Q
 from datetime import timedelta
 import logging
+from astroworld.response_cache import cache_response
 
 from .models import (
     SpaceXRocket, SpaceXLaunchpad, SpaceXLaunch, SpaceXHistoricalEvent,
@@ -18,10 +19,15 @@ from .serializers import (
     SpaceXCoreSerializer, SpaceXCapsuleSerializer, UserSavedSpaceXItemSerializer,
     UserTrackedSpaceXLaunchSerializer
 )
-from .services import SpaceXDataSyncService
+from nasa_api.jobs import run_or_enqueue
 
 logger = logging.getLogger(__name__)
 
+SPACEX_DATASETS = [
+    'spacex_rockets', 'spacex_launchpads', 'spacex_launches', 'spacex_history',
+    'spacex_missions', 'spacex_starlink', 'spacex_cores', 'spacex_capsules',
+]
+
 class StandardPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = 'page_size'
@@ -33,6 +39,10 @@ class SpaceXRocketListView(generics.ListAPIView):
     queryset = SpaceXRocket.objects.all()
     serializer_class = SpaceXRocketSerializer
     pagination_class = StandardPagination
+    
+    @cache_response(['spacex_rockets'])
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
 class SpaceXRocketDetailView(generics.RetrieveAPIView):
     """Get SpaceX rocket details"""
@@ -322,33 +332,32 @@ def sync_spacex_data(request):
             status=status.HTTP_403_FORBIDDEN
         )
     
-    sync_service = SpaceXDataSyncService()
     data_type = request.data.get('type', 'all')
+    starlink_limit = request.data.get('starlink_limit', 500)
+    
+    # type -> (result name, sync method, kwargs)
+    sync_methods = {
+        'launches': ('launches', 'sync_launches', {}),
+        'upcoming': ('launches', 'sync_launches', {'upcoming_only': True}),
+        'rockets': ('rockets', 'sync_rockets', {}),
+        'launchpads': ('launchpads', 'sync_launchpads', {}),
+        'historical_events': ('historical_events', 'sync_historical_events', {}),
+        'missions': ('missions', 'sync_missions', {}),
+        'starlink': ('starlink', 'sync_starlink', {'limit': starlink_limit}),
+        'cores': ('cores', 'sync_cores', {}),
+        'capsules': ('capsules', 'sync_capsules', {}),
+    }
+    # Sync all data in one call: launches need rockets and launchpads first
+    name, method, kwargs = sync_methods.get(data_type, ('all', 'sync_all', {'starlink_limit': starlink_limit}))
     
     try:
-        if data_type == 'launches':
-            results = {'launches': sync_service.sync_launches()}
-        elif data_type == 'upcoming':
-            results = {'launches': sync_service.sync_launches(upcoming_only=True)}
-        elif data_type == 'rockets':
-            results = {'rockets': sync_service.sync_rockets()}
-        elif data_type == 'launchpads':
-            results = {'launchpads': sync_service.sync_launchpads()}
-        elif data_type == 'historical_events':
-            results = {'historical_events': sync_service.sync_historical_events()}
-        elif data_type == 'missions':
-            results = {'missions': sync_service.sync_missions()}
-        elif data_type == 'starlink':
-            limit = request.data.get('starlink_limit', 500)
-            results = {'starlink': sync_service.sync_starlink(limit=limit)}
-        elif data_type == 'cores':
-            results = {'cores': sync_service.sync_cores()}
-        elif data_type == 'capsules':
-            results = {'capsules': sync_service.sync_capsules()}
-        else:
-            # Sync all data
-            starlink_limit = request.data.get('starlink_limit', 500)
-            results = sync_service.sync_all(starlink_limit=starlink_limit)
+        results, jobs = run_or_enqueue([(name, f'spacex_api.services.spacex_sync_service.{method}', kwargs)])
+        if jobs:
+            return Response(
+                {'message': 'SpaceX data sync queued', 'jobs': jobs},
+                status=status.HTTP_202_ACCEPTED
+            )
+        results = results['all'] if name == 'all' else results
         
         return Response({
             'message': 'SpaceX data sync completed',
@@ -363,6 +372,7 @@ def sync_spacex_data(request):
         )
 
 @api_view(['GET'])
+@cache_response(SPACEX_DATASETS)
 def get_spacex_stats(request):
     """Get SpaceX statistics"""
     stats = {
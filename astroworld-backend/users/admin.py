@@ -5,7 +5,7 @@ from django.urls import reverse
 from django.utils.safestring import mark_safe
 from .models import (
     User, UserContent, UserJournal, UserCollection, UserSubscription, 
-    UserActivity, UserFollower, ResearchPaper, UserPaper, Like, Comment,
+    UserActivity, Notification, UserFollower, ResearchPaper, UserPaper, Like, Comment,
     UserMessage, MessageThread, PasswordResetToken
 )
 
@@ -124,7 +124,7 @@ class UserSubscriptionAdmin(admin.ModelAdmin):
     list_display = ('event_name', 'user', 'subscription_type', 'event_date', 'is_active', 'notify_email', 'notify_in_app')
     list_filter = ('subscription_type', 'is_active', 'notify_email', 'notify_in_app', 'event_date')
     search_fields = ('event_name', 'user__username', 'event_id')
-    readonly_fields = ('created_at', 'last_notified')
+    readonly_fields = ('created_at', 'last_notified', 'notify_at')
     date_hierarchy = 'event_date'
     
     fieldsets = (
@@ -138,11 +138,20 @@ class UserSubscriptionAdmin(admin.ModelAdmin):
             'fields': ('is_active', 'notes')
         }),
         ('Tracking', {
-            'fields': ('created_at', 'last_notified')
+            'fields': ('created_at', 'last_notified', 'notify_at')
         })
     )
 
 
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('title', 'user', 'created_at', 'read_at')
+    list_filter = ('created_at', 'read_at')
+    search_fields = ('title', 'message', 'user__username')
+    readonly_fields = ('created_at',)
+    date_hierarchy = 'created_at'
+
+
 @admin.register(UserActivity)
 class UserActivityAdmin(admin.ModelAdmin):
     list_display = ('user', 'activity_type', 'description', 'created_at')
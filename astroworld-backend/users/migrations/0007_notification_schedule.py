@@ -0,0 +1,58 @@
+# Generated by Django 5.2.6 on 2026-10-19 07:10
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q
+from django.utils import timezone
+
+
+def schedule_subscriptions(apps, schema_editor):
+    """Set notify_at of active subscriptions to upcoming events"""
+    UserSubscription = apps.get_model('users', 'UserSubscription')
+    pending = UserSubscription.objects.filter(
+        Q(notify_email=True) | Q(notify_in_app=True),
+        is_active=True,
+        event_date__gt=timezone.now(),
+        last_notified__isnull=True,
+    )
+    changed = []
+    for subscription in pending.iterator(chunk_size=500):
+        subscription.notify_at = subscription.event_date - timedelta(hours=subscription.notify_before)
+        changed.append(subscription)
+    UserSubscription.objects.bulk_update(changed, ['notify_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_passwordresettoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersubscription',
+            name='notify_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('message', models.TextField()),
+                ('link', models.CharField(blank=True, max_length=500)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'user_notifications',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', 'read_at'], name='user_notifi_user_id_c5f7fb_idx')],
+            },
+        ),
+        migrations.RunPython(schedule_subscriptions, migrations.RunPython.noop),
+    ]
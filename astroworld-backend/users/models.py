@@ -240,6 +240,8 @@ class UserSubscription(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     last_notified = models.DateTimeField(null=True, blank=True)
+    # When the pending notification is due; None once sent or when none is pending
+    notify_at = models.DateTimeField(null=True, blank=True, db_index=True)
     
     class Meta:
         db_table = 'user_subscriptions'
@@ -252,6 +254,23 @@ class UserSubscription(models.Model):
     
     def __str__(self):
         return f"{self.user.username} - {self.event_name}"
+    
+    def schedule_notification(self):
+        """Set notify_at from the event date, unless already notified for it"""
+        due = self.event_date - timedelta(hours=self.notify_before) if self.event_date else None
+        pending = (
+            due is not None and self.event_date > timezone.now()
+            and self.is_active and (self.notify_email or self.notify_in_app)
+            and (self.last_notified is None or self.last_notified < due)
+        )
+        self.notify_at = due if pending else None
+    
+    def save(self, *args, **kwargs):
+        self.schedule_notification()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'notify_at' not in update_fields:
+            kwargs['update_fields'] = list(update_fields) + ['notify_at']
+        super().save(*args, **kwargs)
 
 
 class UserActivity(models.Model):
@@ -287,6 +306,29 @@ class UserActivity(models.Model):
         return f"{self.user.username} - {self.activity_type}"
 
 
+class Notification(models.Model):
+    """
+    In-app notification shown in the user's notification feed.
+    Created by the in-app channel of users.notifications.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    link = models.CharField(max_length=500, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'user_notifications'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'read_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.title}"
+
+
 # =====================================================
 # EXPLORE PAGE MODELS (Social + Research Papers)
 # =====================================================
@@ -0,0 +1,226 @@
+"""
+Due-time notification dispatcher.
+
+Rows that can trigger a notification (event subscriptions, tracked SpaceX
+launches) store when their next notification is due in an indexed
+``notify_at`` column, computed on save from the event date and the
+notify-before window and cleared once the notification is sent. A run of
+``dispatch_due_notifications`` therefore only reads ``notify_at <= now``
+off the index: its cost follows the number of due notifications, not the
+number of subscriptions.
+
+Each source in ``NOTIFICATION_SOURCES`` turns its due rows into
+``PendingNotification``s, which are handed in batches to the channels in
+``NOTIFICATION_CHANNELS`` (email over one reused connection, in-app rows
+in one insert). Due rows are claimed with ``SELECT ... FOR UPDATE SKIP
+LOCKED`` where the database supports it and deferred by
+``NOTIFICATION_CLAIM_LEASE`` seconds in a short transaction, so concurrent
+runs never notify a row twice and no mail is sent while rows are locked.
+Channels deliver and report each notification separately: a row is marked
+done once any of its channels delivered it, and a row no channel could
+deliver is deferred by ``NOTIFICATION_RETRY_DELAY`` seconds, so one bad
+recipient never holds back the rows behind it.
+"""
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Notification, UserSubscription
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_CLAIM_LEASE = 600  # Seconds before claimed rows of a crashed run are due again
+DEFAULT_RETRY_DELAY = 900  # Seconds before an undeliverable row is tried again
+
+
+@dataclass
+class PendingNotification:
+    user: object
+    title: str
+    message: str
+    link: str = ''
+    channels: List[str] = field(default_factory=list)
+    row_id: Optional[int] = None  # Primary key of the source row
+
+
+class EmailChannel:
+    """Send notifications as emails over one connection per batch"""
+
+    def send(self, notifications: List[PendingNotification]) -> Tuple[int, List[PendingNotification]]:
+        """Returns the number sent and the notifications that failed"""
+        recipients = [notification for notification in notifications if notification.user.email]
+        if not recipients:
+            return 0, []
+        sent, failed = 0, []
+        with get_connection() as mail_connection:
+            for notification in recipients:
+                message = EmailMessage(
+                    subject=notification.title,
+                    body=f"{notification.message}\n\n{notification.link}".strip(),
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[notification.user.email],
+                    connection=mail_connection,
+                )
+                # SMTP raises on the first refused recipient; keep going for the others
+                try:
+                    sent += message.send() or 0
+                except Exception as e:
+                    logger.warning(f"Email to user {notification.user.pk} failed: {str(e)}")
+                    failed.append(notification)
+        return sent, failed
+
+
+class InAppChannel:
+    """Store notifications for the user's in-app feed"""
+
+    def send(self, notifications: List[PendingNotification]) -> Tuple[int, List[PendingNotification]]:
+        """Returns the number stored and the notifications that failed"""
+        try:
+            created = Notification.objects.bulk_create([
+                Notification(
+                    user=notification.user,
+                    title=notification.title,
+                    message=notification.message,
+                    link=notification.link,
+                )
+                for notification in notifications
+            ])
+        except Exception as e:
+            logger.warning(f"Storing {len(notifications)} in-app notifications failed: {str(e)}")
+            return 0, list(notifications)
+        return len(created), []
+
+
+class SubscriptionSource:
+    """Reminders for the events users subscribed to"""
+
+    def due(self, now: datetime):
+        return UserSubscription.objects.filter(notify_at__lte=now).select_related('user')
+
+    def build(self, subscription: UserSubscription, now: datetime) -> Optional[PendingNotification]:
+        if not subscription.is_active or subscription.event_date <= now:
+            return None  # Event already started; nothing to remind about
+        channels = []
+        if subscription.notify_email:
+            channels.append('email')
+        if subscription.notify_in_app:
+            channels.append('in_app')
+        return PendingNotification(
+            user=subscription.user,
+            title=f"Upcoming: {subscription.event_name}",
+            message=(
+                f"{subscription.event_name} ({subscription.get_subscription_type_display()}) "
+                f"starts {subscription.event_date:%B %d, %Y at %H:%M} UTC."
+            ),
+            link=f"{settings.FRONTEND_URL}/dashboard",
+            channels=channels,
+        )
+
+    def mark_done(self, ids: List[int], now: datetime):
+        UserSubscription.objects.filter(pk__in=ids).update(notify_at=None, last_notified=now)
+
+    def defer(self, ids: List[int], until: datetime):
+        UserSubscription.objects.filter(pk__in=ids).update(notify_at=until)
+
+
+def _load(paths: Dict[str, str]) -> Dict[str, object]:
+    return {name: import_string(path)() for name, path in paths.items()}
+
+
+def get_channels() -> Dict[str, object]:
+    return _load(getattr(settings, 'NOTIFICATION_CHANNELS', {
+        'email': 'users.notifications.EmailChannel',
+        'in_app': 'users.notifications.InAppChannel',
+    }))
+
+
+def get_sources(names: Iterable[str] = None) -> Dict[str, object]:
+    sources = getattr(settings, 'NOTIFICATION_SOURCES', {
+        'subscriptions': 'users.notifications.SubscriptionSource',
+    })
+    if names is not None:
+        sources = {name: sources[name] for name in names}
+    return _load(sources)
+
+
+def _claim(source, now: datetime, batch_size: int) -> list:
+    """Take a batch of due rows, moving them out of reach of other runs"""
+    lease = getattr(settings, 'NOTIFICATION_CLAIM_LEASE', DEFAULT_CLAIM_LEASE)
+    with transaction.atomic():
+        queryset = source.due(now).order_by('notify_at', 'pk')
+        if connection.features.has_select_for_update_skip_locked:
+            # Lock only the claimed rows, not the joined users
+            of = ('self',) if connection.features.has_select_for_update_of else ()
+            queryset = queryset.select_for_update(skip_locked=True, of=of)
+        rows = list(queryset[:batch_size])
+        if rows:
+            source.defer([row.pk for row in rows], timezone.now() + timedelta(seconds=lease))
+    return rows
+
+
+def _dispatch_batch(source, channels: Dict[str, object], now: datetime, batch_size: int, results: Dict) -> int:
+    """Claim, send and settle one batch of due rows; returns the rows claimed"""
+    rows = _claim(source, now, batch_size)
+    if not rows:
+        return 0
+
+    done, by_channel = [], defaultdict(list)
+    for row in rows:
+        notification = source.build(row, now)
+        if notification is None:
+            results['skipped'] += 1
+            done.append(row.pk)
+            continue
+        notification.row_id = row.pk
+        for name in notification.channels:
+            by_channel[name].append(notification)
+
+    delivered, failed = set(), set()
+    for name, notifications in by_channel.items():
+        channel = channels.get(name)
+        if channel is None:
+            logger.warning(f"No notification channel '{name}' configured")
+            delivered.update(notification.row_id for notification in notifications)
+            continue
+        sent, failures = channel.send(notifications)
+        results['sent'][name] = results['sent'].get(name, 0) + sent
+        failed_ids = {notification.row_id for notification in failures}
+        failed.update(failed_ids)
+        delivered.update(notification.row_id for notification in notifications if notification.row_id not in failed_ids)
+
+    # Delivered on any channel counts as done; retrying would duplicate the others
+    retry = failed - delivered
+    done.extend(row.pk for row in rows if row.pk not in retry and row.pk not in done)
+    source.mark_done(done, now)
+    if retry:
+        delay = getattr(settings, 'NOTIFICATION_RETRY_DELAY', DEFAULT_RETRY_DELAY)
+        source.defer(list(retry), timezone.now() + timedelta(seconds=delay))
+        results['errors'] += len(retry)
+    results['processed'] += len(rows) - len(retry)
+    return len(rows)
+
+
+def dispatch_due_notifications(sources: Iterable[str] = None, batch_size: int = None) -> Dict:
+    """Send every notification that is due now; returns counts per source"""
+    batch_size = batch_size or getattr(settings, 'NOTIFICATION_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    channels = get_channels()
+    now = timezone.now()
+    summary = {}
+    for name, source in get_sources(sources).items():
+        results = summary[name] = {'processed': 0, 'skipped': 0, 'sent': {}, 'errors': 0}
+        try:
+            while _dispatch_batch(source, channels, now, batch_size, results) == batch_size:
+                pass
+        except Exception as e:
+            logger.error(f"Error dispatching {name} notifications: {str(e)}")
+            results['errors'] += 1
+    return summary
@@ -7,7 +7,7 @@ User = get_user_model()
 # Import models for serializers
 from .models import (
     UserContent, UserJournal, UserCollection, UserSubscription, 
-    UserActivity, UserFollower, ResearchPaper, UserPaper, 
+    UserActivity, Notification, UserFollower, ResearchPaper, UserPaper, 
     Like, Comment, UserMessage, MessageThread
 )
 
@@ -217,9 +217,9 @@ class UserSubscriptionSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'subscription_type', 'event_id', 'event_name', 'event_date',
             'notify_email', 'notify_in_app', 'notify_before', 'notes',
-            'is_active', 'created_at', 'last_notified'
+            'is_active', 'created_at', 'last_notified', 'notify_at'
         ]
-        read_only_fields = ['id', 'created_at', 'last_notified']
+        read_only_fields = ['id', 'created_at', 'last_notified', 'notify_at']
     
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
@@ -235,6 +235,15 @@ class UserActivitySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
+class NotificationSerializer(serializers.ModelSerializer):
+    """Serializer for in-app notifications"""
+    
+    class Meta:
+        model = Notification
+        fields = ['id', 'title', 'message', 'link', 'created_at', 'read_at']
+        read_only_fields = fields
+
+
 class UserProfileSerializer(serializers.ModelSerializer):
     """Complete user profile with stats"""
     saved_content_count = serializers.SerializerMethodField()
@@ -0,0 +1,18 @@
+from celery import shared_task
+import logging
+
+from .notifications import dispatch_due_notifications
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def send_due_notifications():
+    """Send subscription and launch notifications whose notify_at has passed"""
+    try:
+        results = dispatch_due_notifications()
+        logger.info(f"Dispatched due notifications: {results}")
+        return results
+    except Exception as e:
+        logger.error(f"Error in send_due_notifications task: {str(e)}")
+        raise
@@ -1,3 +1,72 @@
-from django.test import TestCase
+import smtplib
+from datetime import timedelta
 
-# Create your tests here.
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import User, UserSubscription
+from .notifications import dispatch_due_notifications
+
+REFUSED_DOMAIN = '@refused.example'
+
+
+class RefusingEmailBackend(locmem.EmailBackend):
+    """Refuses recipients of one domain the way SMTP does"""
+
+    def send_messages(self, messages):
+        for message in messages:
+            refused = [address for address in message.recipients() if address.endswith(REFUSED_DOMAIN)]
+            if refused:
+                raise smtplib.SMTPRecipientsRefused({address: (550, b'No such user') for address in refused})
+        return super().send_messages(messages)
+
+
+@override_settings(
+    EMAIL_BACKEND='users.tests.RefusingEmailBackend',
+    NOTIFICATION_SOURCES={'subscriptions': 'users.notifications.SubscriptionSource'},
+)
+class NotificationDispatchTests(TestCase):
+    """Due subscriptions are delivered per recipient; failures are retried later"""
+
+    def subscribe(self, username, domain='@example.com'):
+        user = User.objects.create(username=username, email=f'{username}{domain}')
+        subscription = UserSubscription.objects.create(
+            user=user, subscription_type='eclipse', event_id=f'eclipse-{username}',
+            event_name='Total solar eclipse', event_date=timezone.now() + timedelta(hours=12),
+            notify_email=True, notify_in_app=False,
+        )
+        self.assertIsNotNone(subscription.notify_at)
+        return subscription
+
+    def test_failing_recipient_does_not_block_the_others(self):
+        # The refused user sorts first, so it leads the first batch
+        refused = self.subscribe('a_refused', REFUSED_DOMAIN)
+        others = [self.subscribe(f'user_{index}') for index in range(4)]
+
+        results = dispatch_due_notifications(batch_size=2)['subscriptions']
+        self.assertEqual((results['processed'], results['errors'], results['sent']), (4, 1, {'email': 4}))
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), sorted(s.user.email for s in others))
+        for subscription in others:
+            subscription.refresh_from_db()
+            self.assertIsNone(subscription.notify_at)
+            self.assertIsNotNone(subscription.last_notified)
+
+        # The refused row is deferred, not lost, and nothing is sent twice
+        refused.refresh_from_db()
+        self.assertGreater(refused.notify_at, timezone.now())
+        self.assertIsNone(refused.last_notified)
+        results = dispatch_due_notifications(batch_size=2)['subscriptions']
+        self.assertEqual((results['processed'], results['errors']), (0, 0))
+        self.assertEqual(len(mail.outbox), 4)
+
+    def test_deferred_row_is_retried_once_due(self):
+        refused = self.subscribe('a_refused', REFUSED_DOMAIN)
+        dispatch_due_notifications()
+        User.objects.filter(pk=refused.user_id).update(email='fixed@example.com')
+        UserSubscription.objects.filter(pk=refused.pk).update(notify_at=timezone.now())
+
+        results = dispatch_due_notifications()['subscriptions']
+        self.assertEqual((results['processed'], results['errors']), (1, 0))
+        self.assertEqual([message.to for message in mail.outbox], [['fixed@example.com']])
@@ -16,6 +16,7 @@ from users.views import (
     UserCollectionViewSet,
     UserSubscriptionViewSet,
     UserActivityViewSet,
+    NotificationViewSet,
     UserProfileView,
     PublicProfileView,
     # Messaging views
@@ -44,6 +45,7 @@ router.register(r'journals', UserJournalViewSet, basename='journal')
 router.register(r'collections', UserCollectionViewSet, basename='collection')
 router.register(r'subscriptions', UserSubscriptionViewSet, basename='subscription')
 router.register(r'activities', UserActivityViewSet, basename='activity')
+router.register(r'notifications', NotificationViewSet, basename='notification')
 
 # Explore router
 explore_router = DefaultRouter()
@@ -9,11 +9,11 @@ from .serializers import (
     RegisterSerializer, UserSerializer, UserContentSerializer, UserContentListSerializer,
     UserJournalSerializer, UserJournalListSerializer, UserCollectionSerializer,
     UserCollectionListSerializer, UserSubscriptionSerializer, UserActivitySerializer,
-    UserProfileSerializer, PublicUserSerializer
+    NotificationSerializer, UserProfileSerializer, PublicUserSerializer
 )
 from .models import (
     UserContent, UserJournal, UserCollection, UserSubscription, UserActivity, 
-    PasswordResetToken
+    Notification, PasswordResetToken
 )
 from django.core.mail import send_mail
 from django.conf import settings
@@ -635,6 +635,47 @@ class UserActivityViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data)
 
 
+class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for the user's in-app notifications
+    
+    Endpoints:
+    - GET /api/users/notifications/ - List notifications (?unread=true for unread only)
+    - GET /api/users/notifications/{id}/ - Get specific notification
+    - POST /api/users/notifications/{id}/mark_read/ - Mark a notification as read
+    - POST /api/users/notifications/mark_all_read/ - Mark all notifications as read
+    """
+    serializer_class = NotificationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        queryset = Notification.objects.filter(user=self.request.user)
+        
+        unread = self.request.query_params.get('unread')
+        if unread and unread.lower() == 'true':
+            queryset = queryset.filter(read_at__isnull=True)
+        
+        return queryset
+    
+    @action(detail=True, methods=['post'])
+    def mark_read(self, request, pk=None):
+        """Mark a notification as read"""
+        notification = self.get_object()
+        if notification.read_at is None:
+            notification.read_at = timezone.now()
+            notification.save(update_fields=['read_at'])
+        serializer = self.get_serializer(notification)
+        return Response(serializer.data)
+    
+    @action(detail=False, methods=['post'])
+    def mark_all_read(self, request):
+        """Mark all unread notifications as read"""
+        updated = Notification.objects.filter(
+            user=request.user, read_at__isnull=True
+        ).update(read_at=timezone.now())
+        return Response({'marked_read': updated})
+
+
 class UserProfileView(APIView):
     """
     Get and update comprehensive user profile with all aggregated stats